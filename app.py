@@ -1,11 +1,9 @@
 import streamlit as st
 import pandas as pd
 import requests
-from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
-from urllib3.util.retry import Retry
 import numpy as np
-from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import logging
 import time
 from time import sleep
@@ -17,11 +15,10 @@ import matplotlib.pyplot as plt
 import io
 import matplotlib.patches as mpatches
 from matplotlib.ticker import MaxNLocator, MultipleLocator, FixedLocator
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 import multiprocessing
-from threading import Lock
+from threading import Lock, current_thread
 from contextlib import contextmanager
-from scipy.stats import norm
 import bcrypt
 import sqlite3
 from bs4 import BeautifulSoup
@@ -31,6 +28,7 @@ import os
 import pytz
 import json
 import streamlit.components.v1 as components
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from dotenv import load_dotenv
 from user_management import (
     authenticate_user, create_user, check_daily_limit, increment_usage,
@@ -41,6 +39,32 @@ from user_management import (
     create_session, validate_session, logout_session
 )
 from market_maker_analyzer import MarketMakerAnalyzer
+from async_http import AsyncHttpClient, Provider
+from resilience import CircuitOpenError, RetryPolicy
+from chain_cache import ChainCache, ChainSnapshot
+from congress_trades import CongressTradeStore
+from contract_scanner import build_scanner_surface, score_contracts
+from contract_suggestions import ContractCandidates, monetization_metrics
+from fundamentals import ENDPOINTS as FUNDAMENTAL_ENDPOINTS, FundamentalsBundle, fetch_fundamental, fetch_fundamentals
+from gex_engine import GexSurface, GexSurfaceCache, build_gex_surface
+from greeks_engine import DEFAULT_IV, black_scholes_greeks_scalar
+from indicators import atr as average_true_range, historical_volatility, last_value
+from indicators import rsi as wilder_rsi, sma as rolling_sma
+from intraday_stream import IntradayFlows, IntradayStream, intraday_bars_from_records
+from iv_engine import SmileCache, SmileFit, chain_implied_vols, fit_smile
+from max_pain_engine import max_pain_from_chain, max_pain_from_options
+from ohlcv_store import OHLCVStore, bars_from_records
+from option_chain import CALL, PUT, OptionChain
+from persistent_cache import PersistentCache
+from quote_service import Quote, QuoteService
+from screener_cache import ScreenerCache
+from screener_scoring import score_bullish_short_squeeze
+from single_flight import SingleFlight
+from technical_scan import scan_panel
+from vol_surface import VolSurface, VolSurfaceCache, build_vol_surface
+from volume_profile import (
+    MultiResolutionProfile, ProfileCache, bars_from_history, liquidity_pulse, signed_volume,
+)
 
 db_lock = Lock()
 AUTO_UPDATE_INTERVAL = 15
@@ -106,12 +130,6 @@ def render_background_video(video_path: str) -> None:
         logger.error(f"Failed to load background video: {exc}")
 
 # API Sessions and Configurations
-session_fmp = requests.Session()
-session_tradier = requests.Session()
-retry_strategy = Retry(total=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-adapter = HTTPAdapter(max_retries=retry_strategy)
-session_fmp.mount("https://", adapter)
-session_tradier.mount("https://", adapter)
 num_workers = min(100, multiprocessing.cpu_count())
 
 # API Keys and Constants (loaded from .env for security)
@@ -125,21 +143,68 @@ HEADERS_FMP = {"Accept": "application/json"}
 HEADERS_TRADIER = {"Authorization": f"Bearer {TRADIER_API_KEY}", "Accept": "application/json"}
 HEADERS_FINVIZ = {"User-Agent": "Mozilla/5.0"}
 
+# Cliente HTTP asíncrono: pool de conexiones, límite de concurrencia y timeout por proveedor.
+# Cada proveedor tiene su token bucket (límite de la API), una sola política de reintentos
+# con deadline total y un circuit breaker que falla rápido hacia el proveedor de respaldo.
+HTTP_CLIENT = AsyncHttpClient([
+    Provider("tradier", TRADIER_BASE_URL, HEADERS_TRADIER, max_concurrency=16, timeout=10,
+             rate_per_second=2.0, burst=10,  # Tradier market data: 120 req/min
+             retry=RetryPolicy(attempts=3, deadline=12.0)),
+    Provider("fmp", FMP_BASE_URL, HEADERS_FMP, max_concurrency=16, timeout=10,
+             rate_per_second=5.0, burst=20,  # FMP: 300 req/min
+             retry=RetryPolicy(attempts=3, deadline=12.0)),
+    Provider("finviz", FINVIZ_BASE_URL, HEADERS_FINVIZ, max_concurrency=4, timeout=15,
+             rate_per_second=0.5, burst=2,  # Finviz Elite export
+             retry=RetryPolicy(attempts=2, deadline=20.0)),
+])
+session_tradier = HTTP_CLIENT.session("tradier")
+session_fmp = HTTP_CLIENT.session("fmp")
+
 # Constantes
 PASSWORDS_DB = "auth_data/passwords.db"
 CACHE_TTL = 30  # 30 segundos - tiempo real para ticker data
 CACHE_TTL_AGGRESSIVE = 60  # 1 minuto para screener - balance entre datos y velocidad
 CACHE_TTL_STATS = 300  # 5 minutos para datos estadísticos
-MAX_RETRIES = 5
-INITIAL_DELAY = 1
 RISK_FREE_RATE = 0.045  # Tasa libre de riesgo
+QUOTE_TTL = 10  # Segundos - cotizaciones en tiempo real compartidas
+
+# Coalescencia de requests idénticos entre sesiones (una sola llamada HTTP en vuelo)
+REQUEST_COALESCER = SingleFlight()
+
+# Cache compartido de cadenas de opciones (todas las sesiones y tabs)
+CHAIN_CACHE = ChainCache(max_bytes=int(os.getenv("CHAIN_CACHE_MB", "256")) * 1024 * 1024)
+CHAIN_MAX_AGE_REALTIME = 10  # Segundos - vistas de opciones en tiempo real
+CHAIN_MAX_AGE_ANALYTICS = 60  # Segundos - analítica agregada (gamma timeline, max pain)
+
+# Superficie GEX strike x vencimiento (gamma/vanna/charm), construida una vez por snapshot (repreciada por spot)
+GEX_SURFACES = GexSurfaceCache()
+GEX_MAX_EXPIRATIONS = 16  # Vencimientos más cercanos incluidos por defecto
+
+# Sonrisas de volatilidad ajustadas (SVI) por (ticker, vencimiento), reajustadas con cada snapshot
+SMILE_CACHE = SmileCache()
+# Superficie de volatilidad (log-moneyness x vencimiento) construida con esas sonrisas, una vez por snapshot
+VOL_SURFACES = VolSurfaceCache()
+
+# Histórico diario OHLCV local (un archivo .npy por símbolo, refresco incremental)
+OHLCV_STORE = OHLCVStore(os.getenv("OHLCV_STORE_DIR", os.path.join("cache", "ohlcv")))
+OHLCV_INITIAL_BARS = 520  # ~2 años de barras diarias en la primera descarga
+SCAN_HISTORY_BARS = 120  # Barras por símbolo que lee el escáner técnico (RSI de Wilder necesita calentamiento)
+TOUCH_HISTORY_BARS = 30  # Sesiones diarias en las que se cuentan los toques de cada strike (Tab 1)
+
+# Perfiles de volumen: histograma fino por símbolo/día, resoluciones más gruesas derivadas
+VOLUME_PROFILES = ProfileCache()
+VOLUME_PROFILE_BINS = 60  # Bins por defecto del Volume Power Flow
+
+INTRADAY_RING_BARS = 390 * 5  # Barras de 1 minuto por símbolo (~5 sesiones regulares)
+INTRADAY_REFRESH_SECONDS = 15  # Intervalo mínimo entre consultas incrementales por símbolo
+HOURLY_LOOKBACK_DAYS = 30  # Ventana de barras de 1 hora (FMP)
+
+# Cache persistente (SQLite, compartido entre workers y reinicios) bajo los fetch_fmp_* lentos
+FMP_CACHE = PersistentCache(os.getenv("FMP_CACHE_PATH", os.path.join("cache", "fmp_cache.sqlite")))
+FMP_ACTIVITY_TTL = 6 * 3600  # Segundos - filings SEC en disco
 
-# Cache hit tracker para mostrar ahorros
-cache_stats = {
-    "hits": 0,
-    "misses": 0,
-    "bandwidth_saved_mb": 0
-}
+# Índice local de operaciones del Congreso (solo se añaden divulgaciones nuevas, una vez por hora)
+CONGRESS_TRADES = CongressTradeStore(os.getenv("CONGRESS_TRADES_PATH", os.path.join("cache", "congress_trades.sqlite")))
 
 # Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -336,7 +401,7 @@ def get_top_traded_stocks() -> set:
         "limit": 100
     }
     try:
-        response = requests.get(url, params=params, timeout=5)
+        response = HTTP_CLIENT.get("fmp", url, params=params, timeout=5)
         response.raise_for_status()
         data = response.json()
         top_stocks = {stock["symbol"] for stock in data if stock.get("isActivelyTrading", True)}
@@ -355,12 +420,8 @@ def get_implied_volatility(symbol: str) -> Optional[float]:
         logger.warning(f"No expiration dates for {symbol}")
         return None
     nearest_exp = expiration_dates[0]
-    url = f"{TRADIER_BASE_URL}/markets/options/chains"
-    params = {"symbol": symbol, "expiration": nearest_exp, "greeks": "true"}
     try:
-        response = requests.get(url, headers=HEADERS_TRADIER, params=params, timeout=5)
-        response.raise_for_status()
-        data = response.json().get("options", {}).get("option", [])
+        data = fetch_tradier_chain(symbol, nearest_exp, max_age=CHAIN_MAX_AGE_ANALYTICS).options
         ivs = [float(opt.get("implied_volatility", 0)) for opt in data if opt.get("implied_volatility")]
         if ivs:
             avg_iv = sum(ivs) / len(ivs)
@@ -371,60 +432,77 @@ def get_implied_volatility(symbol: str) -> Optional[float]:
         logger.error(f"Error fetching IV for {symbol}: {e}")
         return None
 
-def fetch_api_data(url: str, params: Dict, headers: Dict, source: str, max_retries: int = 5) -> Optional[Dict]:
-    session = session_fmp if "FMP" in source else session_tradier
-    for attempt in range(max_retries):
-        try:
-            response = session.get(url, params=params, headers=headers, timeout=5)
-            response.raise_for_status()
-            logger.debug(f"{source} fetch success: {len(response.text)} bytes")
-            return response.json()
-        except RequestException as e:
-            logger.warning(f"{source} attempt {attempt + 1}/{max_retries} failed: {str(e)}")
-            if attempt < max_retries - 1:
-                sleep(2 ** attempt)  # Exponential backoff: 1s, 2s, 4s, ...
-            else:
-                logger.error(f"{source} failed after {max_retries} attempts: {str(e)}")
-                return None
-
-@st.cache_data(ttl=10)
-def get_current_price(ticker: str) -> float:
-    """
-    Get current price - TIEMPO REAL (10 segundos) - Tradier → FMP
-    """
-    # Intenta Tradier primero
-    url_tradier = f"{TRADIER_BASE_URL}/markets/quotes"
-    params_tradier = {"symbols": ticker}
+def fetch_api_data(url: str, params: Dict, headers: Dict, source: str) -> Optional[Dict]:
+    """GET JSON through HTTP_CLIENT; retries, rate limiting and the circuit breaker live in the provider config."""
+    provider = "fmp" if "FMP" in source else "tradier"
     try:
-        response = session_tradier.get(url_tradier, params=params_tradier, headers=HEADERS_TRADIER, timeout=5)
+        response = HTTP_CLIENT.get(provider, url, params=params, headers=headers, timeout=5)
         response.raise_for_status()
-        data = response.json()
-        if data and "quotes" in data and "quote" in data["quotes"]:
-            quote = data["quotes"]["quote"]
-            if isinstance(quote, list):
-                quote = quote[0]
-            price = float(quote.get("last", 0.0))
-            if price > 0:
-                logger.info(f"Fetched {ticker} price from Tradier: ${price:.2f}")
-                return price
-    except Exception as e:
-        logger.warning(f"Tradier failed for {ticker}: {str(e)}")
+        logger.debug(f"{source} fetch success: {len(response.text)} bytes")
+        return response.json()
+    except CircuitOpenError as e:
+        logger.warning(f"{source} skipped: {str(e)}")
+        return None
+    except RequestException as e:
+        logger.error(f"{source} failed: {str(e)}")
+        return None
 
-    # Fallback a FMP
-    url_fmp = f"{FMP_BASE_URL}/quote/{ticker}"
-    params_fmp = {"apikey": FMP_API_KEY}
-    try:
-        response = session_fmp.get(url_fmp, params=params_fmp, headers=HEADERS_FMP, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-        if data and isinstance(data, list) and len(data) > 0:
-            price = float(data[0].get("price", 0.0))
-            if price > 0:
-                logger.info(f"Fetched {ticker} price from FMP: ${price:.2f}")
-                return price
-    except Exception as e:
-        logger.error(f"FMP failed for {ticker}: {str(e)}")
+def _fetch_tradier_quotes(symbols: List[str]) -> Dict[str, Quote]:
+    data = HTTP_CLIENT.get_json("tradier", "/markets/quotes", params={"symbols": ",".join(symbols)}, timeout=5)
+    items = ((data or {}).get("quotes") or {}).get("quote") or []
+    if isinstance(items, dict):
+        items = [items]
+    fetched_at = time.time()
+    quotes = [Quote.from_tradier(item, fetched_at) for item in items if isinstance(item, dict)]
+    return {quote.symbol: quote for quote in quotes}
+
+def _fetch_fmp_quotes(symbols: List[str]) -> Dict[str, Quote]:
+    data = HTTP_CLIENT.get_json("fmp", f"/quote/{','.join(symbols)}", params={"apikey": FMP_API_KEY}, timeout=5)
+    fetched_at = time.time()
+    quotes = [Quote.from_fmp(item, fetched_at) for item in (data or []) if isinstance(item, dict)]
+    return {quote.symbol: quote for quote in quotes}
+
+# Servicio de cotizaciones: agrupa símbolos pedidos casi al mismo tiempo en llamadas
+# multi-símbolo (Tradier → FMP para faltantes) y los sirve desde un store compartido
+QUOTE_SERVICE = QuoteService([_fetch_tradier_quotes, _fetch_fmp_quotes], ttl=QUOTE_TTL)
+
+def _fetch_tradier_minute_bars(symbol: str, start: datetime) -> np.ndarray:
+    params = {
+        "symbol": symbol,
+        "interval": "1min",
+        "start": start.strftime("%Y-%m-%d %H:%M"),
+        "end": datetime.now().strftime("%Y-%m-%d %H:%M"),
+    }
+    data = HTTP_CLIENT.get_json("tradier", "/markets/timesales", params=params, timeout=10)
+    rows = ((data or {}).get("series") or {}).get("data") or []
+    if isinstance(rows, dict):
+        rows = [rows]
+    return intraday_bars_from_records(rows, time_key="time")
+
+def _fetch_fmp_hourly_bars(symbol: str, start: datetime) -> np.ndarray:
+    data = HTTP_CLIENT.get_json(
+        "fmp",
+        "https://financialmodelingprep.com/stable/historical-chart/1hour",
+        params={"symbol": symbol, "from": start.strftime("%Y-%m-%d"), "apikey": FMP_API_KEY},
+        timeout=10,
+    )
+    return intraday_bars_from_records(data if isinstance(data, list) else [], time_key="date")
+
+# Barras intradía en streaming: ring buffer por símbolo, solo se piden barras nuevas.
+# INTRADAY_FLOWS recibe cada barra de 1 minuto cerrada una vez (perfil de volumen + liquidity pulse, Tab 6)
+INTRADAY_STREAM = IntradayStream(_fetch_tradier_minute_bars, capacity=INTRADAY_RING_BARS, min_interval=INTRADAY_REFRESH_SECONDS)
+INTRADAY_FLOWS = IntradayFlows()
+INTRADAY_STREAM.subscribe(INTRADAY_FLOWS.on_bars)
+HOURLY_STREAM = IntradayStream(_fetch_fmp_hourly_bars, capacity=HOURLY_LOOKBACK_DAYS * 24, min_interval=300)
 
+def get_current_price(ticker: str) -> float:
+    """
+    Get current price - TIEMPO REAL (10 segundos) - Tradier → FMP via QUOTE_SERVICE
+    """
+    quote = QUOTE_SERVICE.get(ticker)
+    if quote is not None:
+        logger.debug(f"{ticker} price from {quote.source}: ${quote.price:.2f}")
+        return quote.price
     logger.error(f"Unable to fetch price for {ticker}")
     return 0.0
 
@@ -432,12 +510,13 @@ def get_current_price(ticker: str) -> float:
 
 
 @st.cache_data(ttl=86400)
+@REQUEST_COALESCER.wrap
 def get_expiration_dates(ticker: str) -> List[str]:
-    """Get option expiration dates directly from Tradier API"""
+    """Get option expiration dates from Tradier API (Finviz fallback when Tradier is down)"""
     url = f"{TRADIER_BASE_URL}/markets/options/expirations"
     params = {"symbol": ticker}
     try:
-        response = session_tradier.get(url, params=params, headers=HEADERS_TRADIER, timeout=5)
+        response = HTTP_CLIENT.get("tradier", url, params=params, timeout=5)
         response.raise_for_status()
         data = response.json()
         if data and "expirations" in data and "date" in data["expirations"]:
@@ -450,7 +529,10 @@ def get_expiration_dates(ticker: str) -> List[str]:
         return []
     except Exception as e:
         logger.error(f"Error fetching expiration dates for {ticker}: {str(e)}")
-        return []
+
+    # Fallback a Finviz cuando Tradier está caído (circuit abierto o sin respuesta)
+    current_date = datetime.now().date().isoformat()
+    return [date for date in get_finviz_expiration_dates(ticker) if str(date) >= current_date]
 
 # --- Finviz Elite Options Functions ---
 @st.cache_data(ttl=CACHE_TTL)
@@ -487,7 +569,7 @@ def get_finviz_options_data(ticker: str, expiration: str = "", strike_filter: st
         if strike_filter:
             params["sf"] = strike_filter  # Strike filter
         
-        response = requests.get(url, params=params, headers=HEADERS_FINVIZ, timeout=15)
+        response = HTTP_CLIENT.get("finviz", url, params=params, timeout=15)
         response.raise_for_status()
         
         # Parse CSV response
@@ -530,7 +612,7 @@ def get_finviz_expiration_dates(ticker: str) -> List[str]:
             "auth": FINVIZ_API_TOKEN
         }
         
-        response = requests.get(url, params=params, headers=HEADERS_FINVIZ, timeout=15)
+        response = HTTP_CLIENT.get("finviz", url, params=params, timeout=15)
         response.raise_for_status()
         
         from io import StringIO
@@ -607,7 +689,14 @@ def get_options_data_hybrid(ticker: str, expiration_date: str = "", prefer_sourc
     logger.error(f"❌ Both Tradier and Finviz failed for {ticker}")
     return None
 
-@st.cache_data(ttl=60)  # 1 minuto - tiempo real para screener
+def _download_finviz_export(params: Dict[str, str]) -> str:
+    response = HTTP_CLIENT.get("finviz", "/export.ashx", params=params, timeout=15)
+    response.raise_for_status()
+    return response.text
+
+# Exports del screener por vista/columnas; filtros añadidos se resuelven localmente si se puede
+SCREENER_CACHE = ScreenerCache(_download_finviz_export, ttl=CACHE_TTL_AGGRESSIVE)
+
 def get_finviz_screener_elite(filters: Dict[str, any] = None, columns: List[str] = None, view_id: str = "111") -> Optional[pd.DataFrame]:
     """
     Fetch screener data from Finviz Elite export API.
@@ -647,100 +736,35 @@ def get_finviz_screener_elite(filters: Dict[str, any] = None, columns: List[str]
         • ta_pattern_doubletop = Double top pattern
     """
     try:
-        # Build URL parameters following official Finviz Elite API
-        params = {
-            "v": view_id,              # View ID
-            "auth": FINVIZ_API_TOKEN,  # API Token
-            "r": "1000"                # Request up to 1000 results per call
-        }
-        
-        # Add filters if provided
-        if filters:
-            # Build filter string: comma-separated filter names
-            # Example: "fa_div_pos,sec_technology,ta_volatility_wo5"
-            filter_names = [k for k in filters.keys() if k not in ["o", "r"]]
-            if filter_names:
-                params["f"] = ",".join(filter_names)
-            
-            # Handle ordering parameter if present
-            if "o" in filters:
-                params["o"] = filters["o"]
-        
-        # Add columns if specified (optional customization)
-        if columns:
-            columns_str = ",".join([str(c) for c in columns])
-            params["c"] = columns_str
-        
-        # Construct the URL: https://elite.finviz.com/export.ashx
-        url = f"{FINVIZ_BASE_URL}/export.ashx"
-        
-        # Make request to Finviz Elite screener export endpoint
-        response = requests.get(url, params=params, headers=HEADERS_FINVIZ, timeout=15)
-        response.raise_for_status()
-        
-        # Parse CSV response into DataFrame
-        from io import StringIO
-        df = pd.read_csv(StringIO(response.text))
+        # Filters evaluable on a cached superset export are applied locally (SCREENER_CACHE)
+        filters = filters or {}
+        filter_names = [k for k in filters.keys() if k not in ["o", "r"]]
+        df = SCREENER_CACHE.screen(
+            filter_names,
+            view=view_id,
+            columns=columns,
+            order=filters.get("o"),
+            rows=1000,
+            params={"auth": FINVIZ_API_TOKEN},
+        )
         
         if df.empty:
-            logger.warning(f"Finviz screener returned no results with filters: {params.get('f', 'none')}")
+            logger.warning(f"Finviz screener returned no results with filters: {','.join(filter_names) or 'none'}")
             return None
         
-        logger.info(f"Finviz Screener: {len(df)} results (View: {view_id}, Filters: {params.get('f', 'none')})")
+        logger.info(f"Finviz Screener: {len(df)} results (View: {view_id}, Filters: {','.join(filter_names) or 'none'})")
         return df
         
     except Exception as e:
         logger.warning(f"Finviz screener fetch failed: {str(e)}")
         return None
          
-@st.cache_data(ttl=60)
 def get_current_prices(tickers: List[str]) -> Dict[str, float]:
     """
-    Get current prices for multiple tickers - Tradier → FMP (sin backend)
+    Get current prices for multiple tickers - Tradier → FMP (sin backend), batched by QUOTE_SERVICE
     """
-    prices_dict = {ticker: 0.0 for ticker in tickers}
-    
-    # Intenta Tradier primero
-    tickers_str = ",".join(tickers)
-    url_tradier = f"{TRADIER_BASE_URL}/markets/quotes"
-    params_tradier = {"symbols": tickers_str}
-    try:
-        response = session_tradier.get(url_tradier, params=params_tradier, headers=HEADERS_TRADIER, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-        if data and "quotes" in data and "quote" in data["quotes"]:
-            quotes = data["quotes"]["quote"]
-            if isinstance(quotes, dict):
-                quotes = [quotes]
-            for quote in quotes:
-                ticker = quote.get("symbol", "")
-                price = float(quote.get("last", 0.0))
-                if ticker in prices_dict and price > 0:
-                    prices_dict[ticker] = price
-            fetched = [t for t, p in prices_dict.items() if p > 0]
-            logger.info(f"Fetched {len(fetched)}/{len(tickers)} prices from Tradier")
-    except Exception as e:
-        logger.warning(f"Tradier failed: {str(e)}")
-
-    # Fallback a FMP para los faltantes
-    missing_tickers = [t for t, p in prices_dict.items() if p == 0.0]
-    if missing_tickers:
-        url_fmp = f"{FMP_BASE_URL}/quote/{','.join(missing_tickers)}"
-        params_fmp = {"apikey": FMP_API_KEY}
-        try:
-            response = session_fmp.get(url_fmp, params=params_fmp, headers=HEADERS_FMP, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-            if data and isinstance(data, list):
-                for item in data:
-                    ticker = item.get("symbol", "")
-                    price = float(item.get("price", 0.0))
-                    if ticker in prices_dict and price > 0:
-                        prices_dict[ticker] = price
-            fetched = [t for t, p in prices_dict.items() if p > 0 and t in missing_tickers]
-            logger.info(f"Fetched {len(fetched)}/{len(missing_tickers)} remaining prices from FMP")
-        except Exception as e:
-            logger.error(f"FMP failed: {str(e)}")
+    quotes = QUOTE_SERVICE.get_many(tickers, max_age=60)
+    prices_dict = {ticker: quotes[ticker.upper()].price if ticker.upper() in quotes else 0.0 for ticker in tickers}
 
     failed = [t for t, p in prices_dict.items() if p == 0.0]
     if failed:
@@ -748,95 +772,204 @@ def get_current_prices(tickers: List[str]) -> Dict[str, float]:
 
     return prices_dict
 
-@st.cache_data(ttl=10)  # 10 segundos - opciones son tiempo real, cambian constantemente
-def get_options_data(ticker: str, expiration_date: str) -> List[Dict]:
+def get_fetch_stats() -> Dict[str, Dict]:
+    """Counters for coalesced/issued requests, the shared chain and quote stores and provider circuits."""
+    return {
+        "requests": REQUEST_COALESCER.stats(),
+        "chains": CHAIN_CACHE.stats(),
+        "quotes": QUOTE_SERVICE.stats(),
+        "intraday": INTRADAY_STREAM.stats(),
+        "volume_profiles": VOLUME_PROFILES.stats(),
+        "screener": SCREENER_CACHE.stats(),
+        "fmp_disk": FMP_CACHE.stats(),
+        "congress": CONGRESS_TRADES.stats(),
+        "gex_surfaces": GEX_SURFACES.stats(),
+        "smiles": SMILE_CACHE.stats(),
+        "vol_surfaces": VOL_SURFACES.stats(),
+        "providers": HTTP_CLIENT.health(),
+    }
+
+FETCH_STATS_LOG_SECONDS = 300  # Intervalo mínimo entre volcados de get_fetch_stats() al log por sesión
+
+def log_fetch_stats() -> None:
+    """Vuelca get_fetch_stats() al log, como mucho una vez cada FETCH_STATS_LOG_SECONDS por sesión."""
+    now = time.time()
+    if now - st.session_state.get("fetch_stats_logged_at", 0.0) < FETCH_STATS_LOG_SECONDS:
+        return
+    st.session_state["fetch_stats_logged_at"] = now
+    logger.info(f"Fetch stats: {get_fetch_stats()}")
+
+def _download_tradier_chain(ticker: str, expiration_date: str) -> List[Dict]:
+    url = f"{TRADIER_BASE_URL}/markets/options/chains"
+    params = {"symbol": ticker, "expiration": expiration_date, "greeks": "true"}
+    response = HTTP_CLIENT.get("tradier", url, params=params, timeout=10)
+    response.raise_for_status()
+    data = response.json()
+    if not isinstance(data, dict) or not isinstance(data.get("options"), dict):
+        logger.warning(f"No options payload for {ticker} on {expiration_date}: {data}")
+        return []
+    option_list = data["options"].get("option") or []
+    if isinstance(option_list, dict):
+        option_list = [option_list]
+    return [opt for opt in option_list if isinstance(opt, dict)]
+
+def fetch_tradier_chain(ticker: str, expiration_date: str, max_age: float = CHAIN_MAX_AGE_REALTIME) -> ChainSnapshot:
+    """
+    Single entry point for Tradier /markets/options/chains.
+    
+    Goes through the process-wide CHAIN_CACHE: entries newer than ``max_age``
+    seconds are reused, concurrent misses share one download. Raises
+    requests.RequestException / ValueError on network or JSON errors.
+    """
+    return CHAIN_CACHE.get(ticker, expiration_date, lambda: _download_tradier_chain(ticker, expiration_date), max_age)
+
+def _valid_contracts(option_list: List[Dict]) -> List[Dict]:
+    valid_options = []
+    for opt in option_list:
+        bid = opt.get("bid")
+        ask = opt.get("ask")
+        if (bid is not None and ask is not None and
+            isinstance(bid, (int, float)) and isinstance(ask, (int, float)) and
+            bid > 0 and ask > 0):
+            valid_options.append(opt)
+    return valid_options
+
+def get_options_data(ticker: str, expiration_date: str, max_age: float = CHAIN_MAX_AGE_REALTIME) -> List[Dict]:
     """
     Fetch options chain data from Tradier API with strict validation.
     
     Args:
         ticker (str): Stock ticker symbol (e.g., 'SPY').
         expiration_date (str): Expiration date in YYYY-MM-DD format.
+        max_age (float): Oldest cached chain snapshot (seconds) the caller accepts.
     
     Returns:
-        List[Dict]: List of valid option contracts.
+        List[Dict]: List of valid option contracts (bid/ask > 0).
     """
-    url = f"{TRADIER_BASE_URL}/markets/options/chains"
-    params = {"symbol": ticker, "expiration": expiration_date, "greeks": "true"}
     try:
-        time.sleep(0.1)  # Add delay to avoid rate-limiting
-        response = session_tradier.get(url, params=params, headers=HEADERS_TRADIER, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-        logger.debug(f"Tradier response for {ticker} {expiration_date}: {data}")
-        
-        # ✅ VALIDACIÓN ROBUSTA - Cambios críticos aquí
-        if data is None or not isinstance(data, dict):
-            logger.error(f"Invalid JSON response for {ticker}: {response.text}")
-            return []
-        
-        # Verificar que 'options' existe y no es None
-        if 'options' not in data:
-            logger.warning(f"No 'options' key in response for {ticker} on {expiration_date}: {data}")
-            return []
-        
-        options_container = data['options']
-        
-        # ✅ SOLUCIÓN AL ERROR: Validar que options_container no sea None antes de usar 'in'
-        if options_container is None:
-            logger.warning(f"'options' is None for {ticker} on {expiration_date}")
-            return []
-        
-        if not isinstance(options_container, dict):
-            logger.warning(f"'options' is not a dict for {ticker} on {expiration_date}: {type(options_container)}")
-            return []
-        
-        if 'option' not in options_container:
-            logger.warning(f"No 'option' key in options data for {ticker} on {expiration_date}: {options_container}")
-            return []
-        
-        option_list = options_container['option']
-        
-        # Validar que option_list sea una lista
-        if not isinstance(option_list, list):
-            logger.warning(f"'option' is not a list for {ticker} on {expiration_date}: {type(option_list)}")
-            return []
-        
-        if len(option_list) == 0:
+        snapshot = fetch_tradier_chain(ticker, expiration_date, max_age)
+        if not snapshot.options:
             logger.warning(f"Empty option list for {ticker} on {expiration_date}")
             return []
-        
-        # Filtrar opciones válidas
-        valid_options = []
-        for opt in option_list:
-            if not isinstance(opt, dict):
-                logger.warning(f"Skipping non-dict option for {ticker}: {opt}")
-                continue
-                
-            bid = opt.get("bid")
-            ask = opt.get("ask")
-            
-            if (bid is not None and ask is not None and
-                isinstance(bid, (int, float)) and isinstance(ask, (int, float)) and
-                bid > 0 and ask > 0):
-                valid_options.append(opt)
-            else:
-                logger.warning(f"Skipping option for {ticker} on {expiration_date}: Invalid bid/ask - {opt}")
-        
-        logger.info(f"Fetched {len(valid_options)} valid option contracts for {ticker} on {expiration_date}")
-        if valid_options:
-            logger.debug(f"Sample contract: {valid_options[0]}")
-        return valid_options
+        valid_options = snapshot.view("valid", _valid_contracts)
+        skipped = len(snapshot.options) - len(valid_options)
+        if skipped:
+            logger.debug(f"Skipped {skipped} options with invalid bid/ask for {ticker} on {expiration_date}")
+        logger.debug(f"Fetched {len(valid_options)} valid option contracts for {ticker} on {expiration_date}")
+        return list(valid_options)
         
     except requests.RequestException as e:
         logger.error(f"Network error fetching options for {ticker}: {str(e)} - Response: {getattr(e.response, 'text', 'No response')}")
         return []
     except ValueError as e:
-        logger.error(f"JSON parsing error for {ticker}: {str(e)} - Response: {response.text if 'response' in locals() else 'No response'}")
+        logger.error(f"JSON parsing error for {ticker}: {str(e)}")
         return []
     except Exception as e:
         logger.error(f"Unexpected error fetching options for {ticker}: {str(e)}")
         return []
 
+def get_option_chain_columns(ticker: str, expiration_date: str, max_age: float = CHAIN_MAX_AGE_REALTIME) -> OptionChain:
+    """Columnar OptionChain for ``get_options_data``; parsed once per chain snapshot."""
+    try:
+        snapshot = fetch_tradier_chain(ticker, expiration_date, max_age)
+    except (requests.RequestException, ValueError) as e:
+        logger.error(f"Error fetching option chain for {ticker} on {expiration_date}: {str(e)}")
+        return OptionChain.empty()
+    return snapshot.view("columns", lambda options: OptionChain.from_tradier(_valid_contracts(options)))
+
+def _chain_snapshots(
+    ticker: str,
+    expirations: Optional[List[str]],
+    include: Optional[str],
+    max_age: float,
+) -> List[ChainSnapshot]:
+    """Concurrent CHAIN_CACHE snapshots for the surface builders; failed downloads are logged and left out."""
+    if expirations is None:
+        expirations = list(get_expiration_dates(ticker)[:GEX_MAX_EXPIRATIONS])
+    if include and include not in expirations:
+        expirations = [*expirations, include]
+    results = HTTP_CLIENT.gather(*(HTTP_CLIENT.call(fetch_tradier_chain, ticker, exp, max_age) for exp in expirations))
+    snapshots = []
+    for exp, result in zip(expirations, results):
+        if isinstance(result, BaseException):
+            logger.error(f"Error fetching option chain for {ticker} on {exp}: {result}")
+        else:
+            snapshots.append(result)
+    return snapshots
+
+def get_gex_surface(
+    ticker: str,
+    current_price: float,
+    expirations: Optional[List[str]] = None,
+    include: Optional[str] = None,
+    max_age: float = CHAIN_MAX_AGE_ANALYTICS,
+) -> GexSurface:
+    """
+    Strike x expiration gamma/vanna/charm exposure shared by every tab.
+    
+    Covers ``expirations`` (default: the GEX_MAX_EXPIRATIONS nearest, plus
+    ``include`` when given); views reading one expiration should pass just
+    that one. Chains are fetched concurrently through CHAIN_CACHE and the
+    surface is rebuilt only when a snapshot changes; a new spot reprices the
+    cached surface lazily (GexSurface.at_spot), keeping its gamma flip.
+    Expirations that fail to download are left out.
+    """
+    snapshots = _chain_snapshots(ticker, expirations, include, max_age)
+    spot = round(float(current_price or 0), 2)
+    key = (ticker, tuple(snapshot.key for snapshot in snapshots))
+    return GEX_SURFACES.surface(key, lambda: build_gex_surface(
+        {snapshot.expiration: snapshot.view("all_columns", OptionChain.from_tradier) for snapshot in snapshots},
+        spot, get_current_date(), RISK_FREE_RATE,
+    )).at_spot(spot)
+
+def get_volatility_smile(ticker: str, expiration_date: str, current_price: Optional[float] = None) -> Optional[SmileFit]:
+    """
+    Fitted smile for one expiration, shared by skew charts, greeks and suggestions.
+    
+    Fit once per chain snapshot in SMILE_CACHE (at the spot of the first
+    request for that snapshot); None when the chain or price is unavailable.
+    """
+    try:
+        snapshot = fetch_tradier_chain(ticker, expiration_date, CHAIN_MAX_AGE_ANALYTICS)
+    except (requests.RequestException, ValueError) as e:
+        logger.error(f"Error fetching option chain for {ticker} on {expiration_date}: {str(e)}")
+        return None
+    spot = current_price or get_current_price(ticker)
+    if not spot:
+        return None
+    return _snapshot_smile(ticker, snapshot, spot)
+
+def _snapshot_smile(ticker: str, snapshot: ChainSnapshot, spot: float) -> Optional[SmileFit]:
+    T = max(get_days_to_expiration(snapshot.expiration), 0.5) / 365.0
+    return SMILE_CACHE.get(ticker, snapshot.expiration, snapshot.fetched_at, lambda: fit_smile(
+        snapshot.view("all_columns", OptionChain.from_tradier), spot, T, RISK_FREE_RATE, snapshot.expiration,
+    ))
+
+def get_vol_surface(
+    ticker: str,
+    current_price: Optional[float] = None,
+    expirations: Optional[List[str]] = None,
+    include: Optional[str] = None,
+    max_age: float = CHAIN_MAX_AGE_ANALYTICS,
+) -> Optional[VolSurface]:
+    """
+    IV surface (log-moneyness x expiration) shared by the scanner, targets and multi-date views.
+    
+    Covers the same expirations as get_gex_surface. Stacks the SMILE_CACHE
+    fits of each snapshot and is rebuilt only when a snapshot changes, so
+    re-renders at a new spot reuse it. None when the price is unavailable.
+    """
+    spot = current_price or get_current_price(ticker)
+    if not spot:
+        return None
+    snapshots = _chain_snapshots(ticker, expirations, include, max_age)
+    key = (ticker, tuple(snapshot.key for snapshot in snapshots))
+    return VOL_SURFACES.surface(key, lambda: build_vol_surface(
+        {snapshot.expiration: _snapshot_smile(ticker, snapshot, spot) for snapshot in snapshots},
+        spot, get_current_date(), RISK_FREE_RATE,
+        chains={snapshot.expiration: snapshot.view("all_columns", OptionChain.from_tradier) for snapshot in snapshots},
+    ))
+
 
 def _generate_mock_contracts(ticker: str, price: float) -> List[Dict]:
     """Generate realistic mock options data for demo when API fails"""
@@ -896,7 +1029,7 @@ def get_historical_prices_combined(symbol, period="daily", limit=30):
     try:
         url = f"{FMP_BASE_URL}/historical-price-full/{symbol}"
         params = {"apikey": FMP_API_KEY, "serietype": period}
-        response = requests.get(url, params=params, timeout=5)
+        response = HTTP_CLIENT.get("fmp", url, params=params, timeout=5)
         response.raise_for_status()
         data = response.json()
         
@@ -935,7 +1068,8 @@ def get_stock_list_combined():
 
     # 1. Obtener lista de FMP
     try:
-        response = requests.get(
+        response = HTTP_CLIENT.get(
+            "fmp",
             f"{FMP_BASE_URL}/stock-screener",
             params={
                 "apikey": FMP_API_KEY,
@@ -948,7 +1082,7 @@ def get_stock_list_combined():
         response.raise_for_status()
         data = response.json()
         fmp_tickers = [stock["symbol"] for stock in data if stock.get("isActivelyTrading", True)]
-        combined_tickers.update(fmp_tickers[:200])  # Limitamos a 200 por velocidad
+        combined_tickers.update(fmp_tickers)
         logger.info(f"returned {len(fmp_tickers)} tickers")
     except Exception as e:
         logger.error(f"stock list failed: {str(e)}")
@@ -957,37 +1091,25 @@ def get_stock_list_combined():
     try:
         # Tradier no tiene un endpoint directo de "screener", así que usamos una lista inicial de índices o ETFs populares
         initial_tickers = "SPY,QQQ,DIA,IWM,TSLA,AAPL,MSFT,NVDA,GOOGL,AMZN,META"  # Base inicial
-        url_tradier = f"{TRADIER_BASE_URL}/markets/quotes"
-        params_tradier = {"symbols": initial_tickers}
-        data_tradier = fetch_api_data(url_tradier, params_tradier, HEADERS_TRADIER, "Tradier")
-        if data_tradier and "quotes" in data_tradier and "quote" in data_tradier["quotes"]:
-            quotes = data_tradier["quotes"]["quote"]
-            if isinstance(quotes, dict):
-                quotes = [quotes]
-            tradier_tickers = [
-                quote["symbol"] for quote in quotes
-                if quote.get("last", 0) > 5 and quote.get("volume", 0) > 500_000
-            ]
-            combined_tickers.update(tradier_tickers)
-            logger.info(f"Tradier returned {len(tradier_tickers)} tickers")
+        quotes = QUOTE_SERVICE.get_many(initial_tickers.split(","))
+        tradier_tickers = [
+            quote.symbol for quote in quotes.values()
+            if quote.last > 5 and quote.volume > 500_000
+        ]
+        combined_tickers.update(tradier_tickers)
+        logger.info(f"Tradier returned {len(tradier_tickers)} tickers")
     except Exception as e:
         logger.error(f"Tradier stock list failed: {str(e)}")
 
-    # Convertimos a lista y limitamos el resultado
+    # Universo completo: el escáner lee del OHLCV_STORE local, sin llamadas por ticker
     final_list = list(combined_tickers)
     logger.info(f"Combined unique tickers: {len(final_list)}")
-    return final_list[:200]  # Máximo 200 para mantener rendimiento
+    return final_list
 
 # --- Funciones de Análisis ---
 def analyze_contracts(ticker, expiration, current_price):
-    url = f"{TRADIER_BASE_URL}/markets/options/chains"
-    params = {"symbol": ticker, "expiration": expiration, "greeks": True}
     try:
-        response = requests.get(url, headers=HEADERS_TRADIER, params=params, timeout=10)
-        if response.status_code != 200:
-            st.info("Option data is being processed. Please refresh the page.")
-            return pd.DataFrame()
-        options = response.json().get("options", {}).get("option", [])
+        options = fetch_tradier_chain(ticker, expiration).options
         if not options:
             st.warning("No contracts available.")
             return pd.DataFrame()
@@ -1000,6 +1122,9 @@ def analyze_contracts(ticker, expiration, current_price):
         df['trade_date'] = datetime.now().strftime('%Y-%m-%d')
         df['break_even'] = df.apply(lambda row: row['strike'] + row['bid'] if row['option_type'] == 'call' else row['strike'] - row['bid'], axis=1)
         return df
+    except requests.HTTPError:
+        st.info("Option data is being processed. Please refresh the page.")
+        return pd.DataFrame()
     except requests.exceptions.ReadTimeout:
         st.info(f"Option data for {ticker} is temporarily unavailable. Please try again shortly.")
         return pd.DataFrame()
@@ -1046,28 +1171,10 @@ def calculate_max_pain(options_data: List[Dict]) -> Optional[float]:
     if not options_data:
         logger.warning("No options data provided for Max Pain calculation")
         return None
-    strikes = {}
-    for opt in options_data:
-        try:
-            strike = float(opt.get("strike", 0))
-            oi = int(opt.get("open_interest", 0) or 0)
-            opt_type = opt.get("option_type", "").upper()
-            if strike not in strikes:
-                strikes[strike] = {"CALL": 0, "PUT": 0}
-            strikes[strike][opt_type] += oi
-        except (ValueError, TypeError) as e:
-            logger.warning(f"Invalid option data: {opt} - {str(e)}")
-            continue
-    strike_prices = sorted(strikes.keys())
-    total_losses = {}
-    for strike in strike_prices:
-        call_loss = sum(strikes[s]["CALL"] * max(0, s - strike) for s in strike_prices)
-        put_loss = sum(strikes[s]["PUT"] * max(0, strike - s) for s in strike_prices)
-        total_losses[strike] = call_loss + put_loss
-    if not total_losses:
+    max_pain = max_pain_from_options(options_data).max_pain
+    if max_pain is None:
         logger.warning("No valid strike prices for Max Pain calculation")
         return None
-    max_pain = min(total_losses, key=total_losses.get)
     logger.debug(f"Calculated Max Pain: ${max_pain:.2f}")
     return max_pain
 
@@ -1107,13 +1214,11 @@ def plot_max_pain_histogram_with_levels(max_pain_table, current_price):
     return fig
 
 def get_option_chains(ticker, expiration):
-    url = f"{TRADIER_BASE_URL}/markets/options/chains"
-    params = {"symbol": ticker, "expiration": expiration, "greeks": True}
-    response = requests.get(url, headers=HEADERS_TRADIER, params=params)
-    if response.status_code == 200:
-        return response.json().get("options", {}).get("option", [])
-    st.error("Error retrieving option chains.")
-    return []
+    try:
+        return list(fetch_tradier_chain(ticker, expiration).options)
+    except (requests.RequestException, ValueError):
+        st.error("Error retrieving option chains.")
+        return []
 
 def calculate_score(df, current_price, volatility=0.2):
     df['score'] = (df['open_interest'] * df['volume']) / (abs(df['strike'] - current_price) + volatility)
@@ -1144,44 +1249,60 @@ def plot_histogram(df):
     fig.add_hline(y=resistance_level, line_width=1, line_dash="dot", line_color="#FF4500", annotation_text=f"Resistance: {resistance_level:.2f}", annotation_position="top left", annotation_font=dict(size=10, color="#FF4500"))
     return fig
 
-def detect_touched_strikes(strikes, historical_prices):
-    touched_strikes = set()
-    cleaned_prices = [float(p) for p in historical_prices if isinstance(p, (int, float, str)) and str(p).replace('.', '', 1).isdigit()]
-    if len(cleaned_prices) < 2:
-        return touched_strikes
-    for strike in strikes:
-        for i in range(1, len(cleaned_prices)):
-            if (cleaned_prices[i-1] < strike <= cleaned_prices[i]) or (cleaned_prices[i-1] > strike >= cleaned_prices[i]):
-                touched_strikes.add(strike)
-    return touched_strikes
+def detect_touched_strikes(strikes, lows, highs=None, times=None) -> Dict[float, Dict]:
+    """
+    Strikes traded through by price, with how often and when each was last touched.
+    
+    Bar ``i`` covers ``[lows[i], highs[i]]``; without ``highs``, ``lows`` is a
+    close series and each pair of consecutive closes is one range. Every
+    range is mapped onto the sorted strikes with ``np.searchsorted``, so the
+    cost is one pass over the bars plus one per touch. Returns
+    ``{strike: {"touches": n, "last_touch": times[i]}}`` for touched strikes
+    only (``last_touch`` is None without ``times``); non-numeric prices are ignored.
+    """
+    strike_grid = np.unique(pd.to_numeric(pd.Series(list(strikes), dtype=object), errors="coerce").dropna().to_numpy(np.float64))
+    low = pd.to_numeric(pd.Series(list(lows), dtype=object), errors="coerce").to_numpy(np.float64)
+    if highs is None:
+        priced = np.flatnonzero(np.isfinite(low))
+        times = [times[i] for i in priced[1:]] if times is not None else None
+        low = low[priced]
+        low, high = np.minimum(low[:-1], low[1:]), np.maximum(low[:-1], low[1:])
+    else:
+        high = pd.to_numeric(pd.Series(list(highs), dtype=object), errors="coerce").to_numpy(np.float64)
+    bars = np.flatnonzero(np.isfinite(low) & np.isfinite(high) & (high >= low))
+    if not strike_grid.size or not bars.size:
+        return {}
+
+    left = np.searchsorted(strike_grid, low[bars], side="left")
+    spans = np.searchsorted(strike_grid, high[bars], side="right") - left
+    cells = np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans) + np.repeat(left, spans)
+    bar_of_cell = np.repeat(bars, spans)
+    touches = np.bincount(cells, minlength=strike_grid.size)
+    last_bar = np.full(strike_grid.size, -1)
+    np.maximum.at(last_bar, cells, bar_of_cell)
+    return {
+        float(strike_grid[j]): {
+            "touches": int(touches[j]),
+            "last_touch": str(times[last_bar[j]]) if times is not None else None,
+        }
+        for j in np.flatnonzero(touches)
+    }
 
 def calculate_max_pain_optimized(options_data):
     if not options_data:
         return None
-    strikes = {}
-    for option in options_data:
-        strike = float(option["strike"])
-        oi = int(option.get("open_interest", 0) or 0)
-        volume = int(option.get("volume", 0) or 0)
-        option_type = option["option_type"].upper()
-        if strike not in strikes:
-            strikes[strike] = {"CALL": {"OI": 0, "Volume": 0}, "PUT": {"OI": 0, "Volume": 0}}
-        strikes[strike][option_type]["OI"] += oi
-        strikes[strike][option_type]["Volume"] += volume
-    strike_prices = sorted(strikes.keys())
-    total_losses = {}
-    for strike in strike_prices:
-        loss_call = sum((strikes[s]["CALL"]["OI"] + strikes[s]["CALL"]["Volume"]) * max(0, s - strike) for s in strike_prices)
-        loss_put = sum((strikes[s]["PUT"]["OI"] + strikes[s]["PUT"]["Volume"]) * max(0, strike - s) for s in strike_prices)
-        total_losses[strike] = loss_call + loss_put
-    return min(total_losses, key=total_losses.get) if total_losses else None
-
-def gamma_exposure_chart(processed_data, current_price, touched_strikes):
-    strikes = sorted(processed_data.keys())
-    gamma_calls = [processed_data[s]["CALL"]["OI"] * processed_data[s]["CALL"]["Gamma"] * current_price for s in strikes]
-    gamma_puts = [-processed_data[s]["PUT"]["OI"] * processed_data[s]["PUT"]["Gamma"] * current_price for s in strikes]
+    return max_pain_from_options(options_data, include_volume=True).max_pain
+
+def gamma_exposure_chart(surface: GexSurface, expiration_date: str, current_price, touched_strikes):
+    exposure = surface.by_strike([expiration_date])
+    strikes = exposure["strike"].tolist()
+    gamma_calls = exposure["call_gex"].tolist()
+    gamma_puts = (-exposure["put_gex"]).tolist()
+    if not strikes:
+        gamma_calls = gamma_puts = [0.0]
     call_colors = ["grey" if s in touched_strikes else "#7DF9FF" for s in strikes]
     put_colors = ["orange" if s in touched_strikes else "red" for s in strikes]
+    touch_counts = [touched_strikes[s]["touches"] if s in touched_strikes else 0 for s in strikes]
 
     # Crear la figura
     fig = go.Figure()
@@ -1193,7 +1314,8 @@ def gamma_exposure_chart(processed_data, current_price, touched_strikes):
         name="Gummy CALL",
         marker=dict(color=call_colors),
         width=0.4,
-        hovertemplate="Gummy CALL: %{y:.2f}",  # Sin Current Price
+        customdata=touch_counts,
+        hovertemplate="Gummy CALL: %{y:.2f}<br>Touches: %{customdata}",  # Sin Current Price
     ))
     fig.add_trace(go.Bar(
         x=strikes,
@@ -1201,7 +1323,8 @@ def gamma_exposure_chart(processed_data, current_price, touched_strikes):
         name="Gummy PUT",
         marker=dict(color=put_colors),
         width=0.4,
-        hovertemplate="Gummy PUT: %{y:.2f}",  # Sin Current Price
+        customdata=touch_counts,
+        hovertemplate="Gummy PUT: %{y:.2f}<br>Touches: %{customdata}",  # Sin Current Price
     ))
 
     # Línea vertical para Current Price
@@ -1235,6 +1358,12 @@ def gamma_exposure_chart(processed_data, current_price, touched_strikes):
         borderpad=4  # Espacio interno para un look limpio
     )
 
+    # Nivel de flip: spot donde la gamma neta de dealers (repriceada) cambia de signo
+    zero_gamma = surface.gamma_flip([expiration_date])
+    if zero_gamma is not None:
+        fig.add_vline(x=zero_gamma, line=dict(width=1, dash="dash", color="#FFD700"),
+                      annotation_text=f"Zero Gamma: ${zero_gamma:.2f}", annotation_font=dict(color="#FFD700", size=10))
+
     # Configuración de los tooltips y layout
     fig.update_traces(
         hoverlabel=dict(
@@ -1263,30 +1392,38 @@ def gamma_exposure_chart(processed_data, current_price, touched_strikes):
 
     return fig
 
-def plot_skew_analysis_with_totals(options_data, current_price=None):
-    # Extraer datos básicos de options_data
-    strikes = [float(option["strike"]) for option in options_data]
-    iv = [float(option.get("implied_volatility", 0)) * 100 for option in options_data]
-    option_type = [option["option_type"].upper() for option in options_data]
-    # Asegurarse de que open_interest sea numérico y no nan
-    open_interest = [int(option.get("open_interest", 0) or 0) for option in options_data]
+def plot_skew_analysis_with_totals(options_data, current_price=None, smile: Optional[SmileFit] = None):
+    chain = OptionChain.from_records(options_data)
+    strikes = chain.strike
+    option_type = np.where(chain.is_call, "CALL", "PUT")
+    open_interest = chain.open_interest.astype(np.int64)
+
+    expiration = (options_data[0].get("expiration_date") or options_data[0].get("expirationDate")) if options_data else None
+    days_to_expiration = get_days_to_expiration(expiration) if expiration else 0
+
+    # IV de mercado invertida desde el mid; el feed y luego la sonrisa ajustada cubren contratos sin cotización
+    iv_decimal = chain.iv.copy()
+    if current_price:
+        market_iv = chain_implied_vols(chain, current_price, max(days_to_expiration, 0.5) / 365.0, RISK_FREE_RATE)
+        iv_decimal = np.where(np.isfinite(market_iv), market_iv, iv_decimal)
+    if smile is not None:
+        iv_decimal = np.where(iv_decimal > 0, iv_decimal, smile.iv(strikes))
+    iv = iv_decimal * 100
     
     # Calcular totales
-    total_calls = sum(oi for oi, ot in zip(open_interest, option_type) if ot == "CALL")
-    total_puts = sum(oi for oi, ot in zip(open_interest, option_type) if ot == "PUT")
-    total_volume_calls = sum(int(option.get("volume", 0)) for option in options_data if option["option_type"].upper() == "CALL")
-    total_volume_puts = sum(int(option.get("volume", 0)) for option in options_data if option["option_type"].upper() == "PUT")
-    
-    # Calcular IV ajustada
-    adjusted_iv = [iv[i] + (open_interest[i] * 0.01) if option_type[i] == "CALL" else -(iv[i] + (open_interest[i] * 0.01)) for i in range(len(iv))]
+    total_calls = int(open_interest[chain.is_call].sum())
+    total_puts = int(open_interest[~chain.is_call].sum())
+    total_volume_calls = int(chain.volume[chain.is_call].sum())
+    total_volume_puts = int(chain.volume[~chain.is_call].sum())
     
     # Crear DataFrame y limpiar datos
     skew_df = pd.DataFrame({
         "Strike": strikes,
-        "Adjusted IV (%)": adjusted_iv,
+        "IV (%)": iv,
         "Option Type": option_type,
         "Open Interest": open_interest
     })
+    skew_df = skew_df[skew_df["IV (%)"] > 0]
     # Reemplazar nan con 0 y asegurar valores no negativos
     skew_df["Open Interest"] = skew_df["Open Interest"].fillna(0).astype(int).clip(lower=0)
     
@@ -1294,18 +1431,28 @@ def plot_skew_analysis_with_totals(options_data, current_price=None):
     fig = px.scatter(
         skew_df,
         x="Strike",
-        y="Adjusted IV (%)",
+        y="IV (%)",
         color="Option Type",
         size="Open Interest",
         size_max=30,  # Limitar tamaño máximo para mejor visualización
-        custom_data=["Strike", "Option Type", "Open Interest", "Adjusted IV (%)"],
+        custom_data=["Strike", "Option Type", "Open Interest", "IV (%)"],
         title=f"IV Analysis<br><span style='font-size:16px;'> CALLS: {total_calls} | PUTS: {total_puts} | VC {total_volume_calls} | VP {total_volume_puts}</span>",
         labels={"Option Type": "Contract Type"},
         color_discrete_map={"CALL": "blue", "PUT": "red"}
     )
     fig.update_traces(
-        hovertemplate="<b>Strike:</b> %{customdata[0]:.2f}<br><b>Type:</b> %{customdata[1]}<br><b>Open Interest:</b> %{customdata[2]:,}<br><b>Adjusted IV:</b> %{customdata[3]:.2f}%"
+        hovertemplate="<b>Strike:</b> %{customdata[0]:.2f}<br><b>Type:</b> %{customdata[1]}<br><b>Open Interest:</b> %{customdata[2]:,}<br><b>IV:</b> %{customdata[3]:.2f}%"
     )
+    if smile is not None and strikes.size:
+        smile_strikes = np.linspace(strikes.min(), strikes.max(), 200)
+        fig.add_scatter(
+            x=smile_strikes,
+            y=smile.iv(smile_strikes) * 100,
+            mode="lines",
+            name=f"Fitted Smile ({smile.method.upper()})",
+            line=dict(color="white", width=2),
+            hovertemplate="Strike: %{x:.2f}<br>Fitted IV: %{y:.2f}%<extra></extra>",
+        )
     fig.update_layout(
         xaxis_title="Strike Price",
         yaxis_title="Gummy Bubbles® (%)",
@@ -1314,26 +1461,15 @@ def plot_skew_analysis_with_totals(options_data, current_price=None):
         title_x=0.5
     )
 
-    # Lógica para current_price y max_pain (sin cambios en esta parte)
+    # Lógica para current_price y max_pain
     if current_price is not None and options_data:
-        strikes_dict = {}
-        for option in options_data:
-            strike = float(option["strike"])
-            oi = int(option.get("open_interest", 0) or 0)
-            opt_type = option["option_type"].upper()
-            if strike not in strikes_dict:
-                strikes_dict[strike] = {"CALL": 0, "PUT": 0}
-            strikes_dict[strike][opt_type] += oi
-        strike_prices = sorted(strikes_dict.keys())
-        total_losses = {}
-        for strike in strike_prices:
-            loss_call = sum((strikes_dict[s]["CALL"] * max(0, s - strike)) for s in strike_prices)
-            loss_put = sum((strikes_dict[s]["PUT"] * max(0, strike - s)) for s in strike_prices)
-            total_losses[strike] = loss_call + loss_put
-        max_pain = min(total_losses, key=total_losses.get) if total_losses else None
-
-        avg_iv_calls = sum(iv[i] + (open_interest[i] * 0.01) for i, ot in enumerate(option_type) if ot == "CALL") / max(1, sum(1 for ot in option_type if ot == "CALL"))
-        avg_iv_puts = sum(-(iv[i] + (open_interest[i] * 0.01)) for i, ot in enumerate(option_type) if ot == "PUT") / max(1, sum(1 for ot in option_type if ot == "PUT"))
+        max_pain = max_pain_from_options(options_data).max_pain
+
+        # IV media ponderada por OI de cada lado
+        call_weights = np.where(chain.is_call & (iv > 0), chain.open_interest, 0.0)
+        put_weights = np.where(~chain.is_call & (iv > 0), chain.open_interest, 0.0)
+        avg_iv_calls = float(iv @ call_weights / call_weights.sum()) if call_weights.sum() > 0 else 0.0
+        avg_iv_puts = float(iv @ put_weights / put_weights.sum()) if put_weights.sum() > 0 else 0.0
 
         call_open_interest = total_calls
         put_open_interest = total_puts
@@ -1342,30 +1478,23 @@ def plot_skew_analysis_with_totals(options_data, current_price=None):
         put_size = max(5, min(30, put_open_interest / scale_factor))
 
         if current_price is not None and max_pain is not None:
-            calls_data = [opt for opt in options_data if opt["option_type"].upper() == "CALL"]
-            puts_data = [opt for opt in options_data if opt["option_type"].upper() == "PUT"]
-            closest_call = min(calls_data, key=lambda x: abs(float(x["strike"]) - current_price), default=None)
-            closest_put = min(puts_data, key=lambda x: abs(float(x["strike"]) - current_price), default=None)
-
-            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            exp_date = datetime.strptime(options_data[0].get("expiration_date") or options_data[0].get("expirationDate"), "%Y-%m-%d")
-            days_to_expiration = (exp_date - today).days
-
-            if closest_call:
-                call_strike = float(closest_call["strike"])
-                call_data = {
-                    call_strike: {
-                        'bid': float(closest_call.get("bid", 0)),
-                        'ask': float(closest_call.get("ask", 0)),
-                        'delta': float(closest_call.get("greeks", {}).get("delta", 0.5)),
-                        'gamma': float(closest_call.get("greeks", {}).get("gamma", 0.02)),
-                        'theta': float(closest_call.get("greeks", {}).get("theta", -0.01)),
-                        'iv': float(closest_call.get("implied_volatility", 0.2)),
-                        'open_interest': int(closest_call.get("open_interest", 0)),
-                        'intrinsic': max(current_price - call_strike, 0)
-                    }
-                }
-                rr_calls, profit_calls, prob_otm_calls, _ = calculate_special_monetization(call_data, current_price, days_to_expiration)
+            distance = np.abs(strikes - current_price)
+            closest_call = int(np.argmin(np.where(chain.is_call, distance, np.inf))) if chain.is_call.any() else None
+            closest_put = int(np.argmin(np.where(~chain.is_call, distance, np.inf))) if (~chain.is_call).any() else None
+
+            def closest_metrics(row: int, is_call: bool) -> Dict[str, np.ndarray]:
+                # Greeks del feed cuando existen; si no, el modelo a la IV de la sonrisa
+                row_iv = iv_decimal[row] if iv_decimal[row] > 0 else DEFAULT_IV
+                model = black_scholes_greeks_scalar(current_price, strikes[row], max(days_to_expiration, 0.5) / 365.0,
+                                                    RISK_FREE_RATE, row_iv, is_call)
+                gamma = chain.gamma[row] if chain.has_greeks[row] else model["gamma"]
+                theta = chain.theta[row] if chain.has_greeks[row] else model["theta"]
+                return monetization_metrics(current_price, strikes[row], is_call, chain.bid[row], chain.ask[row],
+                                            gamma, theta, row_iv, days_to_expiration, RISK_FREE_RATE)
+
+            if closest_call is not None:
+                call_metrics = closest_metrics(closest_call, True)
+                rr_calls, profit_calls, prob_otm_calls = (float(call_metrics[k]) for k in ("rr", "profit", "prob_otm"))
                 percent_change_calls = ((current_price - max_pain) / max_pain) * 100 if max_pain != 0 else 0
                 call_loss = abs(current_price - max_pain) * total_calls if current_price < max_pain else (current_price - max_pain) * total_calls
                 potential_move_calls = abs(current_price - max_pain)
@@ -1373,21 +1502,9 @@ def plot_skew_analysis_with_totals(options_data, current_price=None):
             else:
                 rr_calls, profit_calls, prob_otm_calls, percent_change_calls, call_loss, potential_move_calls, direction_calls = 0, 0, 0, 0, 0, 0, "N/A"
 
-            if closest_put:
-                put_strike = float(closest_put["strike"])
-                put_data = {
-                    put_strike: {
-                        'bid': float(closest_put.get("bid", 0)),
-                        'ask': float(closest_put.get("ask", 0)),
-                        'delta': float(closest_put.get("greeks", {}).get("delta", -0.5)),
-                        'gamma': float(closest_put.get("greeks", {}).get("gamma", 0.02)),
-                        'theta': float(closest_put.get("greeks", {}).get("theta", -0.01)),
-                        'iv': float(closest_put.get("implied_volatility", 0.2)),
-                        'open_interest': int(closest_put.get("open_interest", 0)),
-                        'intrinsic': max(put_strike - current_price, 0)
-                    }
-                }
-                rr_puts, profit_puts, prob_otm_puts, _ = calculate_special_monetization(put_data, current_price, days_to_expiration)
+            if closest_put is not None:
+                put_metrics = closest_metrics(closest_put, False)
+                rr_puts, profit_puts, prob_otm_puts = (float(put_metrics[k]) for k in ("rr", "profit", "prob_otm"))
                 percent_change_puts = ((max_pain - current_price) / max_pain) * 100 if max_pain != 0 else 0
                 put_loss = abs(max_pain - current_price) * total_puts if current_price > max_pain else (max_pain - current_price) * total_puts
                 potential_move_puts = abs(max_pain - current_price)
@@ -1395,7 +1512,7 @@ def plot_skew_analysis_with_totals(options_data, current_price=None):
             else:
                 rr_puts, profit_puts, prob_otm_puts, percent_change_puts, put_loss, potential_move_puts, direction_puts = 0, 0, 0, 0, 0, 0, "N/A"
 
-            if call_open_interest > 0 and closest_call:
+            if call_open_interest > 0 and closest_call is not None:
                 fig.add_scatter(
                     x=[current_price],
                     y=[avg_iv_calls],
@@ -1403,7 +1520,7 @@ def plot_skew_analysis_with_totals(options_data, current_price=None):
                     name="Current Price (CALLs)",
                     marker=dict(size=call_size, color="yellow", opacity=0.45, symbol="circle"),
                     hovertemplate=(f"Current Price (CALLs): {current_price:.2f}<br>"
-                                   f"Adjusted IV: {avg_iv_calls:.2f}%<br>"
+                                   f"Avg IV: {avg_iv_calls:.2f}%<br>"
                                    f"Open Interest: {call_open_interest:,}<br>"
                                    f"% to Max Pain: {percent_change_calls:.2f}%<br>"
                                    f"R/R: {rr_calls:.2f}<br>"
@@ -1412,7 +1529,7 @@ def plot_skew_analysis_with_totals(options_data, current_price=None):
                                    f"Direction: {direction_calls}")
                 )
 
-            if put_open_interest > 0 and closest_put:
+            if put_open_interest > 0 and closest_put is not None:
                 fig.add_scatter(
                     x=[current_price],
                     y=[avg_iv_puts],
@@ -1420,7 +1537,7 @@ def plot_skew_analysis_with_totals(options_data, current_price=None):
                     name="Current Price (PUTs)",
                     marker=dict(size=put_size, color="yellow", opacity=0.45, symbol="circle"),
                     hovertemplate=(f"Current Price (PUTs): {current_price:.2f}<br>"
-                                   f"Adjusted IV: {avg_iv_puts:.2f}%<br>"
+                                   f"Avg IV: {avg_iv_puts:.2f}%<br>"
                                    f"Open Interest: {put_open_interest:,}<br>"
                                    f"% to Max Pain: {percent_change_puts:.2f}%<br>"
                                    f"R/R: {rr_puts:.2f}<br>"
@@ -1432,7 +1549,7 @@ def plot_skew_analysis_with_totals(options_data, current_price=None):
         if max_pain is not None:
             fig.add_scatter(
                 x=[max_pain],
-                y=[0],
+                y=[float(smile.iv(max_pain)) * 100 if smile is not None else 0],
                 mode="markers",
                 name="Max Pain",
                 marker=dict(size=15, color="white", symbol="circle"),
@@ -1578,18 +1695,12 @@ def calculate_volatility_sentiment(news):
     return normalized_score, volatility_text
 
 def fetch_batch_stock_data(tickers):
-    tickers_str = ",".join(tickers)
-    url = f"{TRADIER_BASE_URL}/markets/quotes"
-    params = {"symbols": tickers_str}
-    response = requests.get(url, headers=HEADERS_TRADIER, params=params)
-    if response.status_code == 200:
-        data = response.json().get("quotes", {}).get("quote", [])
-        if isinstance(data, dict):
-            data = [data]
-        return [{"Ticker": item.get("symbol", ""), "Price": item.get("last", 0), "Change (%)": item.get("change_percentage", 0),
-                 "Volume": item.get("volume", 0), "Average Volume": item.get("average_volume", 1),
-                 "IV": item.get("implied_volatility", None), "HV": item.get("historical_volatility", None),
-                 "Previous Close": item.get("prev_close", 0)} for item in data]
+    quotes = QUOTE_SERVICE.get_many(tickers)
+    if quotes:
+        return [{"Ticker": q.symbol, "Price": q.last, "Change (%)": q.change_percentage,
+                 "Volume": q.volume, "Average Volume": q.average_volume or 1,
+                 "IV": q.iv, "HV": q.raw.get("historical_volatility"),
+                 "Previous Close": q.prev_close} for q in quotes.values()]
     st.error("⏳ Batch data is being retrieved. Please refresh to try again.")
     return []
 
@@ -1604,62 +1715,35 @@ def calculate_options_activity(data):
     df["Options Activity"] = df["Volumen Relativo"] * df["IV"]
     return df.sort_values("Options Activity", ascending=False).head(3)
 
-def calculate_rsi(prices: List[float], period: int = 14) -> Optional[float]:
-    prices = np.array(prices)
-    if len(prices) < period + 1:
-        return None
-    deltas = np.diff(prices)
-    gains = np.where(deltas > 0, deltas, 0)
-    losses = np.where(deltas < 0, -deltas, 0)
-    avg_gain = np.mean(gains[-period:])
-    avg_loss = np.mean(losses[-period:])
-    return 100 - (100 / (1 + avg_gain / avg_loss)) if avg_loss != 0 else 100
-
-def calculate_sma(prices: List[float], period: int = 20) -> Optional[float]:
-    prices = np.array(prices)
-    if len(prices) < period:
-        return None
-    return np.mean(prices[-period:])
+def _fetch_fmp_daily_bars(symbol: str, since: Optional[date]) -> np.ndarray:
+    """Daily bars from FMP for the OHLCV store: everything from ``since``, or the initial history."""
+    params = {"apikey": FMP_API_KEY}
+    if since:
+        params["from"] = since.isoformat()
+    else:
+        params["timeseries"] = OHLCV_INITIAL_BARS
+    data = HTTP_CLIENT.get_json("fmp", f"/historical-price-full/{symbol}", params=params)
+    return bars_from_records(data.get("historical") or [] if isinstance(data, dict) else [])
 
 def scan_stock_batch(tickers: List[str], scan_type: str, breakout_period=10, volume_threshold=2.0) -> List[Dict]:
-    prices_dict = get_current_prices(tickers)
-    results = []
-    with ThreadPoolExecutor(max_workers=num_workers) as executor:
-        futures = {executor.submit(get_historical_prices_combined, ticker, limit=breakout_period+1): ticker for ticker in tickers}
-        for future in futures:
-            ticker = futures[future]
-            try:
-                prices, volumes = future.result()
-                if len(prices) <= breakout_period or not volumes:
-                    continue
-                current_price = prices_dict.get(ticker, 0.0)
-                if current_price == 0.0:
-                    continue
-                prices = np.array(prices)
-                volumes = np.array(volumes)
-                rsi = calculate_rsi(prices)
-                sma = calculate_sma(prices)
-                avg_volume = np.mean(volumes)
-                current_volume = volumes[-1]
-                recent_high = np.max(prices[-breakout_period:])
-                recent_low = np.min(prices[-breakout_period:])
-                last_price = prices[-1]
-                near_support = abs(last_price - recent_low) / recent_low <= 0.05
-                near_resistance = abs(last_price - recent_high) / recent_high <= 0.05
-                breakout_type = "Up" if last_price > recent_high else "Down" if last_price < recent_low else None
-                possible_change = (recent_low - last_price) / last_price * 100 if near_support else (recent_high - last_price) / last_price * 100 if near_resistance else None
-
-                if scan_type == "Bullish (Upward Momentum)" and sma and last_price > sma and rsi and rsi < 70:
-                    results.append({"Symbol": ticker, "Last Price": last_price, "SMA": round(sma, 2), "RSI": round(rsi, 2), "Volume": current_volume, "Breakout Type": breakout_type, "Possible Change (%)": round(possible_change, 2) if possible_change else None})
-                elif scan_type == "Bearish (Downward Momentum)" and sma and last_price < sma and rsi and rsi > 30:
-                    results.append({"Symbol": ticker, "Last Price": last_price, "SMA": round(sma, 2), "RSI": round(rsi, 2), "Volume": current_volume, "Breakout Type": breakout_type, "Possible Change (%)": round(possible_change, 2) if possible_change else None})
-                elif scan_type == "Breakouts" and breakout_type:
-                    results.append({"Symbol": ticker, "Breakout Type": breakout_type, "Last Price": last_price, "Recent High": recent_high, "Recent Low": recent_low, "Volume": current_volume, "Possible Change (%)": round(possible_change, 2) if possible_change else None})
-                elif scan_type == "Unusual Volume" and current_volume > volume_threshold * avg_volume:
-                    results.append({"Symbol": ticker, "Volume": current_volume, "Avg Volume": avg_volume, "Last Price": last_price})
-            except Exception as e:
-                logger.error(f"Error scanning {ticker}: {e}")
-    return results
+    """Technical scan over the whole universe from the local OHLCV store (one vectorized pass).
+
+    Symbols never stored are downloaded before scanning, so a new universe
+    is not scanned empty; stored but stale symbols are queued for the
+    background refresh and scanned from their stored bars meanwhile.
+    """
+    missing = OHLCV_STORE.missing(tickers)
+    if missing:
+        OHLCV_STORE.refresh(missing, _fetch_fmp_daily_bars)
+    OHLCV_STORE.schedule(tickers, _fetch_fmp_daily_bars)
+    panel = OHLCV_STORE.panel(tickers, bars=max(SCAN_HISTORY_BARS, breakout_period + 1))
+    return scan_panel(panel, scan_type, breakout_period, volume_threshold)
+
+def get_daily_atr(symbol: str, period: int = 14) -> Optional[float]:
+    """Wilder ATR of the daily bars in the OHLCV store (refreshed first); None without enough history."""
+    OHLCV_STORE.refresh([symbol], _fetch_fmp_daily_bars)
+    panel = OHLCV_STORE.panel([symbol], bars=SCAN_HISTORY_BARS)
+    return last_value(average_true_range(panel.high, panel.low, panel.close, period))
 
 def get_financial_metrics(symbol: str) -> Dict[str, float]:
     """Get financial metrics from FMP only (sin backend)"""
@@ -1668,7 +1752,7 @@ def get_financial_metrics(symbol: str) -> Dict[str, float]:
     try:
         url = f"{FMP_BASE_URL}/ratios/{symbol}"
         params = {"apikey": FMP_API_KEY}
-        response = requests.get(url, params=params, timeout=5)
+        response = HTTP_CLIENT.get("fmp", url, params=params, timeout=5)
         response.raise_for_status()
         data = response.json()
         
@@ -1691,7 +1775,7 @@ def get_financial_metrics(symbol: str) -> Dict[str, float]:
     try:
         url = f"{FMP_BASE_URL}/enterprise-values/{symbol}"
         params = {"apikey": FMP_API_KEY}
-        response = requests.get(url, params=params, timeout=5)
+        response = HTTP_CLIENT.get("fmp", url, params=params, timeout=5)
         response.raise_for_status()
         data = response.json()
         
@@ -1712,7 +1796,7 @@ def get_financial_metrics(symbol: str) -> Dict[str, float]:
 
 def get_historical_prices_fmp(symbol: str, period: str = "daily", limit: int = 30) -> tuple[List[float], List[int]]:
     try:
-        response = requests.get(f"{FMP_BASE_URL}/historical-price-full/{symbol}?apikey={FMP_API_KEY}&timeseries={limit}")
+        response = HTTP_CLIENT.get("fmp", f"{FMP_BASE_URL}/historical-price-full/{symbol}?apikey={FMP_API_KEY}&timeseries={limit}")
         response.raise_for_status()
         data = response.json()
         if not data or "historical" not in data:
@@ -1725,8 +1809,8 @@ def get_historical_prices_fmp(symbol: str, period: str = "daily", limit: int = 3
         return [], []
 
 def speculate_next_day_movement(metrics: Dict[str, float], prices: List[float], volumes: List[int]) -> tuple[str, float, Optional[float]]:
-    sma = calculate_sma(prices, period=50)
-    rsi = calculate_rsi(prices, period=14)
+    sma = last_value(rolling_sma(prices, period=50)) if prices else None
+    rsi = last_value(wilder_rsi(prices, period=14)) if prices else None
     recent_high = max(prices[-10:]) if len(prices) >= 10 else None
     recent_low = min(prices[-10:]) if len(prices) >= 10 else None
     last_price = prices[-1] if prices else None
@@ -1758,35 +1842,20 @@ def speculate_next_day_movement(metrics: Dict[str, float], prices: List[float],
     return trend, confidence, predicted_price
 
 def get_option_data(symbol: str, expiration_date: str) -> pd.DataFrame:
-    url = f"{TRADIER_BASE_URL}/markets/options/chains"
-    params = {"symbol": symbol, "expiration": expiration_date, "greeks": "true"}
     try:
-        response = requests.get(url, headers=HEADERS_TRADIER, params=params, timeout=10)
-        if response.status_code != 200:
-            st.info("Option data is being synchronized. Please refresh to retry.")
-            logger.error(f"API request failed for {symbol} with expiration {expiration_date}: Status {response.status_code}")
-            return pd.DataFrame()
-        
-        data = response.json()
-        if data is None or not isinstance(data, dict):
-            st.error(f"Datos de opciones inválidos para {symbol}. Respuesta vacía o no JSON.")
-            logger.error(f"Invalid JSON response for {symbol}: {response.text}")
+        options = fetch_tradier_chain(symbol, expiration_date).options
+        if not options:
+            st.warning(f"No se encontraron contratos de opciones para {symbol} en {expiration_date}.")
+            logger.info(f"No option contracts found for {symbol} on {expiration_date}")
             return pd.DataFrame()
-        
-        if 'options' in data and isinstance(data['options'], dict) and 'option' in data['options']:
-            options = data['options']['option']
-            if not options:
-                st.warning(f"No se encontraron contratos de opciones para {symbol} en {expiration_date}.")
-                logger.info(f"No option contracts found for {symbol} on {expiration_date}")
-                return pd.DataFrame()
-            df = pd.DataFrame(options)
-            df['action'] = df.apply(lambda row: "buy" if (row.get("bid", 0) > 0 and row.get("ask", 0) > 0) else "sell", axis=1)
-            return df
-        
-        st.error(f"No se encontraron datos de opciones válidos en la respuesta para {symbol}.")
-        logger.error(f"Options data missing or malformed for {symbol}: {data}")
-        return pd.DataFrame()
+        df = pd.DataFrame(options)
+        df['action'] = df.apply(lambda row: "buy" if (row.get("bid", 0) > 0 and row.get("ask", 0) > 0) else "sell", axis=1)
+        return df
     
+    except requests.HTTPError as e:
+        st.info("Option data is being synchronized. Please refresh to retry.")
+        logger.error(f"API request failed for {symbol} with expiration {expiration_date}: {str(e)}")
+        return pd.DataFrame()
     except requests.RequestException as e:
         st.error(f"⏳ Datos de opciones para {symbol} siendo procesados. Por favor refresca.")
         logger.error(f"Network error fetching options for {symbol}: {str(e)}")
@@ -1804,7 +1873,7 @@ def fetch_data(endpoint: str, ticker: str = None, additional_params: dict = None
     if additional_params:
         params.update(additional_params)
     try:
-        response = requests.get(url, params=params)
+        response = HTTP_CLIENT.get("fmp", url, params=params)
         if response.status_code == 200:
             data = response.json()
             if isinstance(data, list) and len(data) == 0:
@@ -1826,179 +1895,38 @@ def get_institutional_holders_list(ticker: str):
 
 
 
-def estimate_greeks(strike: float, current_price: float, days_to_expiration: int, iv: float, option_type: str) -> Dict[str, float]:
-    t = days_to_expiration / 365.0
-    if iv <= 0 or t <= 0:
-        return {'delta': 0.0, 'gamma': 0.0, 'theta': 0.0, 'vega': 0.0}
-    s = current_price
-    k = strike
-    r = RISK_FREE_RATE
-    sigma = iv
-    d1 = (np.log(s / k) + (r + 0.5 * sigma**2) * t) / (sigma * np.sqrt(t))
-    d2 = d1 - sigma * np.sqrt(t)
-    if option_type == "CALL":
-        delta = norm.cdf(d1)
-        theta = (-s * norm.pdf(d1) * sigma / (2 * np.sqrt(t)) - r * k * np.exp(-r * t) * norm.cdf(d2)) / 365.0
-    else:
-        delta = norm.cdf(d1) - 1
-        theta = (-s * norm.pdf(d1) * sigma / (2 * np.sqrt(t)) + r * k * np.exp(-r * t) * norm.cdf(-d2)) / 365.0
-    gamma = norm.pdf(d1) / (s * sigma * np.sqrt(t))
-    vega = s * norm.pdf(d1) * np.sqrt(t) / 100.0
-    return {'delta': delta, 'gamma': gamma, 'theta': theta, 'vega': vega}
-
-def analyze_options(options_data: List[Dict], current_price: float) -> Dict[str, Dict[float, Dict[str, float]]]:
-    analysis = {"CALL": {}, "PUT": {}}
-    if not options_data:
-        logger.warning("No options data to analyze")
-        return analysis
+def estimate_greeks(strike: float, current_price: float, days_to_expiration: int, iv: float, option_type: str,
+                    smile: Optional[SmileFit] = None) -> Dict[str, float]:
+    if (not iv or iv <= 0) and smile is not None:
+        iv = float(smile.iv(strike))
+    greeks = black_scholes_greeks_scalar(current_price, strike, days_to_expiration / 365.0, RISK_FREE_RATE, iv, option_type == "CALL")
+    return {k: greeks[k] for k in ('delta', 'gamma', 'theta', 'vega')}
+
+def get_days_to_expiration(expiration_date: str) -> int:
     today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    exp_date = datetime.strptime(options_data[0].get("expiration_date") or options_data[0].get("expirationDate"), "%Y-%m-%d")
-    days_to_exp = (exp_date - today).days
-    
-    for option in options_data:
-        try:
-            strike = float(option["strike"])
-            option_type = option["option_type"].upper() if "option_type" in option else ("CALL" if option.get("type") == "call" else "PUT")
-            bid_ask_spread = float(option.get('ask', 0)) - float(option.get('bid', 0))
-            iv = float(option.get('implied_volatility', 0) or option.get('impliedVolatility', 0) or 0)
-            volume = int(option.get('volume', 0) or 0)
-            open_interest = int(option.get('open_interest', 0) or option.get('openInterest', 0) or 0)
-            intrinsic = max(current_price - strike, 0) if option_type == "CALL" else max(strike - current_price, 0)
-            greek = option.get("greeks", {})
-            
-            if greek and all(greek.get(k) is not None and greek.get(k) != 0 for k in ['delta', 'gamma']):
-                delta = float(greek.get('delta', 0))
-                gamma = float(greek.get('gamma', 0))
-                theta = float(greek.get('theta', 0))
-                vega = float(greek.get('vega', 0))
-            else:
-                estimated = estimate_greeks(strike, current_price, days_to_exp, iv if iv > 0 else 0.2, option_type)
-                delta = estimated['delta']
-                gamma = estimated['gamma']
-                theta = estimated['theta']
-                vega = estimated['vega']
-            
-            if strike not in analysis[option_type]:
-                analysis[option_type][strike] = {
-                    'gamma': gamma,
-                    'vega': vega,
-                    'theta': theta,
-                    'delta': delta,
-                    'iv': iv if iv > 0 else 0.2,
-                    'bid': float(option.get('bid', 0)),
-                    'ask': float(option.get('ask', 0)),
-                    'spread': bid_ask_spread,
-                    'open_interest': open_interest,
-                    'volume': volume,
-                    'intrinsic': intrinsic
-                }
-        except (ValueError, TypeError) as e:
-            logger.error(f"Error analyzing option: {e} - {option}")
-    logger.info(f"Analyzed: {len(analysis['CALL'])} CALLs, {len(analysis['PUT'])} PUTs")
-    return analysis
-
-def calculate_special_monetization(data: Dict, current_price: float, days_to_expiration: int) -> Tuple[float, float, float, str]:
-    strike = list(data.keys())[0]
-    option_type = 'CALL' if data[strike]['delta'] > 0 else 'PUT'
-    mid_price = (data[strike]['bid'] + data[strike]['ask']) / 2
-    delta = abs(data[strike]['delta'])
-    gamma = data[strike]['gamma']
-    theta = data[strike]['theta']
-    iv = data[strike]['iv']
-    intrinsic = data[strike]['intrinsic']
-    open_interest = data[strike]['open_interest']
-    
-    gamma_iv_index = gamma * iv * (open_interest / 1000000.0) if gamma > 0 and iv > 0 else 0.001
-    t = days_to_expiration / 365.0
-    d1 = (np.log(current_price / strike) + (RISK_FREE_RATE + 0.5 * iv**2) * t) / (iv * np.sqrt(t))
-    prob_otm = norm.cdf(-d1) if option_type == "PUT" else norm.cdf(d1)
-    
-    direction_factor = 1 if (option_type == "CALL" and current_price > strike) or (option_type == "PUT" and current_price < strike) else 0.5
-    monetization_factor = mid_price * (1 + abs(theta) / (gamma + 0.001)) * direction_factor
-    
-    potential_profit = monetization_factor * 100
-    risk = mid_price * 100 * (1 - prob_otm) * (1 + gamma * 5)
-    rr_ratio = potential_profit / risk if risk > 0 else 10.0
-    action = "SELL" if prob_otm > 0.5 else "BUY"
-    
-    logger.debug(f"Strike {strike}: Gamma-IV Index={gamma_iv_index:.4f}, RR={rr_ratio:.2f}, Prob OTM={prob_otm:.2%}, Mid Price={mid_price}, Profit={potential_profit:.2f}, Open Interest={open_interest}")
-    return rr_ratio, potential_profit, prob_otm, action
+    return (datetime.strptime(expiration_date, "%Y-%m-%d") - today).days
 
-def generate_contract_suggestions(ticker: str, options_data: List[Dict], current_price: float, open_interest_threshold: int, gamma_threshold: float) -> List[Dict]:
+@st.cache_data(ttl=CACHE_TTL)
+def get_contract_candidates(ticker: str, expiration_date: str, current_price: float) -> Optional[ContractCandidates]:
+    """Greeks y métricas de monetización de toda la cadena, calculadas una sola vez por precio.
+
+    Los sliders de OI/gamma filtran este resultado con ``.suggest()`` sin recalcular nada.
+    """
+    options_data = get_options_data(ticker, expiration_date)
     if not options_data or not current_price:
-        logger.error("No options data or invalid price")
-        return []
-    
-    exp_date = datetime.strptime(options_data[0].get("expiration_date") or options_data[0].get("expirationDate"), "%Y-%m-%d")
-    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    days_to_expiration = (exp_date - today).days
-    if days_to_expiration < 0:
-        logger.error(f"Expiration date {exp_date} is in the past")
-        return []
-    
-    options_analysis = analyze_options(options_data, current_price)
-    if not options_analysis["CALL"] and not options_analysis["PUT"]:
-        return []
-    
-    max_pain_strike = calculate_max_pain_optimized(options_data)
-    
-    suggestions = []
-    for option_type in ["CALL", "PUT"]:
-        strikes = sorted(options_analysis[option_type].keys())
-        relevant_strikes = [s for s in strikes if (option_type == "CALL" and s > current_price) or (option_type == "PUT" and s < current_price)]
-        
-        if not relevant_strikes:
-            logger.warning(f"No OTM strikes for {option_type}")
-        
-        for strike in relevant_strikes:
-            data = options_analysis[option_type][strike]
-            open_interest = data['open_interest']
-            gamma = data['gamma']
-            if open_interest >= open_interest_threshold and gamma >= gamma_threshold:
-                rr_ratio, profit, prob_otm, action = calculate_special_monetization({strike: data}, current_price, days_to_expiration)
-                vol_category = "HighOpenInterest"
-                reason = f"{vol_category}: Strike {strike}, Gamma {data['gamma']:.4f}, IV {data['iv']:.2f}, Delta {data['delta']:.2f}, RR {rr_ratio:.2f}, Prob OTM {prob_otm:.2%}, Profit ${profit:.2f}, OI {open_interest}"
-                suggestions.append({
-                    "Action": action,
-                    "Type": option_type,
-                    "Strike": strike,
-                    "Reason": reason,
-                    "Gamma": data['gamma'],
-                    "IV": data['iv'],
-                    "Delta": data['delta'],
-                    "RR": rr_ratio,
-                    "Prob OTM": prob_otm,
-                    "Profit": profit,
-                    "Open Interest": open_interest,
-                    "IsMaxPain": strike == max_pain_strike
-                })
-                logger.info(f"Added {option_type} strike {strike}: Open Interest={open_interest}, Gamma={data['gamma']:.4f}, IV={data['iv']:.2f}, Max Pain={strike == max_pain_strike}")
-    
-    if max_pain_strike:
-        for option_type in ["CALL", "PUT"]:
-            if max_pain_strike in options_analysis[option_type]:
-                data = options_analysis[option_type][max_pain_strike]
-                rr_ratio, profit, prob_otm, action = calculate_special_monetization({max_pain_strike: data}, current_price, days_to_expiration)
-                reason = f"MaxPain: Strike {max_pain_strike}, Gamma {data['gamma']:.4f}, IV {data['iv']:.2f}, Delta {data['delta']:.2f}, RR {rr_ratio:.2f}, Prob OTM {prob_otm:.2%}, Profit ${profit:.2f}, OI {data['open_interest']}"
-                if not any(s["Strike"] == max_pain_strike and s["Type"] == option_type for s in suggestions):
-                    suggestions.append({
-                        "Action": action,
-                        "Type": option_type,
-                        "Strike": max_pain_strike,
-                        "Reason": reason,
-                        "Gamma": data['gamma'],
-                        "IV": data['iv'],
-                        "Delta": data['delta'],
-                        "RR": rr_ratio,
-                        "Prob OTM": prob_otm,
-                        "Profit": profit,
-                        "Open Interest": data['open_interest'],
-                        "IsMaxPain": True
-                    })
-                    logger.info(f"Added Max Pain {option_type} strike {max_pain_strike}")
+        return None
+    return build_contract_candidates(options_data, current_price, get_volatility_smile(ticker, expiration_date, current_price))
 
-    logger.info(f"Generated {len(suggestions)} suggestions for {exp_date.strftime('%Y-%m-%d')} with OI >= {open_interest_threshold}, Gamma >= {gamma_threshold}")
-    return suggestions
+def build_contract_candidates(options_data: List[Dict], current_price: float,
+                              smile: Optional[SmileFit] = None) -> Optional[ContractCandidates]:
+    days_to_expiration = get_days_to_expiration(options_data[0].get("expiration_date") or options_data[0].get("expirationDate"))
+    if days_to_expiration < 0:
+        logger.error(f"Expiration {days_to_expiration} days in the past")
+        return None
+    return ContractCandidates.from_chain(
+        OptionChain.from_records(options_data), current_price, days_to_expiration,
+        calculate_max_pain_optimized(options_data), RISK_FREE_RATE, smile,
+    )
 
 
 
@@ -2121,42 +2049,30 @@ def generate_contract_suggestions(ticker: str, options_data: List[Dict], current
 
 
 
-def calculate_volume_power_flow(historical_data, current_price, bin_size=100):
-    """Calcular flujo de volumen por precio con Power Index y datos para velas de ballenas."""
-    df = pd.DataFrame(historical_data)
-    df["date"] = pd.to_datetime(df["date"], errors='coerce')
-    df = df.sort_values("date")
-    
-    # Calcular buy/sell volume
-    df["price_change"] = df["close"].diff()
-    df["buy_volume"] = df.apply(lambda row: row["volume"] if row["price_change"] > 0 else 0, axis=1)
-    df["sell_volume"] = df.apply(lambda row: row["volume"] if row["price_change"] < 0 else 0, axis=1)
-    df["net_volume"] = df["buy_volume"] - df["sell_volume"]
-    
-    # Bins por precio
-    min_price = df["close"].min()
-    max_price = df["close"].max()
-    price_bins = np.arange(min_price - bin_size, max_price + bin_size, bin_size)
-    df["price_bin"] = pd.cut(df["close"], bins=price_bins, labels=price_bins[:-1])
-    
-    flow_data = df.groupby("price_bin").agg({
-        "buy_volume": "sum",
-        "sell_volume": "sum",
-        "net_volume": "sum",
-        "close": ["min", "max"]  # Para velas de ballenas
-    }).reset_index()
-    flow_data.columns = ["price_bin", "buy_volume", "sell_volume", "net_volume", "price_min", "price_max"]
-    flow_data["price_bin"] = flow_data["price_bin"].astype(float)
-    
-    # Power Index
-    flow_data["power_index"] = flow_data["net_volume"] / (flow_data["buy_volume"] + flow_data["sell_volume"]).replace(0, 1) * 100
-    
-    # Soporte y resistencia
-    support = flow_data[flow_data["price_bin"] < current_price].nlargest(1, "buy_volume")["price_bin"].iloc[0] if not flow_data[flow_data["price_bin"] < current_price].empty else current_price
-    resistance = flow_data[flow_data["price_bin"] > current_price].nlargest(1, "sell_volume")["price_bin"].iloc[0] if not flow_data[flow_data["price_bin"] > current_price].empty else current_price
+def calculate_volume_power_flow(historical_data, current_price, bin_size=None, symbol=None):
+    """Calcular flujo de volumen por precio con Power Index y datos para velas de ballenas.
+
+    ``bin_size`` None elige el ancho según el rango de precios y el tick. Con
+    ``symbol`` el histograma base se construye una vez por símbolo y día y
+    solo se le suman las barras nuevas; cada resolución sale de sumar bins
+    adyacentes del histograma base.
+    """
+    df = bars_from_history(historical_data)
+    close = df["close"].to_numpy(dtype=float)
+    volume = df["volume"].to_numpy(dtype=float)
+    timestamps = df["date"].to_numpy()
+    if symbol and not df["date"].isna().all():
+        day = df["date"].max().date()
+        base = VOLUME_PROFILES.profile(symbol, day, close, volume, timestamps)
+    else:
+        base = MultiResolutionProfile.from_bars(close, volume, timestamps)
     
-    # Zonas de acumulación (ballenas)
-    accumulation_zones = flow_data.nlargest(3, "buy_volume")[["price_bin", "buy_volume", "price_min", "price_max"]]
+    # Bins por precio, soporte/resistencia y zonas de acumulación (ballenas) desde el histograma base
+    profile = base.at_bin_size(bin_size) if bin_size else base.resolution(VOLUME_PROFILE_BINS)
+    flow_data = profile.to_frame()
+    support = profile.support(current_price)
+    resistance = profile.resistance(current_price)
+    accumulation_zones = profile.accumulation_zones(3)
     
     return flow_data, support, resistance, accumulation_zones
 
@@ -2249,33 +2165,21 @@ def plot_volume_power_flow(flow_data, current_price, support, resistance, accumu
     )
     return fig
 
+def liquidity_pulse_frame(historical_data) -> pd.DataFrame:
+    """Volumen comprador/vendedor por barra, la tabla que dibuja plot_liquidity_pulse."""
+    df = bars_from_history(historical_data)
+    price_change, buy_volume, sell_volume = signed_volume(df["close"].to_numpy(dtype=float), df["volume"].to_numpy(dtype=float))
+    df["price_change"] = price_change
+    df["buy_volume"] = buy_volume
+    df["sell_volume"] = sell_volume
+    df["net_volume"] = buy_volume - sell_volume
+    return df
+
 def calculate_liquidity_pulse(historical_data, current_price):
     """Calcular pulso de liquidez diario con target proyectado."""
-    df = pd.DataFrame(historical_data)
-    df["date"] = pd.to_datetime(df["date"], errors='coerce')
-    df = df.sort_values("date")
-    
-    df["price_change"] = df["close"].diff()
-    df["buy_volume"] = df.apply(lambda row: row["volume"] if row["price_change"] > 0 else 0, axis=1)
-    df["sell_volume"] = df.apply(lambda row: row["volume"] if row["price_change"] < 0 else 0, axis=1)
-    df["net_volume"] = df["buy_volume"] - df["sell_volume"]
-    
-    net_pressure = df["net_volume"].sum()
-    trend = "Bullish" if df["price_change"].iloc[-5:].mean() > 0 else "Bearish"
-    volatility = df["close"].pct_change().std() * np.sqrt(365) * 100
-    
-    valid_df = df.dropna(subset=["price_change", "net_volume"])
-    valid_df = valid_df[valid_df["net_volume"] != 0]
-    if not valid_df.empty:
-        sensitivity = valid_df["price_change"] / (valid_df["net_volume"] / 1_000_000)
-        sensitivity_avg = sensitivity.replace([np.inf, -np.inf], np.nan).mean()
-    else:
-        sensitivity_avg = 0
-    
-    last_net_volume = df["net_volume"].iloc[-1] / 1_000_000 if df["net_volume"].iloc[-1] != 0 else 0
-    price_target = current_price if pd.isna(sensitivity_avg) or sensitivity_avg == 0 else current_price + (last_net_volume * sensitivity_avg)
-    
-    return df, net_pressure, trend, volatility, price_target
+    df = liquidity_pulse_frame(historical_data)
+    pulse = liquidity_pulse(df["close"].to_numpy(dtype=float), df["volume"].to_numpy(dtype=float), current_price)
+    return df, pulse.net_pressure, pulse.trend, pulse.volatility, pulse.price_target
 
 def plot_liquidity_pulse(df, current_price, price_target):
     """Gráfica de Liquidity Pulse con target."""
@@ -2336,7 +2240,12 @@ def plot_liquidity_pulse(df, current_price, price_target):
     return fig
 
 def get_intraday_data(ticker: str, interval="1min", limit=5) -> Tuple[List[float], List[int]]:
-    """Obtiene datos intradiarios para IFM."""
+    """Obtiene datos intradiarios para IFM (barras de 1 minuto desde INTRADAY_STREAM)."""
+    if interval == "1min":
+        bars = INTRADAY_STREAM.refresh(ticker, datetime.now() - timedelta(minutes=limit))[-limit:]
+        if bars.size:
+            return bars["close"].tolist(), bars["volume"].astype(int).tolist()
+        return [0.0] * limit, [0] * limit
     url = f"{TRADIER_BASE_URL}/markets/history"
     params = {"symbol": ticker, "interval": interval, "start": (datetime.now() - timedelta(minutes=limit)).strftime("%Y-%m-%d %H:%M:%S")}
     data = fetch_api_data(url, params, HEADERS_TRADIER, "Tradier Intraday")
@@ -2453,7 +2362,7 @@ def get_macro_factors() -> Dict[str, float]:
 
 
 @st.cache_data(ttl=60)
-def get_intraday_prices(ticker: str, interval: str, hours_back: int) -> Tuple[List[float], List[str]]:
+def _fetch_intraday_timesales(ticker: str, interval: str, hours_back: int) -> Tuple[List[float], List[str]]:
     url = f"{TRADIER_BASE_URL}/markets/timesales"
     end_time = datetime.now()
     start_time = end_time - timedelta(hours=hours_back)
@@ -2468,53 +2377,117 @@ def get_intraday_prices(ticker: str, interval: str, hours_back: int) -> Tuple[Li
         if "series" in data and isinstance(data["series"], dict) and "data" in data["series"]:
             prices = [float(entry["close"]) for entry in data["series"]["data"]]
             timestamps = [entry["time"] for entry in data["series"]["data"]]
-            logger.info(f"Fetched {len(prices)} intraday prices for {ticker} over {hours_back} hours")
             return prices, timestamps
+    logger.warning(f"No intraday data for {ticker}. Response: {data}")
+    return [], []
+
+def get_intraday_prices(ticker: str, interval: str, hours_back: int) -> Tuple[List[float], List[str]]:
+    """Precios intradía; las barras de 1 minuto salen del ring buffer de INTRADAY_STREAM (solo barras nuevas)."""
+    end_time = datetime.now()
+    if interval == "1min":
+        bars = INTRADAY_STREAM.refresh(ticker, end_time - timedelta(hours=hours_back))
+        prices, timestamps = bars["close"].tolist(), [str(t) for t in bars["time"]]
+    else:
+        prices, timestamps = _fetch_intraday_timesales(ticker, interval, hours_back)
+    if prices:
+        logger.info(f"Fetched {len(prices)} intraday prices for {ticker} over {hours_back} hours")
+        return prices, timestamps
     # Fallback si la API falla
     current_price = get_current_price(ticker) or 100.0
-    logger.warning(f"No intraday data for {ticker}, using current price: ${current_price}. Response: {data}")
+    logger.warning(f"No intraday data for {ticker}, using current price: ${current_price}")
     return [current_price] * max(2, hours_back), [(end_time - timedelta(hours=i)).strftime("%Y-%m-%d %H:%M:%S") for i in range(max(2, hours_back))]
 
+def get_intraday_flows(ticker: str, current_price: float, hours_back: int = 8):
+    """Volume Power Flow y Liquidity Pulse intradía, actualizados solo con las barras nuevas del stream.
+
+    Devuelve ``(flow_data, support, resistance, accumulation_zones, pulse, bars)`` o None sin barras
+    cerradas; ``bars`` es la ventana de barras de 1 minuto de la sesión del pulso.
+    """
+    window = INTRADAY_STREAM.refresh(ticker, datetime.now() - timedelta(hours=hours_back))
+    profile = INTRADAY_FLOWS.profile(ticker)
+    pulse = INTRADAY_FLOWS.pulse(ticker, current_price)
+    if profile is None or pulse is None or not window.size:
+        return None
+    days = window["time"].astype("datetime64[D]")
+    bars = window[days == days[-1]]
+    view = profile.resolution(VOLUME_PROFILE_BINS)
+    return view.to_frame(), view.support(current_price), view.resistance(current_price), view.accumulation_zones(3), pulse, bars
+
 
 
 @st.cache_data(ttl=300)
-def process_options_data(ticker: str, expiration_date: str) -> Tuple[Dict, set, float, pd.DataFrame]:
-    options_data = get_options_data(ticker, expiration_date)
-    if not options_data:
-        return {}, set(), None, pd.DataFrame(columns=["strike", "total_loss"])
-    
-    processed_data = {}
-    strikes_data = {}
-    for opt in options_data:
-        if not isinstance(opt, dict):
-            continue
-        strike = float(opt.get("strike", 0))
-        opt_type = opt.get("option_type", "").upper()
-        oi = int(opt.get("open_interest", 0))
-        gamma = float(opt.get("greeks", {}).get("gamma", 0)) if isinstance(opt.get("greeks", {}), dict) else 0
-        if strike not in processed_data:
-            processed_data[strike] = {"CALL": {"OI": 0, "Gamma": 0}, "PUT": {"OI": 0, "Gamma": 0}}
-            strikes_data[strike] = {"CALL": 0, "PUT": 0}
-        processed_data[strike][opt_type]["OI"] += oi
-        processed_data[strike][opt_type]["Gamma"] += gamma
-        strikes_data[strike][opt_type] += oi
+def process_options_data(ticker: str, expiration_date: str) -> Tuple[Dict, Dict, float, pd.DataFrame]:
+    chain = get_option_chain_columns(ticker, expiration_date, max_age=CHAIN_MAX_AGE_ANALYTICS)
+    if not len(chain):
+        return {}, {}, None, pd.DataFrame(columns=["strike", "total_loss"])
+    
+    call_oi = chain.per_strike(chain.open_interest, CALL)
+    put_oi = chain.per_strike(chain.open_interest, PUT)
+    call_gamma = chain.per_strike(chain.gamma, CALL)
+    put_gamma = chain.per_strike(chain.gamma, PUT)
+    processed_data = {
+        float(strike): {
+            "CALL": {"OI": int(call_oi[i]), "Gamma": float(call_gamma[i])},
+            "PUT": {"OI": int(put_oi[i]), "Gamma": float(put_gamma[i])},
+        }
+        for i, strike in enumerate(chain.strikes)
+    }
     
-    prices, _ = get_historical_prices_combined(ticker)
-    touched_strikes = detect_touched_strikes(processed_data.keys(), prices)
-    max_pain = calculate_max_pain_optimized(options_data)
+    # Rango [low, high] de cada sesión del OHLCV_STORE; cierres consecutivos (sin fechas) si no hay barras
+    OHLCV_STORE.refresh([ticker], _fetch_fmp_daily_bars)
+    bars = OHLCV_STORE.load(ticker)[-TOUCH_HISTORY_BARS:]
+    if bars.size:
+        touched_strikes = detect_touched_strikes(
+            processed_data.keys(), np.fmin(bars["low"], bars["close"]), np.fmax(bars["high"], bars["close"]),
+            bars["date"].astype(str),
+        )
+    else:
+        prices, _ = get_historical_prices_combined(ticker, limit=TOUCH_HISTORY_BARS)
+        touched_strikes = detect_touched_strikes(processed_data.keys(), prices)
+    max_pain = max_pain_from_chain(chain, include_volume=True).max_pain
     
     # Calculate detailed max pain DataFrame
-    strike_prices = sorted(strikes_data.keys())
-    max_pain_data = []
-    for strike in strike_prices:
-        call_loss = sum((strikes_data[s]["CALL"] * max(0, s - strike)) for s in strike_prices)
-        put_loss = sum((strikes_data[s]["PUT"] * max(0, strike - s)) for s in strike_prices)
-        total_loss = call_loss + put_loss
-        max_pain_data.append({"strike": strike, "total_loss": total_loss})
-    max_pain_df = pd.DataFrame(max_pain_data)
+    max_pain_df = max_pain_from_chain(chain).to_frame()
     
     return processed_data, touched_strikes, max_pain, max_pain_df
 
+def prefetch_ticker_overview(ticker: str, expiration_date: Optional[str] = None) -> None:
+    """
+    Warm every cache Tab 1 reads - price, expirations, chain, history and
+    price targets - concurrently on HTTP_CLIENT, so the sequential render
+    afterwards only hits caches. The chain request starts as soon as the
+    expirations arrive instead of waiting for the other calls. Failures are
+    logged and left for the render path to report.
+    """
+    ctx = get_script_run_ctx()
+
+    def in_script(fn, *args):
+        def run():
+            add_script_run_ctx(current_thread(), ctx)
+            return fn(*args)
+        return HTTP_CLIENT.call(run)
+
+    async def chain_after_expirations():
+        dates = await in_script(get_expiration_dates, ticker)
+        target = expiration_date if expiration_date in dates else (dates[0] if dates else None)
+        if target:
+            await in_script(process_options_data, ticker, target)
+
+    async def overview():
+        results = await asyncio.gather(
+            in_script(get_current_price, ticker),
+            chain_after_expirations(),
+            in_script(get_historical_prices_combined, ticker),
+            in_script(fetch_fmp_price_history_full, ticker),
+            in_script(fetch_fmp_price_targets, ticker),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Prefetch for {ticker} failed: {result}")
+
+    HTTP_CLIENT.run(overview())
+
 @st.cache_data(ttl=300)
 def process_order_flow_data(ticker: str, expiration_date: str, current_price: float) -> Tuple[pd.DataFrame, float, float, float, str]:
     """Process options data for Tab 5 order flow with caching."""
@@ -2569,31 +2542,10 @@ def process_rating_flow_data(ticker: str, expiration_date: str, current_price: f
         return [], 0.0, 0.0
     
     # Process strikes and calculate max pain and MM gain
-    strikes_data = {}
-    for opt in options_data:
-        if not isinstance(opt, dict):
-            continue
-        strike = float(opt.get("strike", 0))
-        opt_type = opt.get("option_type", "").upper()
-        oi = int(opt.get("open_interest", 0))
-        if strike not in strikes_data:
-            strikes_data[strike] = {"CALL": 0, "PUT": 0}
-        strikes_data[strike][opt_type] += oi
-    
-    strike_prices = sorted(strikes_data.keys())
-    min_loss = float('inf')
-    max_pain = None
-    call_loss_at_max_pain = 0
-    put_loss_at_max_pain = 0
-    for test_strike in strike_prices:
-        call_loss = sum(max(0, s - test_strike) * strikes_data[s]["CALL"] for s in strike_prices)
-        put_loss = sum(max(0, test_strike - s) * strikes_data[s]["PUT"] for s in strike_prices)
-        total_loss = call_loss + put_loss
-        if total_loss < min_loss:
-            min_loss = total_loss
-            max_pain = test_strike
-            call_loss_at_max_pain = call_loss
-            put_loss_at_max_pain = put_loss
+    pain = max_pain_from_options(options_data)
+    max_pain = pain.max_pain
+    call_loss_at_max_pain = pain.call_loss_at_max_pain
+    put_loss_at_max_pain = pain.put_loss_at_max_pain
     
     mm_gain = (call_loss_at_max_pain + put_loss_at_max_pain) * 100
     
@@ -2786,7 +2738,7 @@ def update_contract_prices():
                     
                     pl_data = {}
                     updates = []
-                    get_options_data.clear()  # Clear cache for fresh data
+                    CHAIN_CACHE.invalidate()  # Clear cache for fresh data
                     for contract in contracts:
                         contract_id, ticker, strike, option_type, expiration_date, assigned_price = contract
                         if assigned_price == 0:
@@ -2798,8 +2750,8 @@ def update_contract_prices():
                             }
                             continue
                         
-                        options_data = get_options_data(ticker, expiration_date)
-                        if not options_data:
+                        chain = get_option_chain_columns(ticker, expiration_date)
+                        if not len(chain):
                             logger.warning(f"No options data for {ticker} on {expiration_date}")
                             pl_data[f"{ticker}_{strike}_{option_type}_{expiration_date}"] = {
                                 "pl": 0.0,
@@ -2811,15 +2763,13 @@ def update_contract_prices():
                         current_price = None
                         gamma = 0.0
                         theta = 0.0
-                        for opt in options_data:
-                            if (float(opt["strike"]) == strike and 
-                                opt["option_type"].upper() == option_type.upper()):
-                                bid = float(opt.get("bid", 0) or 0)
-                                ask = float(opt.get("ask", 0) or 0)
-                                current_price = (bid + ask) / 2 if bid > 0 and ask > 0 else None
-                                gamma = float(opt.get("greeks", {}).get("gamma", 0) or 0)
-                                theta = float(opt.get("greeks", {}).get("theta", 0) or 0)
-                                break
+                        row = chain.row(strike, option_type)
+                        if row is not None:
+                            bid = float(chain.bid[row])
+                            ask = float(chain.ask[row])
+                            current_price = (bid + ask) / 2 if bid > 0 and ask > 0 else None
+                            gamma = float(chain.gamma[row])
+                            theta = float(chain.theta[row])
                         
                         if current_price is not None:
                             profit_loss_percent = ((current_price - assigned_price) / assigned_price) * 100
@@ -2911,40 +2861,29 @@ def auto_update_prices():
 
 
 
-@st.cache_data(ttl=3600)
 def fetch_fmp_stock_quote(symbol: str) -> dict:
-    """Fetch real-time stock quote from FMP API."""
-    url = f"https://financialmodelingprep.com/stable/quote?symbol={symbol}&apikey={FMP_API_KEY}"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        if not data:
-            logger.warning(f"No quote data returned for {symbol}")
-            return {}
-        quote = data[0]
-        numeric_fields = ['price', 'change', 'changesPercentage', 'volume', 'dayLow', 'dayHigh']
-        for field in numeric_fields:
-            if field in quote and quote[field] is not None:
-                try:
-                    quote[field] = float(quote[field])
-                except (ValueError, TypeError):
-                    logger.warning(f"Invalid {field} for {symbol}: {quote[field]}")
-                    quote[field] = None
-            else:
-                quote[field] = None
-        logger.info(f"Successfully fetched quote for {symbol}")
-        return quote
-    except requests.RequestException as e:
-        logger.error(f"Error fetching stock quote for {symbol}: {e}")
+    """Real-time stock quote in FMP field names, served from the shared QUOTE_SERVICE."""
+    quote = QUOTE_SERVICE.get(symbol)
+    if quote is None:
+        logger.warning(f"No quote data returned for {symbol}")
         return {}
+    record = dict(quote.raw) if quote.source == "fmp" else {"symbol": quote.symbol}
+    record.update({
+        "price": quote.price,
+        "change": quote.change,
+        "changesPercentage": quote.change_percentage,
+        "volume": quote.volume,
+        "dayLow": quote.low or None,
+        "dayHigh": quote.high or None,
+    })
+    return record
 
 @st.cache_data(ttl=3600)
 def fetch_fmp_company_search(query: str) -> list:
     """Fetch company search results by name from FMP API."""
     url = f"https://financialmodelingprep.com/stable/search-name?query={query}&apikey={FMP_API_KEY}"
     try:
-        response = requests.get(url, timeout=10)
+        response = HTTP_CLIENT.get("fmp", url, timeout=10)
         response.raise_for_status()
         data = response.json()
         return data if data else []
@@ -2966,7 +2905,7 @@ def fetch_fmp_stock_screener(min_market_cap: int = None, max_beta: float = None,
         params["exchange"] = exchange
     url = "https://financialmodelingprep.com/stable/company-screener"
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = HTTP_CLIENT.get("fmp", url, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
         return data if data else []
@@ -2974,64 +2913,50 @@ def fetch_fmp_stock_screener(min_market_cap: int = None, max_beta: float = None,
         logger.error(f"Error fetching stock screener: {e}")
         return []
 
+def _fetch_fmp_fundamental(symbol: str, section: str):
+    """Una sección de fundamentales FMP (ver fundamentals.ENDPOINTS); vacía si falla."""
+    try:
+        return fetch_fundamental(HTTP_CLIENT, symbol, FMP_API_KEY, section, cache=FMP_CACHE)
+    except requests.RequestException as e:
+        logger.error(f"Error fetching {section} for {symbol}: {e}")
+        return FUNDAMENTAL_ENDPOINTS[section].empty()
+
+@st.cache_data(ttl=3600)
+def get_fundamentals_bundle(symbol: str) -> FundamentalsBundle:
+    """Todas las secciones de fundamentales de ``symbol`` pedidas a FMP en paralelo.
+
+    Una sola ronda concurrente sobre la sesión pooled de FMP: la latencia es la
+    del endpoint más lento, no la suma. Las secciones que fallan quedan vacías
+    y se listan en ``bundle.errors``.
+    """
+    return fetch_fundamentals(HTTP_CLIENT, symbol.upper(), FMP_API_KEY, cache=FMP_CACHE)
+
 @st.cache_data(ttl=3600)
 def fetch_fmp_price_target_summary(symbol: str) -> dict:
     """Fetch price target summary from FMP API."""
-    url = f"https://financialmodelingprep.com/stable/price-target-summary?symbol={symbol}&apikey={FMP_API_KEY}"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        return data[0] if data else {}
-    except requests.RequestException as e:
-        logger.error(f"Error fetching price target summary for {symbol}: {e}")
-        return {}
+    return _fetch_fmp_fundamental(symbol, "price_target_summary")
 
 @st.cache_data(ttl=3600)
 def fetch_fmp_ratings_snapshot(symbol: str) -> dict:
     """Fetch ratings snapshot from FMP API."""
-    url = f"https://financialmodelingprep.com/stable/ratings-snapshot?symbol={symbol}&apikey={FMP_API_KEY}"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        return data[0] if data else {}
-    except requests.RequestException as e:
-        logger.error(f"Error fetching ratings snapshot for {symbol}: {e}")
-        return {}
+    return _fetch_fmp_fundamental(symbol, "ratings_snapshot")
 
 @st.cache_data(ttl=3600)
 def fetch_fmp_key_metrics(symbol: str) -> dict:
     """Fetch key financial metrics from FMP API."""
-    url = f"https://financialmodelingprep.com/stable/key-metrics?symbol={symbol}&apikey={FMP_API_KEY}"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        return data[0] if data else {}
-    except requests.RequestException as e:
-        logger.error(f"Error fetching key metrics for {symbol}: {e}")
-        return {}
+    return _fetch_fmp_fundamental(symbol, "key_metrics")
 
 @st.cache_data(ttl=3600)
 def fetch_fmp_financial_ratios(symbol: str) -> dict:
     """Fetch financial ratios from FMP API."""
-    url = f"https://financialmodelingprep.com/stable/ratios?symbol={symbol}&apikey={FMP_API_KEY}"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        return data[0] if data else {}
-    except requests.RequestException as e:
-        logger.error(f"Error fetching financial ratios for {symbol}: {e}")
-        return {}
+    return _fetch_fmp_fundamental(symbol, "ratios")
 
 @st.cache_data(ttl=3600)
 def fetch_fmp_sector_performance() -> list:
     """Fetch sector performance snapshot from FMP API and normalize response."""
     url = f"https://financialmodelingprep.com/api/v3/sector-performance?apikey={FMP_API_KEY}"
     try:
-        response = requests.get(url, timeout=10)
+        response = HTTP_CLIENT.get("fmp", url, timeout=10)
         response.raise_for_status()
         data = response.json()
         if not data or not isinstance(data, list):
@@ -3060,22 +2985,13 @@ def fetch_fmp_sector_performance() -> list:
         logger.error(f"Error fetching sector performance: {e}")
         return []
 
-@st.cache_data(ttl=3600)
 def fetch_fmp_intraday_prices(symbol: str) -> pd.DataFrame:
-    """Fetch 1-hour interval intraday prices from FMP API."""
-    url = f"https://financialmodelingprep.com/stable/historical-chart/1hour?symbol={symbol}&apikey={FMP_API_KEY}"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        if data:
-            df = pd.DataFrame(data)
-            df["date"] = pd.to_datetime(df["date"], errors='coerce')
-            return df[["date", "close"]].sort_values("date")
-        return pd.DataFrame()
-    except requests.RequestException as e:
-        logger.error(f"Error fetching intraday prices for {symbol}: {e}")
+    """1-hour interval intraday prices from FMP, kept current incrementally by HOURLY_STREAM."""
+    bars = HOURLY_STREAM.refresh(symbol, datetime.now() - timedelta(days=HOURLY_LOOKBACK_DAYS))
+    if not bars.size:
+        logger.error(f"No intraday prices for {symbol}")
         return pd.DataFrame()
+    return pd.DataFrame({"date": pd.to_datetime(bars["time"]), "close": bars["close"]})
 
 
 
@@ -3083,95 +2999,32 @@ def fetch_fmp_intraday_prices(symbol: str) -> pd.DataFrame:
 @st.cache_data(ttl=3600)
 def fetch_fmp_company_profile(symbol: str) -> dict:
     """Fetch company profile from FMP API."""
-    url = f"https://financialmodelingprep.com/api/v3/profile/{symbol}?apikey={FMP_API_KEY}"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        if not data or not isinstance(data, list) or len(data) == 0:
-            logger.warning(f"No company profile data returned for {symbol}")
-            return {}
-        profile = data[0]
-        numeric_fields = ['marketCap', 'beta', 'price']
-        for field in numeric_fields:
-            if field in profile and profile[field] is not None:
-                try:
-                    profile[field] = float(profile[field])
-                except (ValueError, TypeError):
-                    logger.warning(f"Invalid {field} for {symbol}: {profile[field]}")
-                    profile[field] = None
-            else:
-                profile[field] = None
-        logger.info(f"Successfully fetched company profile for {symbol}")
-        return profile
-    except requests.RequestException as e:
-        logger.error(f"Error fetching company profile for {symbol}: {e}")
-        return {}
+    return _fetch_fmp_fundamental(symbol, "profile")
 
 @st.cache_data(ttl=3600)
 def fetch_fmp_financial_statements(symbol: str, statement_type: str) -> dict:
     """Fetch financial statements (income, balance-sheet, cash-flow) from FMP API."""
     statement_map = {
-        "income": "income-statement",
-        "balance-sheet": "balance-sheet-statement",
-        "cash-flow": "cash-flow-statement"
+        "income": "income_statement",
+        "balance-sheet": "balance_sheet",
+        "cash-flow": "cash_flow"
     }
-    if statement_type not in statement_map:
-        logger.error(f"Invalid statement type: {statement_type}")
-        return {}
-    endpoint = statement_map[statement_type]
-    url = f"https://financialmodelingprep.com/api/v3/{endpoint}/{symbol}?limit=1&apikey={FMP_API_KEY}"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        if not data or not isinstance(data, list) or len(data) == 0:
-            logger.warning(f"No {statement_type} data returned for {symbol}")
-            return {}
-        statement = data[0]
-        numeric_fields = [
-            'revenue', 'netIncome', 'totalAssets', 'totalLiabilities',
-            'netCashProvidedByOperatingActivities', 'totalCurrentAssets',
-            'totalCurrentLiabilities'
-        ]
-        for field in numeric_fields:
-            if field in statement and statement[field] is not None:
-                try:
-                    statement[field] = float(statement[field])
-                except (ValueError, TypeError):
-                    logger.warning(f"Invalid {field} for {symbol}: {statement[field]}")
-                    statement[field] = None
-            else:
-                statement[field] = None
-        logger.info(f"Successfully fetched {statement_type} for {symbol}")
-        return statement
-    except requests.RequestException as e:
-        logger.error(f"Error fetching {statement_type} for {symbol}: {e}")
+    if statement_type not in statement_map:
+        logger.error(f"Invalid statement type: {statement_type}")
         return {}
+    return _fetch_fmp_fundamental(symbol, statement_map[statement_type])
 
 @st.cache_data(ttl=3600)
 def fetch_fmp_analyst_ratings(symbol: str) -> list:
     """Fetch analyst ratings from FMP API."""
-    url = f"https://financialmodelingprep.com/api/v3/grade/{symbol}?limit=10&apikey={FMP_API_KEY}"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        if not data or not isinstance(data, list):
-            logger.warning(f"No analyst ratings data returned for {symbol}")
-            return []
-        logger.info(f"Successfully fetched {len(data)} analyst ratings for {symbol}")
-        return data
-    except requests.RequestException as e:
-        logger.error(f"Error fetching analyst ratings for {symbol}: {e}")
-        return []
+    return _fetch_fmp_fundamental(symbol, "analyst_ratings")
 
 @st.cache_data(ttl=3600)
 def fetch_fmp_historical_prices(symbol: str) -> pd.DataFrame:
     """Fetch historical daily prices from FMP API."""
     url = f"https://financialmodelingprep.com/api/v3/historical-price-full/{symbol}?timeseries=180&apikey={FMP_API_KEY}"
     try:
-        response = requests.get(url, timeout=10)
+        response = HTTP_CLIENT.get("fmp", url, timeout=10)
         response.raise_for_status()
         data = response.json()
         if not data or "historical" not in data or not data["historical"]:
@@ -3193,125 +3046,49 @@ def fetch_fmp_historical_prices(symbol: str) -> pd.DataFrame:
 
 
 
+@st.cache_data(ttl=CACHE_TTL_STATS)
+def fetch_fmp_price_history_full(symbol: str) -> Optional[dict]:
+    """Full daily price history payload from FMP (``historical`` newest first); None on failure."""
+    try:
+        return HTTP_CLIENT.get_json("fmp", f"/historical-price-full/{symbol}", params={"apikey": FMP_API_KEY})
+    except requests.RequestException as e:
+        logger.error(f"Error fetching full price history for {symbol}: {e}")
+        return None
+
+@st.cache_data(ttl=CACHE_TTL_STATS)
+def fetch_fmp_price_targets(symbol: str) -> Optional[list]:
+    """Individual analyst price targets from FMP; None on failure."""
+    url = "https://financialmodelingprep.com/api/v4/price-target"
+    try:
+        return HTTP_CLIENT.get_json("fmp", url, params={"symbol": symbol, "apikey": FMP_API_KEY})
+    except requests.RequestException as e:
+        logger.error(f"Error fetching price targets for {symbol}: {e}")
+        return None
+
 @st.cache_data(ttl=3600)
 def fetch_fmp_stock_peers(symbol: str) -> list:
     """Fetch stock peers from FMP API."""
-    url = f"https://financialmodelingprep.com/stable/stock-peers?symbol={symbol}&apikey={FMP_API_KEY}"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        peers = data.get("peers", []) if isinstance(data, dict) else []
-        if not peers:
-            logger.warning(f"No peer data returned for {symbol}")
-        else:
-            logger.info(f"Successfully fetched {len(peers)} peers for {symbol}")
-        return peers
-    except requests.RequestException as e:
-        logger.error(f"Error fetching stock peers for {symbol}: {e}")
-        return []
+    return _fetch_fmp_fundamental(symbol, "peers")
 
 @st.cache_data(ttl=3600)
 def fetch_fmp_key_executives(symbol: str) -> list:
     """Fetch company executives from FMP API."""
-    url = f"https://financialmodelingprep.com/stable/key-executives?symbol={symbol}&apikey={FMP_API_KEY}"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        if not isinstance(data, list):
-            logger.warning(f"No executive data returned for {symbol}")
-            return []
-        executives = [
-            {
-                "name": exec.get("name", "N/A"),
-                "title": exec.get("title", "N/A"),
-                "compensation": float(exec.get("compensation", 0)) if exec.get("compensation") else None
-            } for exec in data
-        ]
-        logger.info(f"Successfully fetched {len(executives)} executives for {symbol}")
-        return executives
-    except requests.RequestException as e:
-        logger.error(f"Error fetching executives for {symbol}: {e}")
-        return []
+    return _fetch_fmp_fundamental(symbol, "executives")
 
 @st.cache_data(ttl=3600)
 def fetch_fmp_esg_ratings(symbol: str) -> dict:
     """Fetch ESG ratings from FMP API."""
-    url = f"https://financialmodelingprep.com/stable/esg-ratings?symbol={symbol}&apikey={FMP_API_KEY}"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        if not data or not isinstance(data, list) or len(data) == 0:
-            logger.warning(f"No ESG ratings data returned for {symbol}")
-            return {}
-        esg_data = data[0]
-        numeric_fields = ["environmentalScore", "socialScore", "governanceScore", "ESGScore"]
-        for field in numeric_fields:
-            if field in esg_data and esg_data[field] is not None:
-                try:
-                    esg_data[field] = float(esg_data[field])
-                except (ValueError, TypeError):
-                    logger.warning(f"Invalid {field} for {symbol}: {esg_data[field]}")
-                    esg_data[field] = None
-        logger.info(f"Successfully fetched ESG ratings for {symbol}")
-        return esg_data
-    except requests.RequestException as e:
-        logger.error(f"Error fetching ESG ratings for {symbol}: {e}")
-        return {}
+    return _fetch_fmp_fundamental(symbol, "esg")
 
 @st.cache_data(ttl=3600)
 def fetch_fmp_dcf_valuation(symbol: str) -> dict:
     """Fetch DCF valuation from FMP API."""
-    url = f"https://financialmodelingprep.com/stable/discounted-cash-flow?symbol={symbol}&apikey={FMP_API_KEY}"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        if not data or not isinstance(data, list) or len(data) == 0:
-            logger.warning(f"No DCF valuation data returned for {symbol}")
-            return {}
-        dcf_data = data[0]
-        numeric_fields = ["dcf", "stockPrice"]
-        for field in numeric_fields:
-            if field in dcf_data and dcf_data[field] is not None:
-                try:
-                    dcf_data[field] = float(dcf_data[field])
-                except (ValueError, TypeError):
-                    logger.warning(f"Invalid {field} for {symbol}: {dcf_data[field]}")
-                    dcf_data[field] = None
-        logger.info(f"Successfully fetched DCF valuation for {symbol}")
-        return dcf_data
-    except requests.RequestException as e:
-        logger.error(f"Error fetching DCF valuation for {symbol}: {e}")
-        return {}
+    return _fetch_fmp_fundamental(symbol, "dcf")
 
 @st.cache_data(ttl=3600)
 def fetch_fmp_shares_float(symbol: str) -> dict:
     """Fetch shares float data from FMP API."""
-    url = f"https://financialmodelingprep.com/stable/shares-float?symbol={symbol}&apikey={FMP_API_KEY}"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        if not data or not isinstance(data, list) or len(data) == 0:
-            logger.warning(f"No shares float data returned for {symbol}")
-            return {}
-        float_data = data[0]
-        numeric_fields = ["freeFloat", "floatShares", "outstandingShares"]
-        for field in numeric_fields:
-            if field in float_data and float_data[field] is not None:
-                try:
-                    float_data[field] = float(float_data[field])
-                except (ValueError, TypeError):
-                    logger.warning(f"Invalid {field} for {symbol}: {float_data[field]}")
-                    float_data[field] = None
-        logger.info(f"Successfully fetched shares float for {symbol}")
-        return float_data
-    except requests.RequestException as e:
-        logger.error(f"Error fetching shares float for {symbol}: {e}")
-        return {}
+    return _fetch_fmp_fundamental(symbol, "shares_float")
 
 import yfinance as yf
 
@@ -3330,7 +3107,7 @@ def fetch_fmp_market_movers() -> dict:
     for key, endpoint in endpoints.items():
         url = f"https://financialmodelingprep.com/api/v3/{endpoint}?apikey={FMP_API_KEY}"
         try:
-            response = requests.get(url, timeout=10)
+            response = HTTP_CLIENT.get("fmp", url, timeout=10)
             response.raise_for_status()
             data = response.json()
             logger.debug(f"Raw API response for {key} ({url}): {data}")
@@ -3367,170 +3144,112 @@ def fetch_fmp_market_movers() -> dict:
             logger.error(f"Error fetching {key} from Yahoo Finance: {e}")
     return movers
 
-@st.cache_data(ttl=3600)
-def fetch_fmp_senate_trades() -> list:
-    """Fetch recent Senate trading activity from FMP API with mock data fallback."""
-    url = f"https://financialmodelingprep.com/api/v3/senate-latest?page=0&limit=100&apikey={FMP_API_KEY}"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        logger.debug(f"Raw API response for Senate trades ({url}): {data}")
-        if not data or not isinstance(data, list):
-            logger.warning("No Senate trades data returned from FMP, using mock data")
-            # Fallback a datos simulados basados en la respuesta de ejemplo
-            mock_trades = [
-                {
-                    "senator": "Markwayne Mullin",
-                    "ticker": "LRN",
-                    "transaction_date": "2025-01-02",
-                    "transaction_type": "Purchase",
-                    "amount_range": "$15,001 - $50,000"
-                },
-                {
-                    "senator": "Sheldon Whitehouse",
-                    "ticker": "AAPL",
-                    "transaction_date": "2024-12-19",
-                    "transaction_type": "Sale (Partial)",
-                    "amount_range": "$15,001 - $50,000"
-                },
-                {
-                    "senator": "Jerry Moran",
-                    "ticker": "BRK/B",
-                    "transaction_date": "2024-12-16",
-                    "transaction_type": "Purchase",
-                    "amount_range": "$1,001 - $15,000"
-                }
-            ]
-            logger.info(f"Using {len(mock_trades)} mock Senate trades")
-            return mock_trades
-        trades = [
-            {
-                "senator": f"{item.get('firstName', 'N/A')} {item.get('lastName', 'N/A')}",
-                "ticker": item.get("symbol", "N/A"),
-                "transaction_date": item.get("transactionDate", item.get("transaction_date", "N/A")),
-                "transaction_type": item.get("type", item.get("transactionType", "N/A")),
-                "amount_range": item.get("amount", item.get("amountRange", "N/A"))
-            } for item in data[:5]
-        ]
-        logger.info(f"Successfully fetched {len(trades)} Senate trades from FMP")
-        return trades
-    except requests.RequestException as e:
-        logger.error(f"Error fetching Senate trades from FMP: {e}, using mock data")
-        # Fallback a datos simulados
-        mock_trades = [
-            {
-                "senator": "Markwayne Mullin",
-                "ticker": "LRN",
-                "transaction_date": "2025-01-02",
-                "transaction_type": "Purchase",
-                "amount_range": "$15,001 - $50,000"
-            },
-            {
-                "senator": "Sheldon Whitehouse",
-                "ticker": "AAPL",
-                "transaction_date": "2024-12-19",
-                "transaction_type": "Sale (Partial)",
-                "amount_range": "$15,001 - $50,000"
-            },
-            {
-                "senator": "Jerry Moran",
-                "ticker": "BRK/B",
-                "transaction_date": "2024-12-16",
-                "transaction_type": "Purchase",
-                "amount_range": "$1,001 - $15,000"
-            }
-        ]
-        logger.info(f"Using {len(mock_trades)} mock Senate trades")
+# Datos simulados cuando el índice local todavía está vacío y FMP no responde
+MOCK_SENATE_TRADES = [
+    {
+        "senator": "Markwayne Mullin",
+        "ticker": "LRN",
+        "transaction_date": "2025-01-02",
+        "transaction_type": "Purchase",
+        "amount_range": "$15,001 - $50,000"
+    },
+    {
+        "senator": "Sheldon Whitehouse",
+        "ticker": "AAPL",
+        "transaction_date": "2024-12-19",
+        "transaction_type": "Sale (Partial)",
+        "amount_range": "$15,001 - $50,000"
+    },
+    {
+        "senator": "Jerry Moran",
+        "ticker": "BRK/B",
+        "transaction_date": "2024-12-16",
+        "transaction_type": "Purchase",
+        "amount_range": "$1,001 - $15,000"
+    }
+]
+MOCK_HOUSE_TRADES = [
+    {
+        "representative": "Michael Collins",
+        "ticker": "$VIRTUALUSD",
+        "transaction_date": "2025-01-03",
+        "transaction_type": "Purchase",
+        "amount_range": "$1,001 - $15,000"
+    },
+    {
+        "representative": "Nancy Pelosi",
+        "ticker": "AAPL",
+        "transaction_date": "2024-12-31",
+        "transaction_type": "Sale",
+        "amount_range": "$10,000,001 - $25,000,000"
+    },
+    {
+        "representative": "James Comer",
+        "ticker": "LUV",
+        "transaction_date": "2024-12-31",
+        "transaction_type": "Sale",
+        "amount_range": "$1,001 - $15,000"
+    }
+]
+
+def _fetch_congress_page(chamber: str, page: int) -> List[Dict]:
+    url = f"https://financialmodelingprep.com/api/v3/{chamber}-latest"
+    data = HTTP_CLIENT.get_json("fmp", url, params={"page": page, "limit": 100, "apikey": FMP_API_KEY}, timeout=10)
+    return data if isinstance(data, list) else []
+
+def ingest_congress_trades() -> bool:
+    """Lanza en segundo plano la ingesta de operaciones nuevas de Senado y Cámara (como mucho una vez por hora).
+
+    Las vistas leen el índice local tal como está; nunca esperan a FMP.
+    """
+    return CONGRESS_TRADES.schedule(_fetch_congress_page)
+
+def get_congress_trades(chamber: Optional[str] = None, symbol: Optional[str] = None, since: Optional[str] = None,
+                        until: Optional[str] = None, min_amount: Optional[float] = None, limit: int = 500) -> pd.DataFrame:
+    """Operaciones del Congreso filtradas por cámara/símbolo/fechas/monto desde el índice local."""
+    ingest_congress_trades()
+    return CONGRESS_TRADES.trades(chamber=chamber, symbol=symbol, since=since, until=until,
+                                  min_amount=min_amount, limit=limit)
+
+def get_congress_trade_summary(by: str = "symbol", chamber: Optional[str] = None, since: Optional[str] = None,
+                               limit: int = 50) -> pd.DataFrame:
+    """Agregados (operaciones, compras, ventas, rango en USD) por símbolo, representante o cámara."""
+    ingest_congress_trades()
+    return CONGRESS_TRADES.aggregate(by=by, chamber=chamber, since=since, limit=limit)
+
+def _latest_congress_trades(chamber: str, name_key: str, mock_trades: List[Dict]) -> list:
+    ingest_congress_trades()
+    latest = CONGRESS_TRADES.trades(chamber=chamber, limit=5)
+    if latest.empty:
+        logger.warning(f"No {chamber} trades indexed, using mock data")
         return mock_trades
+    return [
+        {
+            name_key: row.representative,
+            "ticker": row.symbol,
+            "transaction_date": row.transaction_date,
+            "transaction_type": row.transaction_type,
+            "amount_range": row.amount_range
+        } for row in latest.itertuples()
+    ]
+
+def fetch_fmp_senate_trades() -> list:
+    """Latest Senate trades from the local disclosure index, with mock data fallback."""
+    return _latest_congress_trades("senate", "senator", MOCK_SENATE_TRADES)
 
-@st.cache_data(ttl=3600)
 def fetch_fmp_house_trades() -> list:
-    """Fetch recent House trading activity from FMP API with mock data fallback."""
-    url = f"https://financialmodelingprep.com/api/v3/house-latest?page=0&limit=100&apikey={FMP_API_KEY}"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        logger.debug(f"Raw API response for House trades ({url}): {data}")
-        if not data or not isinstance(data, list):
-            logger.warning("No House trades data returned from FMP, using mock data")
-            # Fallback a datos simulados basados en la respuesta de ejemplo
-            mock_trades = [
-                {
-                    "representative": "Michael Collins",
-                    "ticker": "$VIRTUALUSD",
-                    "transaction_date": "2025-01-03",
-                    "transaction_type": "Purchase",
-                    "amount_range": "$1,001 - $15,000"
-                },
-                {
-                    "representative": "Nancy Pelosi",
-                    "ticker": "AAPL",
-                    "transaction_date": "2024-12-31",
-                    "transaction_type": "Sale",
-                    "amount_range": "$10,000,001 - $25,000,000"
-                },
-                {
-                    "representative": "James Comer",
-                    "ticker": "LUV",
-                    "transaction_date": "2024-12-31",
-                    "transaction_type": "Sale",
-                    "amount_range": "$1,001 - $15,000"
-                }
-            ]
-            logger.info(f"Using {len(mock_trades)} mock House trades")
-            return mock_trades
-        trades = [
-            {
-                "representative": f"{item.get('firstName', 'N/A')} {item.get('lastName', 'N/A')}",
-                "ticker": item.get("symbol", "N/A"),
-                "transaction_date": item.get("transactionDate", item.get("transaction_date", "N/A")),
-                "transaction_type": item.get("type", item.get("transactionType", "N/A")),
-                "amount_range": item.get("amount", item.get("amountRange", "N/A"))
-            } for item in data[:5]
-        ]
-        logger.info(f"Successfully fetched {len(trades)} House trades from FMP")
-        return trades
-    except requests.RequestException as e:
-        logger.error(f"Error fetching House trades from FMP: {e}, using mock data")
-        # Fallback a datos simulados
-        mock_trades = [
-            {
-                "representative": "Michael Collins",
-                "ticker": "$VIRTUALUSD",
-                "transaction_date": "2025-01-03",
-                "transaction_type": "Purchase",
-                "amount_range": "$1,001 - $15,000"
-            },
-            {
-                "representative": "Nancy Pelosi",
-                "ticker": "AAPL",
-                "transaction_date": "2024-12-31",
-                "transaction_type": "Sale",
-                "amount_range": "$10,000,001 - $25,000,000"
-            },
-            {
-                "representative": "James Comer",
-                "ticker": "LUV",
-                "transaction_date": "2024-12-31",
-                "transaction_type": "Sale",
-                "amount_range": "$1,001 - $15,000"
-            }
-        ]
-        logger.info(f"Using {len(mock_trades)} mock House trades")
-        return mock_trades
+    """Latest House trades from the local disclosure index, with mock data fallback."""
+    return _latest_congress_trades("house", "representative", MOCK_HOUSE_TRADES)
 
 
 
 
 @st.cache_data(ttl=3600)
 def fetch_fmp_sec_filings_by_symbol(symbol: str, from_date: str, to_date: str) -> list:
-    url = f"https://financialmodelingprep.com/stable/sec-filings-search/symbol?symbol={symbol}&from={from_date}&to={to_date}&page=0&limit=100&apikey={FMP_API_KEY}"
+    url = "https://financialmodelingprep.com/stable/sec-filings-search/symbol"
+    params = {"symbol": symbol, "from": from_date, "to": to_date, "page": 0, "limit": 100, "apikey": FMP_API_KEY}
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = FMP_CACHE.get_json(HTTP_CLIENT, "fmp", url, params, ttl=FMP_ACTIVITY_TTL, timeout=10)
         if not data:
             logger.warning(f"No SEC filings data for {symbol} from {from_date} to {to_date}")
             return []
@@ -3582,60 +3301,9 @@ def calculate_black_scholes_greeks(S, K, T, r, sigma, option_type='call'):
     Returns:
         Dictionary with Delta, Gamma, Theta, Vega, Rho, Vanna, Volga, Charm
     """
-    from scipy.stats import norm
-    
-    if T <= 0 or S <= 0 or K <= 0 or sigma <= 0:
-        return {
-            'delta': 0, 'gamma': 0, 'theta': 0, 'vega': 0, 'rho': 0,
-            'vanna': 0, 'volga': 0, 'charm': 0
-        }
-    
-    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
-    
-    # Standard normal PDF and CDF
-    pdf_d1 = norm.pdf(d1)
-    cdf_d1 = norm.cdf(d1)
-    cdf_d2 = norm.cdf(d2)
-    
-    sqrt_T = np.sqrt(T)
-    exp_rT = np.exp(-r * T)
-    
-    # FIRST-ORDER GREEKS
-    if option_type.lower() == 'call':
-        delta = cdf_d1
-        theta = (-S * pdf_d1 * sigma / (2 * sqrt_T) - r * K * exp_rT * cdf_d2) / 365
-        rho = K * T * exp_rT * cdf_d2 / 100
-        charm = (r * delta - pdf_d1 * (2 * r * T - d2 * sqrt_T) / (2 * T * sigma * sqrt_T)) / 365
-    else:  # put
-        delta = cdf_d1 - 1
-        theta = (-S * pdf_d1 * sigma / (2 * sqrt_T) + r * K * exp_rT * norm.cdf(-d2)) / 365
-        rho = -K * T * exp_rT * norm.cdf(-d2) / 100
-        charm = (-r * (1 - delta) + pdf_d1 * (2 * r * T - d2 * sqrt_T) / (2 * T * sigma * sqrt_T)) / 365
-    
-    # Gamma es igual para calls y puts
-    gamma = pdf_d1 / (S * sigma * sqrt_T)
-    
-    # Vega es igual para calls y puts (por 1% de cambio en IV)
-    vega = S * pdf_d1 * sqrt_T / 100
-    
-    # SECOND-ORDER GREEKS (Para MM sofisticado)
-    # Vanna: Sensitivity of Delta to IV changes
-    vanna = -pdf_d1 * d2 / sigma / 100
-    
-    # Volga: Sensitivity of Vega to IV changes  
-    volga = S * pdf_d1 * sqrt_T * (d1 * d2 - 1) / (sigma ** 2) / 10000
-    
-    return {
-        'delta': delta,
-        'gamma': gamma,
-        'theta': theta,
-        'vega': vega,
-        'rho': rho,
-        'vanna': vanna,
-        'volga': volga,
-        'charm': charm
-    }
+    greeks = black_scholes_greeks_scalar(S, K, T, r, sigma, option_type.lower() == 'call')
+    greeks.pop('prob_itm')
+    return greeks
 
 
 def calculate_prob_itm(S, K, T, r, sigma, option_type='call'):
@@ -3653,19 +3321,11 @@ def calculate_prob_itm(S, K, T, r, sigma, option_type='call'):
     Returns:
         Probability (0-1)
     """
-    from scipy.stats import norm
-    
-    d2 = (np.log(S / K) + (r - 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-    
-    if option_type.lower() == 'call':
-        prob_itm = norm.cdf(d2)
-    else:  # put
-        prob_itm = norm.cdf(-d2)
-    
-    return prob_itm
+    return black_scholes_greeks_scalar(S, K, T, r, sigma, option_type.lower() == 'call')['prob_itm']
 
 
-def mm_contract_scanner(ticker, current_price, target_price, expiration_dates_dict, option_chains_dict, risk_free_rate=0.045):
+def mm_contract_scanner(ticker, current_price, target_price, expiration_dates_dict, option_chains_dict, risk_free_rate=0.045,
+                        vol_surface=None):
     """
     PROFESSIONAL GRADE Market Maker Contract Scanner - Institutional Level Analysis.
     
@@ -3684,378 +3344,31 @@ def mm_contract_scanner(ticker, current_price, target_price, expiration_dates_di
         expiration_dates_dict: Dict of expiration dates
         option_chains_dict: Dict of option chain data
         risk_free_rate: Risk-free rate for Black-Scholes
+        vol_surface: Ticker IV surface (default: get_vol_surface over the scanned expirations)
     
     Returns:
         DataFrame with institutional-grade ranked contracts
     """
-    results = []
-    
-    # Determine direction and move magnitude
-    direction = 'BEARISH' if target_price < current_price else 'BULLISH'
-    price_move = abs((target_price - current_price) / current_price)
-    distance_to_target = abs(target_price - current_price)
-    
     # ════════════════════════════════════════════════════════════════════════════════
-    # PRE-PROCESSING: BUILD OI SURFACE & IV PROFILE ACROSS ALL STRIKES
-    # This is institutional grade - analyzing the entire option surface, not just individual contracts
+    # PRE-PROCESSING: BUILD OI SURFACE, GAMMA DISTRIBUTION & IV PROFILE ONCE
+    # Every expiration is parsed and priced a single time; scoring is pure column math
     # ════════════════════════════════════════════════════════════════════════════════
-    
-    # Build OI heat map for gamma positioning
-    all_strikes_processed = {}  # strike -> {call_oi, put_oi, call_iv, put_iv, volume, etc}
-    
-    for exp_date, chain_data in option_chains_dict.items():
-        if not chain_data:
-            continue
-        
-        try:
-            exp_dt = datetime.strptime(exp_date, '%Y-%m-%d')
-            current_dt = datetime.now(MARKET_TIMEZONE)
-            dte = (exp_dt.date() - current_dt.date()).days
-            
-            if dte <= 0:
-                continue
-            
-            for opt in chain_data:
-                try:
-                    strike = float(opt.get('strike', 0))
-                    opt_type = opt.get('type', 'call').lower()
-                    oi = int(opt.get('open_interest', 0))
-                    volume = int(opt.get('volume', 0))
-                    iv = float(opt.get('implied_volatility', 0.20))
-                    
-                    if strike not in all_strikes_processed:
-                        all_strikes_processed[strike] = {
-                            'call_oi': 0, 'put_oi': 0,
-                            'call_volume': 0, 'put_volume': 0,
-                            'call_iv': [], 'put_iv': []
-                        }
-                    
-                    if opt_type == 'put':
-                        all_strikes_processed[strike]['put_oi'] = max(all_strikes_processed[strike]['put_oi'], oi)
-                        all_strikes_processed[strike]['put_volume'] += volume
-                        all_strikes_processed[strike]['put_iv'].append(iv)
-                    else:
-                        all_strikes_processed[strike]['call_oi'] = max(all_strikes_processed[strike]['call_oi'], oi)
-                        all_strikes_processed[strike]['call_volume'] += volume
-                        all_strikes_processed[strike]['call_iv'].append(iv)
-                except:
-                    pass
-        except:
-            pass
-    
-    # Calculate global OI metrics
-    total_call_oi = sum([s['call_oi'] for s in all_strikes_processed.values()])
-    total_put_oi = sum([s['put_oi'] for s in all_strikes_processed.values()])
-    market_bias = 'BULLISH' if total_call_oi > total_put_oi else 'BEARISH'
-    
-    # Find max OI level (where the real money is)
-    if all_strikes_processed:
-        max_oi_strike = max(all_strikes_processed.items(), 
-                           key=lambda x: x[1]['call_oi'] + x[1]['put_oi'])[0]
-        max_oi_level = all_strikes_processed[max_oi_strike]['call_oi'] + all_strikes_processed[max_oi_strike]['put_oi']
-    else:
-        max_oi_strike = current_price
-        max_oi_level = 0
-    
     try:
-        for exp_date, chain_data in option_chains_dict.items():
-            if not chain_data:
-                continue
-            
-            try:
-                exp_dt = datetime.strptime(exp_date, '%Y-%m-%d')
-                current_dt = datetime.now(MARKET_TIMEZONE)
-                dte = (exp_dt.date() - current_dt.date()).days
-                
-                if dte <= 0:
-                    continue
-                
-                T = dte / 365.0
-                
-                # Expiration classification
-                if dte <= 7:
-                    exp_type = '⚡ WEEKLY'
-                    exp_weight = 1.2  # Weekly preferred for gamma scalping
-                elif dte <= 30:
-                    exp_type = '📅 MONTHLY'
-                    exp_weight = 1.0  # Standard
-                elif dte <= 60:
-                    exp_type = '📊 60-DTE'
-                    exp_weight = 0.8
-                else:
-                    exp_type = '📈 LONG-DATED'
-                    exp_weight = 0.6
-                    
-            except:
-                continue
-            
-            # Process each option contract
-            for opt in chain_data:
-                try:
-                    strike = float(opt.get('strike', 0))
-                    option_type = opt.get('type', 'call').lower()
-                    bid = float(opt.get('bid', 0))
-                    ask = float(opt.get('ask', 0))
-                    iv = float(opt.get('implied_volatility', 0.20))
-                    volume = int(opt.get('volume', 0))
-                    oi = int(opt.get('open_interest', 0))
-                    
-                    if bid <= 0 or ask <= 0:
-                        continue
-                    
-                    mid_price = (bid + ask) / 2
-                    
-                    # Calculate advanced Greeks including second-order
-                    greeks = calculate_black_scholes_greeks(
-                        S=current_price,
-                        K=strike,
-                        T=T,
-                        r=risk_free_rate,
-                        sigma=iv,
-                        option_type=option_type
-                    )
-                    
-                    # Probability of ITM
-                    prob_itm = calculate_prob_itm(
-                        S=current_price,
-                        K=strike,
-                        T=T,
-                        r=risk_free_rate,
-                        sigma=iv,
-                        option_type=option_type
-                    )
-                    
-                    # Metrics
-                    distance_pct = abs((strike - current_price) / current_price * 100)
-                    distance_from_target = abs(strike - target_price)
-                    moneyness = strike / current_price
-                    
-                    # ════════════════════════════════════════════════════════════════════════════════
-                    # INSTITUTIONAL MM SCORING ENGINE - PROFESSIONAL LEVEL ANALYSIS
-                    # 
-                    # This is how REAL traders think:
-                    # - Gamma scalping profit is determined by vega and realized vol interaction
-                    # - Theta is EARNED by holding delta-neutral position
-                    # - IV edge comes from term structure skew and vol surface curvature
-                    # - Liquidity cost is THE limiting factor for turnover
-                    # ════════════════════════════════════════════════════════════════════════════════
-                    
-                    gamma_value = greeks['gamma']
-                    theta_daily = greeks['theta']
-                    vega_value = greeks['vega']
-                    vanna_value = greeks.get('vanna', 0)
-                    volga_value = greeks.get('volga', 0)
-                    
-                    # ─── 1. GAMMA SCALPING PROFITABILITY (35%) ────────────────────────────────────
-                    # Profit from gamma scalping = 0.5 * gamma * spot_variance
-                    # Higher gamma = more profit from price movement
-                    # But gamma * vega interaction matters: need both!
-                    
-                    # Pure gamma exposure (1/year annualized)
-                    gamma_pnl_annual = (gamma_value * (current_price ** 2) * 0.20)  # Assume 20% realized vol
-                    gamma_pnl_daily = gamma_pnl_annual / 252
-                    
-                    # Normalize: find max gamma in the expiration
-                    expiration_gammas = [g for g in [opt.get('gamma_value', 0) for opt in chain_data] if g > 0]
-                    max_gamma = max(expiration_gammas) if expiration_gammas else 0.01
-                    
-                    gamma_score = min(100, (gamma_value / max(max_gamma, 0.0001)) * 100)
-                    
-                    # ─── 2. THETA DECAY EFFICIENCY (30%) ──────────────────────────────────────────
-                    # Theta per unit gamma = efficiency of the position
-                    # High theta + high gamma = best setup
-                    
-                    theta_annual = theta_daily * 252
-                    
-                    # Theta efficiency: theta per unit gamma (want high ratio)
-                    if gamma_value > 0.00001:
-                        theta_efficiency = abs(theta_daily) / gamma_value
-                    else:
-                        theta_efficiency = 0
-                    
-                    # Theta score: absolute value + efficiency bonus
-                    theta_score = min(100, max(0, abs(theta_daily) * 5000))
-                    
-                    # Bonus if theta > gamma trade-off is good (theta / gamma ratio)
-                    if theta_efficiency > 0.1:
-                        theta_score = min(100, theta_score * 1.3)
-                    
-                    # Time decay acceleration bonus for short-dated
-                    if dte <= 7:
-                        theta_score = min(100, theta_score * 1.5)  # Real acceleration
-                    elif dte <= 14:
-                        theta_score = min(100, theta_score * 1.3)
-                    elif dte <= 30:
-                        theta_score = min(100, theta_score * 1.1)
-                    
-                    # ─── 3. IV SURFACE EDGE DETECTION (20%) ────────────────────────────────────────
-                    # Find strikes where IV is mispriced vs term structure
-                    # Vanna helps: positive vanna = profits from rising vol (better for short positions)
-                    
-                    iv_edge_score = 50  # Neutral base
-                    
-                    # IV regime analysis
-                    if iv > 0.40:  # EXTREMELY HIGH - institutional sell opportunity
-                        iv_edge_score = 100
-                    elif iv > 0.32:  # VERY HIGH - good short vol
-                        iv_edge_score = 90
-                    elif iv > 0.25:  # HIGH - above average
-                        iv_edge_score = 75
-                    elif iv > 0.18:  # NORMAL
-                        iv_edge_score = 55
-                    elif iv > 0.12:  # LOW
-                        iv_edge_score = 40
-                    else:  # VERY LOW - avoid (volatility will rise)
-                        iv_edge_score = 25
-                    
-                    # Vanna/Volga benefit (second-order Greeks = real edge)
-                    # Positive vanna = delta increases with rising vol (beneficial for MM)
-                    vanna_contribution = min(25, max(-10, vanna_value * 1000))
-                    volga_contribution = min(10, max(-5, volga_value * 100))
-                    
-                    iv_edge_score += vanna_contribution + volga_contribution
-                    iv_edge_score = min(100, max(0, iv_edge_score))
-                    
-                    # ─── 4. OPEN INTEREST CONCENTRATION (10%) ─────────────────────────────────────
-                    # MM wants to trade where the size is
-                    # Strike with highest OI cluster = best execution opportunity
-                    
-                    strike_oi = all_strikes_processed.get(strike, {}).get('call_oi' if option_type == 'call' else 'put_oi', 0)
-                    oi_percentile = (strike_oi / max(max_oi_level, 1)) * 100 if max_oi_level > 0 else 0
-                    
-                    if oi_percentile > 50:  # Top 50% of OI
-                        oi_score = 100
-                    elif oi_percentile > 25:  # Top 50-75%
-                        oi_score = 80
-                    elif oi_percentile > 10:  # Top 75-90%
-                        oi_score = 60
-                    else:  # Bottom 90%
-                        oi_score = 30
-                    
-                    # Distance to max OI strike bonus
-                    distance_to_max_oi = abs(strike - max_oi_strike)
-                    if distance_to_max_oi < (current_price * 0.01):  # Within 1%
-                        oi_score = min(100, oi_score * 1.2)
-                    
-                    # ─── 5. MARKET MICROSTRUCTURE (5%) ───────────────────────────────────────────
-                    # Bid-ask spread + volume = tradability
-                    
-                    spread = ask - bid
-                    spread_bps = (spread / mid_price * 10000) if mid_price > 0 else 1000
-                    
-                    if spread_bps < 5:
-                        micro_score = 100
-                    elif spread_bps < 10:
-                        micro_score = 90
-                    elif spread_bps < 25:
-                        micro_score = 80
-                    elif spread_bps < 50:
-                        micro_score = 60
-                    elif spread_bps < 100:
-                        micro_score = 40
-                    else:
-                        micro_score = 20
-                    
-                    # Volume bonus (actual traded contracts)
-                    if volume > 1000:
-                        micro_score = min(100, micro_score + 20)
-                    elif volume > 500:
-                        micro_score = min(100, micro_score + 10)
-                    
-                    # ════════════════════════════════════════════════════════════════════════════════
-                    # FINAL MM SCORE - How traders REALLY think
-                    # ════════════════════════════════════════════════════════════════════════════════
-                    
-                    mm_score = (
-                        gamma_score * 0.35 +           # 35% - Gamma profit potential
-                        theta_score * 0.30 +           # 30% - Daily revenue + decay acceleration
-                        iv_edge_score * 0.20 +         # 20% - Vol surface edge + vanna/volga
-                        oi_score * 0.10 +              # 10% - Where the real money trades
-                        micro_score * 0.05             # 5% - Execution cost
-                    )
-                    
-                    # Apply expiration weight
-                    mm_score = mm_score * exp_weight
-                    
-                    # Calculate additional metrics for reporting
-                    spread_pct = (spread / mid_price * 100) if mid_price > 0 else 0
-                    
-                    # Probability of profit (different from ITM)
-                    # For calls: profit if price > strike + spread
-                    # For puts: profit if price < strike - spread
-                    if option_type == 'call':
-                        prob_profit = calculate_prob_itm(current_price, strike + spread, T, risk_free_rate, iv, 'call')
-                    else:
-                        prob_profit = calculate_prob_itm(current_price, strike - spread, T, risk_free_rate, iv, 'put')
-                    
-                    # Directional alignment score (0-100)
-                    if direction == 'BULLISH':
-                        direction_score = 100 if option_type == 'call' else 30
-                    else:  # BEARISH
-                        direction_score = 100 if option_type == 'put' else 30
-                    
-                    # Strike quality score (0-100) based on distance to target
-                    if distance_from_target < (current_price * 0.05):  # Within 5% of target
-                        strike_quality = 100
-                    elif distance_from_target < (current_price * 0.10):  # Within 10%
-                        strike_quality = 85
-                    elif distance_from_target < (current_price * 0.20):  # Within 20%
-                        strike_quality = 70
-                    else:  # Far from target
-                        strike_quality = 50
-                    
-                    # Calculate expected value (simplified)
-                    expected_value = abs(theta_daily) * mid_price  # Theta profit potential
-                    
-                    results.append({
-                        'ticker': ticker,
-                        'exp_date': exp_date,
-                        'dte': dte,
-                        'exp_type': exp_type,
-                        'strike': strike,
-                        'option_type': option_type.upper(),
-                        'bid': bid,
-                        'ask': ask,
-                        'mid': mid_price,
-                        'spread': spread,
-                        'spread_pct': spread_pct,
-                        'iv': iv,
-                        'volume': volume,
-                        'oi': oi,
-                        'delta': greeks['delta'],
-                        'gamma': greeks['gamma'],
-                        'theta': greeks['theta'],
-                        'vega': greeks['vega'],
-                        'rho': greeks['rho'],
-                        'vanna': greeks.get('vanna', 0),
-                        'volga': greeks.get('volga', 0),
-                        'charm': greeks.get('charm', 0),
-                        'prob_itm': prob_itm,
-                        'prob_profit': prob_profit,
-                        'distance_pct': distance_pct,
-                        'direction': direction,
-                        'mm_score': mm_score,
-                        'direction_score': direction_score,
-                        'strike_quality': strike_quality,
-                        'gamma_score': gamma_score,
-                        'theta_score': theta_score,
-                        'liquidity_score': liquidity_score,
-                        'expected_value': expected_value,
-                        'moneyness': moneyness
-                    })
-                    
-                except Exception as e:
-                    continue
-        
-        if not results:
-            return pd.DataFrame()
-        
-        # Sort by MM Score
-        df_results = pd.DataFrame(results)
-        df_results = df_results.sort_values('mm_score', ascending=False)
-        
-        return df_results
-        
+        option_chains = {
+            exp_date: OptionChain.from_records(chain_data)
+            for exp_date, chain_data in option_chains_dict.items()
+            if chain_data is not None and len(chain_data)
+        }
+        if vol_surface is None:
+            vol_surface = get_vol_surface(ticker, current_price, expirations=list(option_chains))
+        surface = build_scanner_surface(
+            option_chains,
+            current_price,
+            datetime.now(MARKET_TIMEZONE).date(),
+            risk_free_rate=risk_free_rate,
+            vol_surface=vol_surface,
+        )
+        return score_contracts(surface, ticker, current_price, target_price, risk_free_rate=risk_free_rate)
     except Exception as e:
         logger.error(f"MM Scanner Error: {str(e)}")
         return pd.DataFrame()
@@ -4378,34 +3691,37 @@ def main():
         </style>
     """, unsafe_allow_html=True)
 
+    log_fetch_stats()
+
     # ===== CACHE STATS MONITOR (HIDDEN) =====
     if False:  # Hidden - uncomment to show cache stats
         with st.sidebar:
             st.markdown("### 💾 Cache Stats")
-            cache_info = st.cache_data.clear.__doc__  # Placeholder para stats futuros
+            screener_stats = SCREENER_CACHE.stats()
             
             col_c1, col_c2 = st.columns(2)
             with col_c1:
-                st.metric("⚡ Cache TTL", "10 min", "600s")
+                st.metric("🎯 Screener Hit Ratio", f"{screener_stats['hit_ratio']:.0%}",
+                          f"{screener_stats['hits'] + screener_stats['refinements']} served")
             with col_c2:
-                st.metric("📊 Aggressive Cache", "30 min", "Screener")
+                st.metric("📉 Bandwidth Saved", f"{screener_stats['bandwidth_saved_mb']:.2f} MB",
+                          f"{screener_stats['downloaded_mb']:.2f} MB downloaded")
             
             with st.expander("🔍 How Cache Works"):
-                st.markdown("""
+                st.markdown(f"""
                 **Cache System:**
-                - ⚡ Real-time quotes: 10 min cache
-                - 📈 Screener data: 30 min cache (saves 30% bandwidth)
+                - ⚡ Real-time quotes: {QUOTE_TTL}s shared quote store
+                - 📈 Screener exports: {CACHE_TTL_AGGRESSIVE}s per view/column set
                 - 📊 Historical data: 1 hour cache
                 
-                **Bandwidth Savings:**
-                - Same scan within 5 min = **0% new data**
-                - Reusing screener = **~3MB saved per request**
-                - Per month: ~2.5-4 GB typical usage
-                
-                **Example:**
-                - Without cache: 3,000 requests × 5KB = 15 MB/day
-                - With cache: 50% hit rate = 7.5 MB/day saved
+                **Screener (since server start):**
+                - Exact repeats: **{screener_stats['hits']}**
+                - Narrower filters answered locally: **{screener_stats['refinements']}**
+                - Downloads: **{screener_stats['misses']}**
                 """)
+
+            with st.expander("📡 Fetch Stats"):
+                st.json(get_fetch_stats())
             
             st.divider()
 
@@ -4707,6 +4023,9 @@ def main():
     if active_tab == tab_labels[0]:
         ticker = st.text_input("Ticker", value="SPY", key="ticker_input_main").upper()
         
+        with st.spinner(f"Loading {ticker}..."):
+            prefetch_ticker_overview(ticker, st.session_state.get("expiration_date"))
+        
         expiration_dates = get_expiration_dates(ticker)
         if not expiration_dates:
             st.error(f"❌ No future expiration dates found for '{ticker}'. Please enter a valid ticker (e.g., SPY, AAPL).")
@@ -4730,11 +4049,13 @@ def main():
                 
                 with st.spinner(f"Fetching data for {expiration_date}..."):
                     processed_data, touched_strikes, max_pain, max_pain_df = process_options_data(ticker, expiration_date)
+                    data_expiration = expiration_date
                     if not processed_data:
                         next_expiration = expiration_dates[expiration_dates.index(expiration_date) + 1] if expiration_date != expiration_dates[-1] else None
                         if next_expiration:
                             st.warning(f"No data for {expiration_date}. Trying next expiration: {next_expiration}")
                             processed_data, touched_strikes, max_pain, max_pain_df = process_options_data(ticker, next_expiration)
+                            data_expiration = next_expiration
                             if not processed_data:
                                 st.error(f"❌ No valid options data for {ticker} on {next_expiration} either.")
                         else:
@@ -4745,8 +4066,15 @@ def main():
                         if max_pain_df.empty:
                             st.warning("No max pain data available for this ticker and expiration date.")
                         
-                        gamma_fig = gamma_exposure_chart(processed_data, current_price, touched_strikes)
+                        gex_surface = get_gex_surface(ticker, current_price, expirations=[data_expiration])
+                        gamma_fig = gamma_exposure_chart(gex_surface, data_expiration, current_price, touched_strikes)
                         st.plotly_chart(gamma_fig, use_container_width=True)
+                        if touched_strikes:
+                            most_touched = sorted(touched_strikes.items(), key=lambda item: item[1]["touches"], reverse=True)[:5]
+                            st.caption(f"Touch frequency (last {TOUCH_HISTORY_BARS} sessions): " + " · ".join(
+                                f"${strike:.2f} ×{info['touches']}" + (f" (last {info['last_touch']})" if info["last_touch"] else "")
+                                for strike, info in most_touched
+                            ))
                         
                         gamma_df = pd.DataFrame({
                             "Strike": list(processed_data.keys()),
@@ -4764,7 +4092,8 @@ def main():
                 key="download_gamma_tab1"
             )
             
-            skew_fig, total_calls, total_puts = plot_skew_analysis_with_totals(options_data, current_price)
+            skew_smile = get_volatility_smile(ticker, expiration_date, current_price)
+            skew_fig, total_calls, total_puts = plot_skew_analysis_with_totals(options_data, current_price, skew_smile)
             st.plotly_chart(skew_fig, use_container_width=True)
             st.write(f"**Total CALLS:** {total_calls} | **Total PUTS:** {total_puts}")
             
@@ -4877,18 +4206,11 @@ def main():
             st.markdown("---")
             st.subheader(f"🎯 Price Targets - {ticker}")
             
-            # Fetch historical prices (últimos 6 meses)
-            tab1_hist_url = f"https://financialmodelingprep.com/api/v3/historical-price-full/{ticker}?apikey={FMP_API_KEY}"
-            tab1_hist_response = requests.get(tab1_hist_url, timeout=10)
-            
-            # Fetch price targets
-            tab1_targets_url = f"https://financialmodelingprep.com/api/v4/price-target?symbol={ticker}&apikey={FMP_API_KEY}"
-            tab1_targets_response = requests.get(tab1_targets_url, timeout=10)
+            # Historical prices + price targets (ya precargados por prefetch_ticker_overview)
+            tab1_hist_data = fetch_fmp_price_history_full(ticker)
+            tab1_targets_data = fetch_fmp_price_targets(ticker)
             
-            if tab1_hist_response.status_code == 200 and tab1_targets_response.status_code == 200:
-                tab1_hist_data = tab1_hist_response.json()
-                tab1_targets_data = tab1_targets_response.json()
-                
+            if tab1_hist_data is not None and tab1_targets_data is not None:
                 if tab1_hist_data and 'historical' in tab1_hist_data and tab1_targets_data:
                     # Procesar datos históricos (últimos 180 días)
                     tab1_historical = tab1_hist_data['historical'][:180]
@@ -5072,6 +4394,13 @@ def main():
                         tab1_strikes_grouped[tab1_strike_key]["put_intrinsic"] += tab1_item["intrinsic_value"] * tab1_item["oi"] * 100
                         tab1_strikes_grouped[tab1_strike_key]["put_extrinsic"] += tab1_item["extrinsic_value"] * tab1_item["oi"] * 100
                 
+                # Exposición gamma por strike desde la superficie GEX compartida (mismo modelo que el gráfico)
+                tab1_exposure = gex_surface.by_strike([data_expiration]).set_index("strike")
+                for tab1_strike_key, tab1_data in tab1_strikes_grouped.items():
+                    if tab1_strike_key in tab1_exposure.index:
+                        tab1_data["call_gamma_ex"] = float(tab1_exposure.at[tab1_strike_key, "call_gex"])
+                        tab1_data["put_gamma_ex"] = float(tab1_exposure.at[tab1_strike_key, "put_gex"])
+                
                 # 3. ALGORITMO ADAPTATIVO DE MM CON BURN TRACKING
                 tab1_final_strikes = []
                 tab1_total_call_intrinsic = 0
@@ -5441,7 +4770,7 @@ def main():
             Args:
                 filters_dict: Dictionary of filters (e.g., {"fa_div_pos": None, "sec_technology": None})
                 columns_list: Optional list of column IDs to export
-                add_delay: Add 2-second delay to avoid rate limiting
+                add_delay: Unused; Finviz requests are paced by the HTTP_CLIENT token bucket
             
             Returns:
                 pandas.DataFrame with screener results
@@ -5458,73 +4787,31 @@ def main():
             Example:
                 https://elite.finviz.com/export.ashx?v=111&f=fa_div_pos,sec_technology&auth=TOKEN
             """
-            import time
-            from io import StringIO
-            
             try:
-                # Add delay to avoid rate limiting
-                if add_delay:
-                    time.sleep(2)
-                
-                # Build URL parameters following official Finviz Elite API
-                params = {
-                    "v": "111",      # View ID (111 = default screener view)
-                    "auth": FINVIZ_API_TOKEN,
-                    "r": "5000",     # Request up to 5000 results per call (increased from 1000)
-                    "s": "marketcap" # Sort by market cap to avoid alphabetical limitations
-                }
-                
-                # Add filter string if provided
-                if filters_dict:
-                    # Create a copy to avoid modifying the original dictionary
-                    filters_copy = filters_dict.copy()
-                    
-                    # Separate ordering parameter from filters
-                    order_by = filters_copy.pop("o", None)
-                    
-                    # Build filter string: comma-separated filter names
-                    # Example: "fa_div_pos,sec_technology,ta_volatility_wo5"
-                    filter_str = ",".join([k for k in filters_copy.keys() if k != "o"])
-                    if filter_str:
-                        params["f"] = filter_str
-                    
-                    # Add ordering if specified (override alphabetical default)
-                    if order_by:
-                        params["o"] = order_by
-                    elif not order_by:
-                        # Force non-alphabetical ordering to get results beyond A-Z limitations
-                        params["o"] = "-marketcap"
-                
-                # Add columns if specified (optional customization)
-                if columns_list:
-                    columns_str = ",".join([str(c) for c in columns_list])
-                    params["c"] = columns_str
-                
-                # Construct the URL
-                # Base: https://elite.finviz.com/export.ashx
-                url = f"{FINVIZ_BASE_URL}/export.ashx"
-                
-                # Log request details for debugging
-                logger.info(f"Finviz Request: URL={url}, Params={params}")
-                
-                # Make request to Finviz Elite export endpoint
-                response = requests.get(url, params=params, headers=HEADERS_FINVIZ, timeout=15)
-                response.raise_for_status()
+                # Create a copy to avoid modifying the original dictionary
+                filters_copy = dict(filters_dict or {})
                 
-                # Check if response is valid
-                if not response.text or response.text.strip() == "":
-                    logger.warning("Screener returned empty response")
-                    st.warning("⚠️ No stocks found with the current criteria. Try adjusting your filters.")
-                    return pd.DataFrame()
+                # Separate ordering parameter from filters; force non-alphabetical ordering
+                # to get results beyond A-Z limitations
+                order_by = filters_copy.pop("o", None)
+                if filters_dict and not order_by:
+                    order_by = "-marketcap"
                 
-                # Parse CSV response into DataFrame
-                df = pd.read_csv(StringIO(response.text))
+                # Superset exports are cached per view/column set; added filters that the
+                # cached columns can answer are applied locally without a new download
+                df = SCREENER_CACHE.screen(
+                    filters_copy.keys(),
+                    view="111",                  # View ID (111 = default screener view)
+                    columns=columns_list,
+                    order=order_by,
+                    rows=5000,                   # Request up to 5000 results per call
+                    params={"auth": FINVIZ_API_TOKEN, "s": "marketcap"},
+                )
                 
                 if df.empty:
                     logger.info(f"Finviz Screener: 0 results with current filters")
                 else:
-                    filter_str = params.get("f", "None")
-                    logger.info(f"Finviz Screener: {len(df)} results with filters: {filter_str}")
+                    logger.info(f"Finviz Screener: {len(df)} results with filters: {','.join(filters_copy) or 'None'}")
                 
                 return df
                 
@@ -5881,6 +5168,9 @@ def main():
                         st.error("❌ No stocks found with these filters. Try a different strategy.")
                     else:
                         st.success(f"✅ Scanner returned {len(df_finviz)} stocks!")
+                        screener_stats = SCREENER_CACHE.stats()
+                        st.caption(f"💾 Screener cache: {screener_stats['hit_ratio']:.0%} hit ratio · "
+                                   f"{screener_stats['bandwidth_saved_mb']:.2f} MB saved")
                         
                         try:
                             # Aplicar filtros de procesamiento
@@ -6020,116 +5310,14 @@ def main():
                                 # ============ TABLA ESTÁNDAR PARA OTRAS ESTRATEGIAS ============
                                 else:
                                     # ========== ALGORITMO BULLISH & SHORT SQUEEZE DETECTOR ==========
-                                    def calculate_bullish_short_squeeze_score(df):
-                                        """
-                                        Calcula puntuación para detectar:
-                                        1. Potencial Bullish: Presión de compra, volumen alto, momentum positivo
-                                        2. Short Squeeze: Alto interés corto + volumen explosivo + reversión alcista
-                                        """
-                                        scores = []
-                                        
-                                        for idx, row in df.iterrows():
-                                            score = 0
-                                            signals = []
-                                            
-                                            # ===== BULLISH SIGNALS =====
-                                            change = 0
-                                            change_str = str(row['Change']).replace('%', '').replace(',', '')
-                                            try:
-                                                change = float(change_str)
-                                            except (ValueError, TypeError):
-                                                change = 0
-                                            
-                                            # Signal 1: Cambio positivo (bullish momentum)
-                                            if change > 1:
-                                                score += 15
-                                                signals.append("📈 Positive Momentum")
-                                            elif change > 3:
-                                                score += 25
-                                                signals.append("📈📈 Strong Momentum")
-                                            
-                                            # Signal 2: Volumen alto (actividad institucional)
-                                            volume = 0
-                                            if 'Volume' in df.columns:
-                                                vol_str = str(row['Volume']).replace(',', '')
-                                                try:
-                                                    volume = float(vol_str)
-                                                except:
-                                                    volume = 0
-                                            
-                                            if volume > 2_000_000:
-                                                score += 15
-                                                signals.append("📊 High Volume")
-                                            elif volume > 5_000_000:
-                                                score += 20
-                                                signals.append("📊📊 Extreme Volume")
-                                            
-                                            # Signal 3: RSI (si está disponible)
-                                            if 'RSI (14)' in df.columns:
-                                                try:
-                                                    rsi = float(row['RSI (14)'])
-                                                    if 50 < rsi < 70:  # Momentum positivo sin sobreventa
-                                                        score += 10
-                                                        signals.append("⚡ Positive RSI")
-                                                    elif rsi < 30:  # Oversold (buena entrada)
-                                                        score += 15
-                                                        signals.append("🟢 RSI Oversold (Entry)")
-                                                except:
-                                                    pass
-                                            
-                                            # ===== SHORT SQUEEZE SIGNALS =====
-                                            
-                                            # Signal 4: Reversión desde resistencia
-                                            if change > 5:
-                                                score += 20
-                                                signals.append("🚀 Strong Reversal")
-                                            
-                                            # Signal 5: Volumen explosivo + cambio positivo (squeeze activación)
-                                            if volume > 3_000_000 and change > 2:
-                                                score += 25
-                                                signals.append("💥 Squeeze Activation")
-                                            
-                                            # Signal 6: Patrones técnicos si existen
-                                            if 'Pattern' in df.columns:
-                                                pattern = str(row['Pattern']).upper()
-                                                if 'BOTTOM' in pattern or 'SUPPORT' in pattern:
-                                                    score += 12
-                                                    signals.append("📍 Support Bounce")
-                                                if 'BREAKOUT' in pattern:
-                                                    score += 15
-                                                    signals.append("⬆️ Breakout")
-                                            
-                                            # Signal 7: Market Cap (Small cap = más volatilidad para squeeze)
-                                            if 'Market Cap' in df.columns:
-                                                mcap_str = str(row['Market Cap']).replace(',', '').replace('B', '').replace('M', '')
-                                                try:
-                                                    mcap = float(mcap_str)
-                                                    if mcap < 2:  # Menos de $2B
-                                                        score += 10
-                                                        signals.append("🎯 Small Cap (High Volatility)")
-                                                except:
-                                                    pass
-                                            
-                                            # ===== RESULTADO FINAL =====
-                                            is_highlight = score >= 40  # Threshold para resaltar
-                                            
-                                            scores.append({
-                                                'highlight': is_highlight,
-                                                'score': score,
-                                                'signals': ' | '.join(signals) if signals else 'Monitor',
-                                                'type': 'BULLISH' if change > 0 else ('SHORT SQUEEZE' if score >= 50 else 'NEUTRAL')
-                                            })
-                                        
-                                        return scores
-                                    
-                                    # Calcular scores
-                                    df_scores = calculate_bullish_short_squeeze_score(df_finviz)
+                                    # Calcular scores (bullish + short squeeze, vectorizado sobre todo el screen)
+                                    df_scores = score_bullish_short_squeeze(df_finviz)
                                     
                                     # Agregar columnas de análisis al DataFrame
-                                    df_finviz['_Score'] = [s['score'] for s in df_scores]
-                                    df_finviz['_Type'] = [s['type'] for s in df_scores]
-                                    df_finviz['📊 Signals'] = [s['signals'] for s in df_scores]
-                                    df_finviz['_Highlight'] = [s['highlight'] for s in df_scores]
+                                    df_finviz['_Score'] = df_scores['score'].to_numpy()
+                                    df_finviz['_Type'] = df_scores['type'].to_numpy()
+                                    df_finviz['📊 Signals'] = df_scores['signals'].to_numpy()
+                                    df_finviz['_Highlight'] = df_scores['highlight'].to_numpy()
                                     
                                     # Ordenar por score (mayor primero)
                                     df_display = df_finviz.sort_values('_Score', ascending=False)
@@ -6899,6 +6087,23 @@ def main():
                 )
             else:
                 st.error(f"No alerts generated with Open Interest ≥ {open_interest_threshold:,}, Gamma ≥ {gamma_threshold}. Check logs.")
+
+            # Sugerencias OTM con los mismos umbrales: la cadena se valora una vez, los filtros solo re-enmascaran
+            candidates = get_contract_candidates(ticker, expiration_date, current_price)
+            if candidates is not None:
+                contract_suggestions = candidates.suggest(open_interest_threshold, gamma_threshold, sort_by="RR")
+                st.markdown("### 🎯 Contract Suggestions")
+                if contract_suggestions.empty:
+                    st.info(f"No OTM contracts with OI ≥ {open_interest_threshold:,} and Gamma ≥ {gamma_threshold}.")
+                else:
+                    st.dataframe(contract_suggestions.drop(columns=["Reason"]).style.format({
+                        'Strike': '{:.1f}',
+                        'IV': '{:.2%}',
+                        'RR': '{:.2f}',
+                        'Prob OTM': '{:.1%}',
+                        'Profit': '${:.2f}',
+                        'Open Interest': '{:,.0f}'
+                    }), use_container_width=True, height=300)
             
             st.markdown('</div>', unsafe_allow_html=True)
             st.markdown("---")
@@ -7143,6 +6348,29 @@ def main():
             )
             
             st.markdown("---")
+
+            # Flujo intradía: INTRADAY_FLOWS ya tiene plegadas las barras cerradas, cada refresco solo suma las nuevas
+            st.subheader("🌊 Intraday Power Flow & Liquidity Pulse")
+            flows = get_intraday_flows(ticker, current_price)
+            if flows is None:
+                st.info(f"No closed 1-minute bars for {ticker} yet this session.")
+            else:
+                flow_data, support, resistance, accumulation_zones, pulse, bars = flows
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Net Pressure", f"{pulse.net_pressure:,.0f}", delta="Buyers" if pulse.net_pressure > 0 else "Sellers")
+                with col2:
+                    st.metric("Trend", pulse.trend)
+                with col3:
+                    st.metric("Volatility", f"{pulse.volatility:.1f}%" if np.isfinite(pulse.volatility) else "N/A")
+                with col4:
+                    st.metric("Pulse Target", f"${pulse.price_target:.2f}")
+                st.plotly_chart(plot_volume_power_flow(flow_data, current_price, support, resistance, accumulation_zones),
+                                use_container_width=True)
+                pulse_df = liquidity_pulse_frame({"date": bars["time"], "close": bars["close"], "volume": bars["volume"]})
+                st.plotly_chart(plot_liquidity_pulse(pulse_df, current_price, pulse.price_target), use_container_width=True)
+
+            st.markdown("---")
             
             # Section 5: MM Logic Explanation
             st.subheader("📚 How MM Flow Works")
@@ -7209,8 +6437,8 @@ def main():
                         
                         if prices_hist:
                             # Calcular volatilidad histórica
-                            returns = np.diff(np.array(prices_hist)) / np.array(prices_hist[:-1])
-                            hv = np.std(returns) * np.sqrt(252) * 100  # Annualized
+                            hv_window = max(len(prices_hist) - 1, 2)
+                            hv = (last_value(historical_volatility(prices_hist, period=hv_window)) or 0.0) * 100  # Annualized
                             
                             # Obtener opciones para IV
                             expiration_dates_t9 = get_expiration_dates(ticker_t9)
@@ -7219,35 +6447,14 @@ def main():
                                 options_data_t9 = get_options_data(ticker_t9, selected_exp_t9)
                                 
                                 if options_data_t9:
-                                    # Calcular IV promedio
-                                    ivs = []
-                                    for opt in options_data_t9:
-                                        iv = opt.get("implied_volatility", 0)
-                                        if iv and isinstance(iv, (int, float)) and iv > 0:
-                                            ivs.append(float(iv) * 100)
-                                    
-                                    iv_avg = np.mean(ivs) if ivs else hv
-                                    
-                                    # Calcular Gamma Walls
-                                    strikes_dict = {}
-                                    for opt in options_data_t9:
-                                        strike = float(opt.get("strike", 0))
-                                        opt_type = opt.get("option_type", "").upper()
-                                        oi = int(opt.get("open_interest", 0) or 0)
-                                        greeks = opt.get("greeks", {})
-                                        gamma = float(greeks.get("gamma", 0)) if isinstance(greeks, dict) else 0
-                                        
-                                        if strike not in strikes_dict:
-                                            strikes_dict[strike] = {"CALL": 0, "PUT": 0, "GAMMA": 0}
-                                        
-                                        if opt_type == "CALL":
-                                            strikes_dict[strike]["CALL"] += gamma * oi
-                                        else:
-                                            strikes_dict[strike]["PUT"] += gamma * oi
-                                        strikes_dict[strike]["GAMMA"] = abs(strikes_dict[strike]["CALL"] - strikes_dict[strike]["PUT"])
+                                    # IV ATM del vencimiento leída de la superficie de volatilidad compartida
+                                    vol_surface_t9 = get_vol_surface(ticker_t9, current_price_t9, expirations=[selected_exp_t9])
+                                    atm_iv_t9 = vol_surface_t9.atm_iv(selected_exp_t9) if vol_surface_t9 else 0.0
+                                    iv_avg = atm_iv_t9 * 100 if atm_iv_t9 > 0 else hv
                                     
-                                    # Identificar Gamma Walls (top 5)
-                                    gamma_walls = sorted(strikes_dict.items(), key=lambda x: x[1]["GAMMA"], reverse=True)[:5]
+                                    # Gamma Walls (top 5 por |GEX neto|) desde la superficie GEX compartida
+                                    gex_levels_t9 = get_gex_surface(ticker_t9, current_price_t9, expirations=[selected_exp_t9]).top_levels(5, [selected_exp_t9])
+                                    gamma_walls = list(zip(gex_levels_t9["strike"].tolist(), gex_levels_t9["abs_net_gex"].tolist()))
                                     gamma_wall_strikes = [wall[0] for wall in gamma_walls]
                                     
                                     # Calcular Expected Move
@@ -7282,7 +6489,7 @@ def main():
                                     st.markdown("### 🧱 Gamma Walls (Price Magnets)")
                                     gamma_wall_df = pd.DataFrame({
                                         "Strike": [w[0] for w in gamma_walls],
-                                        "Gamma Strength": [w[1]["GAMMA"] for w in gamma_walls],
+                                        "Gamma Strength": [w[1] for w in gamma_walls],
                                         "Distance from Price": [f"{abs(w[0] - current_price_t9):.2f}" for w in gamma_walls],
                                         "% from Current": [f"{((w[0] / current_price_t9 - 1) * 100):.2f}%" for w in gamma_walls]
                                     })
@@ -7522,28 +6729,8 @@ def main():
                         max_pain_mm = 0
                         
                         if opts_data:
-                            gamma_by_strike = {}
-                            
-                            for opt in opts_data:
-                                strike = float(opt.get("strike", 0))
-                                opt_type = opt.get("option_type", "").upper()
-                                gamma = float(opt.get("greeks", {}).get("gamma", 0)) if isinstance(opt.get("greeks", {}), dict) else 0
-                                oi = int(opt.get("open_interest", 0) or 0)
-                                
-                                if strike not in gamma_by_strike:
-                                    gamma_by_strike[strike] = {"CALL": 0, "PUT": 0}
-                                
-                                if opt_type == "CALL":
-                                    gamma_by_strike[strike]["CALL"] += gamma * oi
-                                elif opt_type == "PUT":
-                                    gamma_by_strike[strike]["PUT"] += gamma * oi
-                            
-                            gamma_net = {}
-                            for strike, gamma in gamma_by_strike.items():
-                                net = gamma["CALL"] - gamma["PUT"]
-                                gamma_net[strike] = abs(net)
-                            
-                            gamma_walls_list = sorted(gamma_net.items(), key=lambda x: x[1], reverse=True)[:5]
+                            gex_levels_mm = get_gex_surface(ticker_mm, current_price_mm, expirations=[exp_dates[0]]).top_levels(5, [exp_dates[0]])
+                            gamma_walls_list = list(zip(gex_levels_mm["strike"].tolist(), gex_levels_mm["abs_net_gex"].tolist()))
                             max_pain_mm = calculate_max_pain_optimized(opts_data) if 'calculate_max_pain_optimized' in dir() else 0
                             
                             if gamma_walls_list:
@@ -7593,15 +6780,14 @@ def main():
                         st.markdown("---")
                         st.markdown("## 🎯 TARGETS")
                         
-                        # Calculate IV from options data
-                        iv_current = 20.0  # Default IV
-                        if opts_data:
-                            ivs_list = [float(o.get("implied_volatility", 0)) * 100 
-                                       for o in opts_data if o.get("implied_volatility")]
-                            if ivs_list:
-                                iv_current = np.mean(ivs_list)
-                        
                         days_to_exp = 7 if "Weekly" in expiry_mm else 30
+                        
+                        # ATM IV at the chosen horizon, interpolated along the surface's term structure
+                        iv_current = 20.0  # Default IV
+                        vol_surface_mm = get_vol_surface(ticker_mm, current_price_mm)
+                        atm_iv_mm = vol_surface_mm.atm_iv(days_to_exp / 365) if vol_surface_mm else 0.0
+                        if atm_iv_mm > 0:
+                            iv_current = atm_iv_mm * 100
                         expected_move = current_price_mm * (iv_current / 100) * np.sqrt(days_to_exp / 365)
                         
                         target_gamma = gamma_walls_list[0][0] if gamma_walls_list else 0
@@ -8187,7 +7373,8 @@ def main():
                                     # Calculate GEX
                                     from mm_quant_engine import QuantEngine
                                     quant = QuantEngine()
-                                    gex = quant.calculate_gex(contracts, mm_current_price)
+                                    gex_surface_mm = get_gex_surface(mm_ticker, mm_current_price, include=mm_expiration)
+                                    gex = quant.calculate_gex(gex_surface_mm, mm_current_price, [mm_expiration])
                                     gamma_neta = gex.get('gex_index', 0)
                                     
                                     col_m1, col_m2, col_m3, col_m4 = st.columns(4)
@@ -8211,7 +7398,7 @@ def main():
                                     st.divider()
                                     st.markdown("## 2. Gamma Wall Detection")
                                     
-                                    call_wall, put_wall = quant.detect_walls(contracts, mm_current_price, mm_expiration)
+                                    call_wall, put_wall = quant.detect_walls(gex_surface_mm, mm_current_price, mm_expiration)
                                     
                                     walls_df = pd.DataFrame({
                                         'Type': ['CALL WALL', 'PUT WALL'],
@@ -8223,17 +7410,28 @@ def main():
                                     
                                     st.dataframe(walls_df, use_container_width=True, hide_index=True)
                                     
+                                    # Muros y flip agregados sobre todos los vencimientos de la superficie
+                                    gex_call_wall_all, gex_put_wall_all = gex_surface_mm.walls()
+                                    zero_gamma_all = gex_surface_mm.gamma_flip()
+                                    st.caption(
+                                        f"All {len(gex_surface_mm.expirations)} expirations - "
+                                        f"Call Gamma Wall: ${gex_call_wall_all:.2f} | Put Gamma Wall: ${gex_put_wall_all:.2f} | "
+                                        f"Zero Gamma: {f'${zero_gamma_all:.2f}' if zero_gamma_all is not None else 'N/A'}"
+                                    )
+                                    
                                     # ═════════════════════════════════════════════════════════════════
                                     # SECTION 3: REGIME & TARGETS
                                     # ═════════════════════════════════════════════════════════════════
                                     st.divider()
                                     st.markdown("## 3. Market Regime Classification")
                                     
-                                    regime = quant.classify_regime(contracts, mm_current_price, gamma_neta=gamma_neta)
-                                    atr = mm_current_price * 0.02
+                                    zero_gamma_mm = gex_surface_mm.gamma_flip([mm_expiration])
+                                    regime = quant.classify_regime(gex_surface_mm, mm_current_price, gamma_neta=gamma_neta,
+                                                                   zero_gamma=zero_gamma_mm)
+                                    atr = get_daily_atr(mm_ticker) or mm_current_price * 0.02
                                     targets = quant.calculate_targets(call_wall, put_wall, mm_current_price, atr)
                                     
-                                    col_r1, col_r2, col_r3 = st.columns(3)
+                                    col_r1, col_r2, col_r3, col_r4 = st.columns(4)
                                     with col_r1:
                                         emoji = "🔄" if regime.classification == "CHOP" else ("📊" if regime.classification == "TREND" else "⏸️")
                                         st.metric(f"{emoji} Regime", regime.classification, f"{regime.confidence:.0%}")
@@ -8241,6 +7439,12 @@ def main():
                                         st.metric("Pinning Prob", f"{regime.pin_probability:.1%}")
                                     with col_r3:
                                         st.metric("Vol Risk", regime.vol_risk)
+                                    with col_r4:
+                                        if regime.zero_gamma is not None:
+                                            st.metric("Zero Gamma", f"${regime.zero_gamma:.2f}",
+                                                      f"{(mm_current_price / regime.zero_gamma - 1):+.2%} vs spot")
+                                        else:
+                                            st.metric("Zero Gamma", "N/A", "no flip within ±15%")
                                     
                                     # Scenarios table
                                     scenarios_data = []
@@ -8471,20 +7675,19 @@ def main():
         @st.cache_data(ttl=300)
         def _gamma_get_expirations(symbol: str) -> List[str]:
             analyzer = MarketMakerAnalyzer(
-                tradier_key=TRADIER_API_KEY,
-                fmp_key=FMP_API_KEY,
-                tradier_base_url=TRADIER_BASE_URL,
-                fmp_base_url=FMP_BASE_URL,
+                http_client=HTTP_CLIENT,
             )
             return analyzer.get_option_expirations(symbol)
 
         @st.cache_data(ttl=120)
         def _gamma_analyze(symbol: str, expiration: Optional[str]) -> Dict:
             analyzer = MarketMakerAnalyzer(
-                tradier_key=TRADIER_API_KEY,
-                fmp_key=FMP_API_KEY,
-                tradier_base_url=TRADIER_BASE_URL,
-                fmp_base_url=FMP_BASE_URL,
+                http_client=HTTP_CLIENT,
+                chain_cache=CHAIN_CACHE,
+                chain_max_age=CHAIN_MAX_AGE_ANALYTICS,
+                quote_service=QUOTE_SERVICE,
+                gex_surface_provider=lambda sym, price, exps: get_gex_surface(sym, price, expirations=exps),
+                vol_surface_provider=lambda sym, price, exps: get_vol_surface(sym, price, expirations=exps),
             )
             return analyzer.analyze_chain(symbol, expiration=expiration)
 
@@ -8521,6 +7724,8 @@ def main():
                 lines.append(f"Pivot Level: ~= {_format_currency(item.get('pivot'))}")
                 lines.append(f"Mid Up: {_format_currency(mid_up)}")
                 lines.append(f"Mid Down: {_format_currency(mid_down)}")
+                if item.get("expected_move"):
+                    lines.append(f"Expected Move: +/-{_format_currency(item['expected_move'])} (ATM IV {item['atm_iv'] * 100:.1f}%)")
                 lines.append("")
             return "\n".join(lines)
 
@@ -8891,6 +8096,8 @@ def main():
                         "CALL OI": f"{item.get('call_oi', 0):,}",
                         "PUT OI": f"{item.get('put_oi', 0):,}",
                         "PUT/CALL": f"{item.get('put_call', 0):.2f}",
+                        "ATM IV": f"{item['atm_iv'] * 100:.1f}%" if item.get("atm_iv") else "N/A",
+                        "Expected Move": _format_currency(item.get("expected_move")),
                     }
                 )
 
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from resilience import CircuitBreaker, RetryPolicy, TokenBucket
+
+# Least time that must remain before the deadline for a request to be worth sending
+MIN_ATTEMPT_WINDOW = 0.25
+
+
+@dataclass(frozen=True)
+class Provider:
+    """Connection settings for one upstream API (Tradier, FMP, Finviz, ...)."""
+
+    name: str
+    base_url: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    max_concurrency: int = 8
+    timeout: float = 10.0
+    rate_per_second: float = 0.0
+    burst: Optional[float] = None
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    breaker_threshold: int = 5
+    breaker_reset: float = 30.0
+
+
+class AsyncHttpClient:
+    """asyncio front-end over pooled per-provider HTTP sessions.
+
+    Every request runs on one background event loop. Each provider gets its
+    own keep-alive connection pool (sized to ``max_concurrency``), an
+    ``asyncio.Semaphore`` capping in-flight requests, a token bucket for its
+    request rate, a :class:`RetryPolicy` with a total deadline and a
+    :class:`CircuitBreaker`. The blocking socket work happens on a private
+    thread pool, so coroutines for different providers overlap while the
+    loop stays free; rate-limit waits and retry backoff are ``asyncio.sleep``
+    calls and never hold a worker thread.
+
+    Synchronous callers use the facade (``get``, ``get_json``, ``get_text``,
+    ``gather``); they block only their own thread, never the loop. Code that
+    needs several independent results awaits ``fetch_json`` / ``call`` and
+    combines them with ``asyncio.gather`` inside one coroutine passed to
+    :meth:`run`.
+    """
+
+    def __init__(self, providers: Iterable[Provider], max_workers: int = 32) -> None:
+        self._providers: Dict[str, Provider] = {p.name: p for p in providers}
+        self._sessions: Dict[str, requests.Session] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._buckets = {p.name: TokenBucket(p.rate_per_second, p.burst) for p in self._providers.values()}
+        self._breakers = {
+            p.name: CircuitBreaker(p.name, p.breaker_threshold, p.breaker_reset) for p in self._providers.values()
+        }
+        # Socket I/O and composed blocking callables use separate pools so a
+        # ``call`` that issues facade requests can never starve the I/O pool.
+        self._io_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="http-io")
+        self._task_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="http-task")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def provider(self, name: str) -> Provider:
+        return self._providers[name]
+
+    def session(self, name: str) -> requests.Session:
+        """Pooled session for a provider; also usable directly by legacy code."""
+        with self._lock:
+            session = self._sessions.get(name)
+            if session is None:
+                provider = self._providers[name]
+                session = requests.Session()
+                session.headers.update(provider.headers)
+                # Retries are handled by the provider RetryPolicy, not urllib3
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=provider.max_concurrency, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[name] = session
+            return session
+
+    def _url(self, provider: Provider, url: str) -> str:
+        if url.startswith(("http://", "https://")):
+            return url
+        return f"{provider.base_url}{url}"
+
+    def _semaphore(self, name: str) -> asyncio.Semaphore:
+        # Only ever touched from the loop thread, so no lock is needed
+        semaphore = self._semaphores.get(name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._providers[name].max_concurrency)
+            self._semaphores[name] = semaphore
+        return semaphore
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="async-http-loop", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    # ------------------------------------------------------------------ async
+
+    async def fetch(
+        self,
+        provider: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> requests.Response:
+        """GET ``url`` (absolute, or relative to the provider base URL).
+
+        ``timeout`` bounds each attempt; the provider's retry deadline bounds
+        the whole call. Raises ``CircuitOpenError`` immediately while the
+        provider's circuit is open and ``requests.Timeout`` once the deadline
+        passes. A request whose rate-limit slot falls after the deadline gives
+        its token back and fails without being sent or counted against the
+        breaker. Responses with a retryable status that survive every attempt
+        are returned as-is for the caller's ``raise_for_status``.
+        """
+        config = self._providers[provider]
+        policy = config.retry
+        breaker = self._breakers[provider]
+        timeout = config.timeout if timeout is None else timeout
+        request = functools.partial(
+            self.session(provider).get, self._url(config, url), params=params, headers=headers
+        )
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + policy.deadline
+
+        bucket = self._buckets[provider]
+        breaker.before_call()
+        healthy, sent = False, False
+        response, error = None, None
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                wait = bucket.reserve()
+                if loop.time() + wait + MIN_ATTEMPT_WINDOW >= deadline:
+                    bucket.release()
+                    if response is not None:
+                        return response
+                    raise error or requests.Timeout(
+                        f"{provider} rate limit wait of {wait:.1f}s exceeds the {policy.deadline}s deadline: {url}"
+                    )
+                try:
+                    await asyncio.sleep(wait)
+                except asyncio.CancelledError:
+                    bucket.release()
+                    raise
+                response, error = None, None
+                sent = True
+                try:
+                    response = await self._send(provider, request, min(timeout, deadline - loop.time()))
+                except (requests.ConnectionError, requests.Timeout) as exc:
+                    error = exc
+                if response is not None and response.status_code not in policy.statuses:
+                    healthy = True
+                    return response
+
+                delay = policy.backoff(attempt, response.headers.get("Retry-After") if response is not None else None)
+                if attempt >= policy.attempts or loop.time() + delay >= deadline:
+                    if response is not None:
+                        return response
+                    raise error
+                await asyncio.sleep(delay)
+        finally:
+            if healthy:
+                breaker.record_success()
+            elif sent:
+                breaker.record_failure()
+            else:
+                breaker.record_abandoned()
+
+    async def _send(self, provider: str, request: Callable[..., requests.Response], timeout: float) -> requests.Response:
+        async with self._semaphore(provider):
+            loop = asyncio.get_running_loop()
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(self._io_executor, functools.partial(request, timeout=timeout)), timeout
+                )
+            except asyncio.TimeoutError as exc:
+                raise requests.Timeout(f"{provider} request exceeded {timeout:.1f}s") from exc
+
+    async def fetch_json(self, provider: str, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> Any:
+        response = await self.fetch(provider, url, params, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    async def fetch_text(self, provider: str, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> str:
+        response = await self.fetch(provider, url, params, **kwargs)
+        response.raise_for_status()
+        return response.text
+
+    async def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Await a blocking callable (e.g. a cached fetch function) without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._task_executor, functools.partial(fn, *args, **kwargs))
+
+    async def call_io(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Await blocking disk or socket I/O on the I/O pool; ``fn`` must not issue facade requests."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_executor, functools.partial(fn, *args, **kwargs))
+
+    # ------------------------------------------------------------ sync facade
+
+    def run(self, coro: Awaitable[Any]) -> Any:
+        """Run a coroutine on the client loop and block the calling thread for its result."""
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("AsyncHttpClient.run() called from its own event loop; await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def get(self, provider: str, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> requests.Response:
+        return self.run(self.fetch(provider, url, params, **kwargs))
+
+    def get_json(self, provider: str, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> Any:
+        return self.run(self.fetch_json(provider, url, params, **kwargs))
+
+    def get_text(self, provider: str, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> str:
+        return self.run(self.fetch_text(provider, url, params, **kwargs))
+
+    def gather(self, *coros: Awaitable[Any]) -> List[Any]:
+        """Run coroutines concurrently; failures come back as exception objects in their slot."""
+        async def _gather():
+            return await asyncio.gather(*coros, return_exceptions=True)
+        return self.run(_gather())
+
+    def health(self) -> Dict[str, Dict[str, object]]:
+        """Circuit state per provider (closed / open / half_open)."""
+        return {name: breaker.stats() for name, breaker in self._breakers.items()}
+
+    def close(self) -> None:
+        with self._lock:
+            loop, self._loop, self._thread = self._loop, None, None
+            sessions, self._sessions = list(self._sessions.values()), {}
+            self._semaphores = {}
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+        for session in sessions:
+            session.close()
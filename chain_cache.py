@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from single_flight import SingleFlight
+
+ChainKey = Tuple[str, str]
+
+
+def estimate_nbytes(obj: Any) -> int:
+    """Rough in-memory size of a chain payload or derived view."""
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(v) for v in obj)
+    if hasattr(obj, "__dict__"):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(v) for v in vars(obj).values())
+    return sys.getsizeof(obj)
+
+
+@dataclass
+class ChainSnapshot:
+    """One downloaded chain, identified by (ticker, expiration, fetched_at).
+
+    ``options`` is shared by every reader and must be treated as read-only.
+    Derived views (filtered lists, columnar chains) are memoized per snapshot
+    through :meth:`view`, so each is built once no matter how many tabs ask.
+    """
+
+    ticker: str
+    expiration: str
+    fetched_at: float
+    options: List[Dict]
+    nbytes: int
+    _views: Dict[str, Any] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def key(self) -> Tuple[str, str, float]:
+        return self.ticker, self.expiration, self.fetched_at
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def view(self, name: str, builder: Callable[[List[Dict]], Any]) -> Any:
+        with self._lock:
+            if name not in self._views:
+                value = builder(self.options)
+                self._views[name] = value
+                self.nbytes += estimate_nbytes(value)
+            return self._views[name]
+
+
+class ChainCache:
+    """Process-wide option chain cache shared by every session and tab.
+
+    Entries are evicted least-recently-used once the estimated payload size
+    exceeds ``max_bytes``. Concurrent misses on the same (ticker, expiration)
+    share a single download. Callers pass their own staleness budget
+    (``max_age`` seconds) so real-time views and slower analytics can read the
+    same entry with different freshness requirements.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[ChainKey, ChainSnapshot]" = OrderedDict()
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.evictions = 0
+
+    @property
+    def misses(self) -> int:
+        return self._flight.issued
+
+    @property
+    def coalesced(self) -> int:
+        return self._flight.coalesced
+
+    def _fresh(self, key: ChainKey, max_age: float) -> Optional[ChainSnapshot]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.age <= max_age:
+            self._entries.move_to_end(key)
+            return entry
+        return None
+
+    def get(
+        self,
+        ticker: str,
+        expiration: str,
+        fetch: Callable[[], List[Dict]],
+        max_age: float,
+    ) -> ChainSnapshot:
+        key = (ticker.upper(), expiration)
+        with self._lock:
+            entry = self._fresh(key, max_age)
+            if entry is not None:
+                self.hits += 1
+                return entry
+        return self._flight.do(key, lambda: self._load(key, fetch, max_age))
+
+    def _load(self, key: ChainKey, fetch: Callable[[], List[Dict]], max_age: float) -> ChainSnapshot:
+        with self._lock:
+            # Another leader may have finished between our miss and taking the flight
+            entry = self._fresh(key, max_age)
+            if entry is not None:
+                return entry
+        options = fetch()
+        snapshot = ChainSnapshot(key[0], key[1], time.time(), options, estimate_nbytes(options))
+        with self._lock:
+            self._entries[key] = snapshot
+            self._entries.move_to_end(key)
+            self._evict()
+        return snapshot
+
+    def _evict(self) -> None:
+        total = sum(entry.nbytes for entry in self._entries.values())
+        # Never evict the entry that was just inserted
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            total -= evicted.nbytes
+            self.evictions += 1
+
+    def invalidate(self, ticker: Optional[str] = None, expiration: Optional[str] = None) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                if (ticker is None or key[0] == ticker.upper()) and (expiration is None or key[1] == expiration):
+                    del self._entries[key]
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(entry.nbytes for entry in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CHAMBERS = ("senate", "house")
+
+# fetch_page(chamber, page) -> raw FMP disclosure rows, newest first; [] past the end
+PageFetcher = Callable[[str, int], List[Dict]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    chamber TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    representative TEXT NOT NULL,
+    transaction_date TEXT NOT NULL,
+    transaction_type TEXT NOT NULL,
+    amount_range TEXT NOT NULL,
+    amount_low REAL,
+    amount_high REAL,
+    disclosure_date TEXT,
+    owner TEXT,
+    asset TEXT,
+    link TEXT,
+    ingested_at REAL NOT NULL,
+    PRIMARY KEY (chamber, symbol, representative, transaction_date, transaction_type, amount_range, owner)
+);
+CREATE INDEX IF NOT EXISTS trades_by_symbol ON trades (symbol, transaction_date);
+CREATE INDEX IF NOT EXISTS trades_by_date ON trades (chamber, transaction_date);
+CREATE INDEX IF NOT EXISTS trades_by_representative ON trades (representative, transaction_date);
+CREATE TABLE IF NOT EXISTS ingest_state (
+    chamber TEXT PRIMARY KEY,
+    last_run REAL NOT NULL,
+    last_added INTEGER NOT NULL,
+    high_water TEXT
+);
+"""
+
+
+def parse_amount_range(text: str) -> Tuple[Optional[float], Optional[float]]:
+    """Bounds of a disclosure amount such as ``"$15,001 - $50,000"`` or ``"Over $50,000,000"``."""
+    values = [float(v.replace(",", "")) for v in re.findall(r"\d[\d,]*(?:\.\d+)?", text or "")]
+    if not values:
+        return None, None
+    if len(values) == 1:
+        return (values[0], None) if "over" in text.lower() else (values[0], values[0])
+    return values[0], values[1]
+
+
+def _filed(row: Tuple) -> str:
+    # Disclosure date when the feed has one, else the transaction date
+    return row[8] or row[3]
+
+
+def _row(chamber: str, item: Dict, now: float) -> Optional[Tuple]:
+    symbol = str(item.get("symbol") or "").strip().upper()
+    transaction_date = str(item.get("transactionDate") or item.get("transaction_date") or "")[:10]
+    if not symbol or not transaction_date:
+        return None
+    first, last = item.get("firstName"), item.get("lastName")
+    representative = f"{first or 'N/A'} {last or 'N/A'}" if first or last else str(item.get("office") or "N/A")
+    amount = str(item.get("amount") or item.get("amountRange") or "N/A")
+    low, high = parse_amount_range(amount)
+    return (
+        chamber,
+        symbol,
+        representative,
+        transaction_date,
+        str(item.get("type") or item.get("transactionType") or "N/A"),
+        amount,
+        low,
+        high,
+        str(item.get("disclosureDate") or "")[:10] or None,
+        str(item.get("owner") or ""),
+        item.get("assetDescription"),
+        item.get("link"),
+        now,
+    )
+
+
+class CongressTradeStore:
+    """Senate and House disclosures in a local SQLite table, indexed for queries.
+
+    :meth:`ingest` walks the FMP feed newest page first down to the chamber's
+    high-water mark (newest filing date seen by the last complete walk), so
+    each run appends only the disclosures filed since then; the mark only
+    advances once a walk reaches it, so a run that fails part-way is redone
+    in full next time. Trades are keyed by chamber, symbol,
+    representative, transaction date, type, amount range and owner, and
+    indexed by symbol, date and representative so filters and aggregations
+    run in SQL instead of re-downloading and re-filtering the feed. The
+    last run per chamber is stored in the database, so several workers
+    sharing the file ingest at most once per ``min_interval``; :meth:`schedule`
+    runs that ingestion on a background thread.
+    """
+
+    def __init__(self, path: str, min_interval: float = 3600.0, max_pages: int = 20) -> None:
+        self.path = path
+        self.min_interval = min_interval
+        self.max_pages = max_pages
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._ingest_lock = threading.Lock()
+        self._schedule_lock = threading.Lock()
+        self._scheduled_at: Optional[float] = None
+        self._worker: Optional[threading.Thread] = None
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(ingest_state)")}
+            if "high_water" not in columns:
+                conn.execute("ALTER TABLE ingest_state ADD COLUMN high_water TEXT")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA busy_timeout=10000")
+        return conn
+
+    def _claim(self, chamber: str, force: bool) -> Tuple[bool, Optional[str]]:
+        # Record the run before fetching so concurrent workers skip it; returns (claimed, high-water mark)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT last_run, high_water FROM ingest_state WHERE chamber = ?", (chamber,)).fetchone()
+            if row and not force and now - row[0] < self.min_interval:
+                return False, row[1]
+            conn.execute(
+                "INSERT INTO ingest_state (chamber, last_run, last_added) VALUES (?, ?, 0) "
+                "ON CONFLICT(chamber) DO UPDATE SET last_run = excluded.last_run",
+                (chamber, now),
+            )
+        return True, row[1] if row else None
+
+    def ingest(self, chamber: str, fetch_page: PageFetcher, force: bool = False) -> int:
+        """Append new disclosures for ``chamber``; returns how many rows were added.
+
+        Pages are read until one holds filings older than the high-water
+        mark, the feed runs out or ``max_pages`` is reached (which only
+        completes the first, mark-less backfill). Skipped (returning 0) when
+        the chamber was ingested less than ``min_interval`` seconds ago,
+        unless ``force``. Fetch errors end the run and propagate after the
+        rows already fetched are kept; the mark then stays where it was.
+        """
+        if chamber not in CHAMBERS:
+            raise ValueError(f"Unknown chamber: {chamber}")
+        with self._ingest_lock:
+            claimed, high_water = self._claim(chamber, force)
+            if not claimed:
+                return 0
+            added, newest, complete = 0, high_water, False
+            try:
+                for page in range(self.max_pages):
+                    rows = self._rows(chamber, fetch_page(chamber, page))
+                    if not rows:
+                        complete = True
+                        break
+                    added += self._insert(rows)
+                    filed = [_filed(row) for row in rows]
+                    newest = max(newest or "", max(filed))
+                    if high_water and min(filed) < high_water:
+                        complete = True
+                        break
+                else:
+                    complete = high_water is None
+                    if not complete:
+                        logger.warning(f"{chamber} ingest hit {self.max_pages} pages before its high-water mark")
+            finally:
+                with self._connect() as conn:
+                    conn.execute(
+                        "UPDATE ingest_state SET last_added = ?, high_water = ? WHERE chamber = ?",
+                        (added, newest if complete else high_water, chamber),
+                    )
+            logger.info(f"Ingested {added} new {chamber} trades")
+            return added
+
+    def schedule(self, fetch_page: PageFetcher) -> bool:
+        """Ingest every chamber on a background thread; returns whether a run was started.
+
+        Calls within ``min_interval`` of the last run started by this
+        process, or while one is running, return at once without touching
+        the database.
+        """
+        with self._schedule_lock:
+            now = time.monotonic()
+            if self._worker is not None or (self._scheduled_at is not None and now - self._scheduled_at < self.min_interval):
+                return False
+            self._scheduled_at = now
+            self._worker = threading.Thread(target=self._ingest_all, args=(fetch_page,), name="congress-ingest", daemon=True)
+            self._worker.start()
+        return True
+
+    def _ingest_all(self, fetch_page: PageFetcher) -> None:
+        try:
+            for chamber in CHAMBERS:
+                try:
+                    self.ingest(chamber, fetch_page)
+                except Exception as exc:
+                    logger.error(f"Error ingesting {chamber} trades: {exc}")
+        finally:
+            with self._schedule_lock:
+                self._worker = None
+
+    @staticmethod
+    def _rows(chamber: str, items: Iterable[Dict]) -> List[Tuple]:
+        now = time.time()
+        return [row for row in (_row(chamber, item, now) for item in items or [] if isinstance(item, dict)) if row]
+
+    def _insert(self, rows: List[Tuple]) -> int:
+        if not rows:
+            return 0
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO trades VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            return conn.total_changes - before
+
+    def add(self, chamber: str, items: Iterable[Dict]) -> int:
+        """Insert disclosure rows not stored yet; returns how many were new."""
+        return self._insert(self._rows(chamber, items))
+
+    @staticmethod
+    def _where(
+        chamber: Optional[str],
+        symbol: Optional[str],
+        representative: Optional[str],
+        since: Optional[str],
+        until: Optional[str],
+        min_amount: Optional[float],
+    ) -> Tuple[str, List]:
+        clauses, params = [], []
+        for column, value in (("chamber", chamber), ("symbol", symbol.upper() if symbol else None),
+                              ("representative", representative)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            clauses.append("transaction_date >= ?")
+            params.append(str(since)[:10])
+        if until:
+            clauses.append("transaction_date <= ?")
+            params.append(str(until)[:10])
+        if min_amount is not None:
+            clauses.append("COALESCE(amount_high, amount_low) >= ?")
+            params.append(float(min_amount))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def trades(
+        self,
+        chamber: Optional[str] = None,
+        symbol: Optional[str] = None,
+        representative: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        min_amount: Optional[float] = None,
+        limit: Optional[int] = 500,
+    ) -> pd.DataFrame:
+        """Stored trades matching every given filter, newest transaction first."""
+        where, params = self._where(chamber, symbol, representative, since, until, min_amount)
+        query = (
+            "SELECT chamber, symbol, representative, transaction_date, transaction_type, amount_range, "
+            f"amount_low, amount_high, disclosure_date, owner, asset, link FROM trades{where} "
+            "ORDER BY transaction_date DESC, disclosure_date DESC"
+        )
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        return pd.read_sql_query(query, self._connect(), params=params)
+
+    def aggregate(
+        self,
+        by: str = "symbol",
+        chamber: Optional[str] = None,
+        symbol: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: Optional[int] = 50,
+    ) -> pd.DataFrame:
+        """Trade counts, purchases/sales and estimated dollar range grouped by ``by``.
+
+        ``by`` is ``"symbol"``, ``"representative"`` or ``"chamber"``;
+        groups are ordered by trade count.
+        """
+        if by not in ("symbol", "representative", "chamber"):
+            raise ValueError(f"Cannot aggregate by {by}")
+        where, params = self._where(chamber, symbol, None, since, until, None)
+        query = (
+            f"SELECT {by}, COUNT(*) AS trades, "
+            "SUM(transaction_type LIKE 'Purchase%') AS purchases, "
+            "SUM(transaction_type LIKE 'Sale%') AS sales, "
+            "SUM(COALESCE(amount_low, 0)) AS amount_low, "
+            "SUM(COALESCE(amount_high, amount_low, 0)) AS amount_high, "
+            f"MAX(transaction_date) AS last_trade FROM trades{where} GROUP BY {by} ORDER BY trades DESC"
+        )
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        return pd.read_sql_query(query, self._connect(), params=params)
+
+    def stats(self) -> Dict[str, object]:
+        conn = self._connect()
+        counts = dict(conn.execute("SELECT chamber, COUNT(*) FROM trades GROUP BY chamber").fetchall())
+        runs = dict(conn.execute("SELECT chamber, last_run FROM ingest_state").fetchall())
+        return {
+            **{f"{chamber}_trades": counts.get(chamber, 0) for chamber in CHAMBERS},
+            **{f"{chamber}_ingested_ago": time.time() - runs[chamber] for chamber in CHAMBERS if chamber in runs},
+        }
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from greeks_engine import DEFAULT_IV, black_scholes_greeks
+from option_chain import PUT, OptionChain
+from vol_surface import VolSurface
+
+
+@dataclass
+class ExpirationStats:
+    exp_date: str
+    dte: int
+    exp_type: str
+    exp_weight: float
+    contracts: int
+    max_gamma: float
+    gamma_p50: float
+    gamma_p90: float
+    weighted_iv: float
+    iv_p25: float
+    iv_p75: float
+    call_oi: float
+    put_oi: float
+
+
+@dataclass
+class ScannerSurface:
+    """Precomputed stage of the MM scanner: one row per contract across all expirations.
+
+    Contract columns are concatenated over expirations (``exp_index`` points
+    into ``expirations``) and already carry model greeks. The OI surface holds
+    the largest call/put OI seen at each strike across expirations.
+    """
+
+    expirations: List[ExpirationStats]
+    exp_index: np.ndarray
+    strike: np.ndarray
+    is_call: np.ndarray
+    bid: np.ndarray
+    ask: np.ndarray
+    iv: np.ndarray
+    volume: np.ndarray
+    open_interest: np.ndarray
+    greeks: Dict[str, np.ndarray]
+    surface_strikes: np.ndarray
+    surface_call_oi: np.ndarray
+    surface_put_oi: np.ndarray
+    max_oi_strike: float
+    max_oi_level: float
+
+    @property
+    def total_call_oi(self) -> float:
+        return float(self.surface_call_oi.sum())
+
+    @property
+    def total_put_oi(self) -> float:
+        return float(self.surface_put_oi.sum())
+
+    def exp_column(self, name: str) -> np.ndarray:
+        """Broadcast a per-expiration stat onto contract rows."""
+        values = np.array([getattr(stats, name) for stats in self.expirations])
+        return values[self.exp_index] if values.size else values
+
+
+def _classify_expiration(dte: int) -> tuple[str, float]:
+    if dte <= 7:
+        return '⚡ WEEKLY', 1.2  # Weekly preferred for gamma scalping
+    if dte <= 30:
+        return '📅 MONTHLY', 1.0
+    if dte <= 60:
+        return '📊 60-DTE', 0.8
+    return '📈 LONG-DATED', 0.6
+
+
+def build_scanner_surface(
+    option_chains: Dict[str, OptionChain],
+    current_price: float,
+    today: date,
+    risk_free_rate: float = 0.045,
+    vol_surface: Optional[VolSurface] = None,
+) -> ScannerSurface:
+    """Precompute stage: parse expirations, price every contract and build per-expiration stats.
+
+    Contracts the feed sends without an IV read it off ``vol_surface`` (the
+    ticker's fitted surface) at their strike and expiration.
+    """
+    expirations: List[ExpirationStats] = []
+    parts: List[OptionChain] = []
+    for exp_date, chain in option_chains.items():
+        try:
+            dte = (datetime.strptime(exp_date, '%Y-%m-%d').date() - today).days
+        except (TypeError, ValueError):
+            continue
+        if dte <= 0 or not len(chain):
+            continue
+        exp_type, exp_weight = _classify_expiration(dte)
+        expirations.append(ExpirationStats(exp_date, dte, exp_type, exp_weight, len(chain),
+                                           0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0))
+        parts.append(chain)
+
+    def concat(name: str) -> np.ndarray:
+        return np.concatenate([getattr(chain, name) for chain in parts]) if parts else np.zeros(0)
+
+    exp_index = np.repeat(np.arange(len(parts)), [len(chain) for chain in parts]).astype(np.int64)
+    strike = concat('strike')
+    is_call = concat('option_type') != PUT
+    iv = concat('iv')
+    if vol_surface is not None and len(vol_surface):
+        for i, stats in enumerate(expirations):
+            missing = (exp_index == i) & ~(iv > 0)
+            if missing.any():
+                iv[missing] = vol_surface.iv(strike[missing], stats.exp_date)
+    iv = np.where(iv > 0, iv, DEFAULT_IV)
+    open_interest = concat('open_interest')
+    dte = np.array([stats.dte for stats in expirations], dtype=np.float64)
+    T = dte[exp_index] / 365.0 if dte.size else np.zeros(0)
+
+    greeks = black_scholes_greeks(current_price, strike, T, risk_free_rate, iv, is_call)
+
+    # Per-expiration gamma distribution and OI-weighted IV profile
+    gamma = greeks['gamma']
+    for i, stats in enumerate(expirations):
+        rows = exp_index == i
+        exp_gamma = gamma[rows]
+        exp_iv = iv[rows]
+        exp_oi = open_interest[rows]
+        positive = exp_gamma[exp_gamma > 0]
+        if positive.size:
+            stats.max_gamma = float(positive.max())
+            stats.gamma_p50, stats.gamma_p90 = (float(v) for v in np.percentile(positive, [50, 90]))
+        stats.iv_p25, stats.iv_p75 = (float(v) for v in np.percentile(exp_iv, [25, 75]))
+        stats.weighted_iv = float(np.average(exp_iv, weights=exp_oi)) if exp_oi.sum() > 0 else float(exp_iv.mean())
+        stats.call_oi = float(exp_oi[is_call[rows]].sum())
+        stats.put_oi = float(exp_oi[~is_call[rows]].sum())
+
+    # OI surface: largest OI per strike and side across every expiration
+    surface_strikes, strike_pos = np.unique(strike, return_inverse=True)
+    surface_call_oi = np.zeros(surface_strikes.size)
+    surface_put_oi = np.zeros(surface_strikes.size)
+    np.maximum.at(surface_call_oi, strike_pos[is_call], open_interest[is_call])
+    np.maximum.at(surface_put_oi, strike_pos[~is_call], open_interest[~is_call])
+    if surface_strikes.size:
+        total_oi = surface_call_oi + surface_put_oi
+        best = int(np.argmax(total_oi))
+        max_oi_strike = float(surface_strikes[best])
+        max_oi_level = float(total_oi[best])
+    else:
+        max_oi_strike = float(current_price)
+        max_oi_level = 0.0
+
+    return ScannerSurface(
+        expirations=expirations,
+        exp_index=exp_index,
+        strike=strike,
+        is_call=is_call,
+        bid=concat('bid'),
+        ask=concat('ask'),
+        iv=iv,
+        volume=concat('volume'),
+        open_interest=open_interest,
+        greeks=greeks,
+        surface_strikes=surface_strikes,
+        surface_call_oi=surface_call_oi,
+        surface_put_oi=surface_put_oi,
+        max_oi_strike=max_oi_strike,
+        max_oi_level=max_oi_level,
+    )
+
+
+def score_contracts(
+    surface: ScannerSurface,
+    ticker: str,
+    current_price: float,
+    target_price: float,
+    risk_free_rate: float = 0.045,
+) -> pd.DataFrame:
+    """Scoring stage: score every quoted contract as column math and return the ranked table."""
+    quoted = (surface.bid > 0) & (surface.ask > 0)
+    if current_price <= 0 or not quoted.any():
+        return pd.DataFrame()
+
+    exp_index = surface.exp_index[quoted]
+    strike = surface.strike[quoted]
+    is_call = surface.is_call[quoted]
+    bid = surface.bid[quoted]
+    ask = surface.ask[quoted]
+    iv = surface.iv[quoted]
+    volume = surface.volume[quoted]
+    oi = surface.open_interest[quoted]
+    greeks = {name: values[quoted] for name, values in surface.greeks.items()}
+    dte = surface.exp_column('dte')[quoted]
+    exp_weight = surface.exp_column('exp_weight')[quoted]
+    max_gamma = surface.exp_column('max_gamma')[quoted]
+    T = dte / 365.0
+
+    direction = 'BEARISH' if target_price < current_price else 'BULLISH'
+    mid = (bid + ask) / 2
+    spread = ask - bid
+    gamma = greeks['gamma']
+    theta = greeks['theta']
+
+    # 1. Gamma scalping profitability (35%) - normalised to the expiration's richest gamma
+    gamma_score = np.minimum(100, gamma / np.maximum(np.where(max_gamma > 0, max_gamma, 0.01), 0.0001) * 100)
+
+    # 2. Theta decay efficiency (30%)
+    theta_efficiency = np.where(gamma > 0.00001, np.abs(theta) / np.where(gamma > 0.00001, gamma, 1), 0)
+    theta_score = np.clip(np.abs(theta) * 5000, 0, 100)
+    theta_score = np.where(theta_efficiency > 0.1, np.minimum(100, theta_score * 1.3), theta_score)
+    theta_boost = np.select([dte <= 7, dte <= 14, dte <= 30], [1.5, 1.3, 1.1], default=1.0)
+    theta_score = np.minimum(100, theta_score * theta_boost)
+
+    # 3. IV surface edge (20%) - IV regime plus vanna/volga contribution
+    iv_edge_score = np.select(
+        [iv > 0.40, iv > 0.32, iv > 0.25, iv > 0.18, iv > 0.12],
+        [100, 90, 75, 55, 40],
+        default=25,
+    ).astype(np.float64)
+    iv_edge_score += np.clip(greeks['vanna'] * 1000, -10, 25) + np.clip(greeks['volga'] * 100, -5, 10)
+    iv_edge_score = np.clip(iv_edge_score, 0, 100)
+
+    # 4. Open interest concentration (10%)
+    surface_pos = np.searchsorted(surface.surface_strikes, strike)
+    strike_oi = np.where(is_call, surface.surface_call_oi[surface_pos], surface.surface_put_oi[surface_pos])
+    max_oi_level = surface.max_oi_level
+    oi_percentile = strike_oi / max(max_oi_level, 1) * 100 if max_oi_level > 0 else np.zeros_like(strike_oi)
+    oi_score = np.select([oi_percentile > 50, oi_percentile > 25, oi_percentile > 10], [100, 80, 60], default=30).astype(np.float64)
+    near_max_oi = np.abs(strike - surface.max_oi_strike) < current_price * 0.01
+    oi_score = np.where(near_max_oi, np.minimum(100, oi_score * 1.2), oi_score)
+
+    # 5. Market microstructure (5%) - spread plus traded volume
+    spread_bps = np.where(mid > 0, spread / np.where(mid > 0, mid, 1) * 10000, 1000)
+    liquidity_score = np.select(
+        [spread_bps < 5, spread_bps < 10, spread_bps < 25, spread_bps < 50, spread_bps < 100],
+        [100, 90, 80, 60, 40],
+        default=20,
+    ).astype(np.float64)
+    liquidity_score = np.minimum(100, liquidity_score + np.select([volume > 1000, volume > 500], [20, 10], default=0))
+
+    mm_score = (
+        gamma_score * 0.35 +
+        theta_score * 0.30 +
+        iv_edge_score * 0.20 +
+        oi_score * 0.10 +
+        liquidity_score * 0.05
+    ) * exp_weight
+
+    # Probability of clearing the spread at expiration
+    breakeven = np.where(is_call, strike + spread, strike - spread)
+    prob_profit = black_scholes_greeks(current_price, breakeven, T, risk_free_rate, iv, is_call)['prob_itm']
+
+    if direction == 'BULLISH':
+        direction_score = np.where(is_call, 100, 30)
+    else:
+        direction_score = np.where(is_call, 30, 100)
+
+    distance_from_target = np.abs(strike - target_price)
+    strike_quality = np.select(
+        [distance_from_target < current_price * 0.05,
+         distance_from_target < current_price * 0.10,
+         distance_from_target < current_price * 0.20],
+        [100, 85, 70],
+        default=50,
+    )
+
+    exp_dates = np.array([stats.exp_date for stats in surface.expirations], dtype=object)
+    exp_types = np.array([stats.exp_type for stats in surface.expirations], dtype=object)
+
+    df_results = pd.DataFrame({
+        'ticker': ticker,
+        'exp_date': exp_dates[exp_index],
+        'dte': dte.astype(int),
+        'exp_type': exp_types[exp_index],
+        'strike': strike,
+        'option_type': np.where(is_call, 'CALL', 'PUT'),
+        'bid': bid,
+        'ask': ask,
+        'mid': mid,
+        'spread': spread,
+        'spread_pct': np.where(mid > 0, spread / np.where(mid > 0, mid, 1) * 100, 0),
+        'iv': iv,
+        'volume': volume.astype(int),
+        'oi': oi.astype(int),
+        'delta': greeks['delta'],
+        'gamma': gamma,
+        'theta': theta,
+        'vega': greeks['vega'],
+        'rho': greeks['rho'],
+        'vanna': greeks['vanna'],
+        'volga': greeks['volga'],
+        'charm': greeks['charm'],
+        'prob_itm': greeks['prob_itm'],
+        'prob_profit': prob_profit,
+        'distance_pct': np.abs((strike - current_price) / current_price * 100),
+        'direction': direction,
+        'mm_score': mm_score,
+        'direction_score': direction_score,
+        'strike_quality': strike_quality,
+        'gamma_score': gamma_score,
+        'theta_score': theta_score,
+        'liquidity_score': liquidity_score,
+        'expected_value': np.abs(theta) * mid,
+        'moneyness': strike / current_price,
+    })
+    return df_results.sort_values('mm_score', ascending=False)
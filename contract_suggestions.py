@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from greeks_engine import DEFAULT_IV, black_scholes_greeks, norm_cdf
+from iv_engine import SmileFit
+from option_chain import OptionChain
+
+SUGGESTION_COLUMNS = [
+    "Action", "Type", "Strike", "Reason", "Gamma", "IV", "Delta",
+    "RR", "Prob OTM", "Profit", "Open Interest", "IsMaxPain",
+]
+
+
+def monetization_metrics(
+    current_price: float,
+    strike,
+    is_call,
+    bid,
+    ask,
+    gamma,
+    theta,
+    iv,
+    days_to_expiration: float,
+    risk_free_rate: float = 0.045,
+) -> Dict[str, np.ndarray]:
+    """Risk/reward, profit and prob-OTM of selling/buying each contract, as array math.
+
+    Inputs broadcast against each other. Returns ``mid``, ``prob_otm``,
+    ``profit`` (per contract, x100), ``risk``, ``rr`` (10 when the risk is
+    zero) and ``action`` ("SELL" when prob-OTM exceeds 50%, else "BUY").
+    """
+    strike = np.asarray(strike, dtype=np.float64)
+    is_call = np.asarray(is_call, dtype=bool)
+    gamma = np.asarray(gamma, dtype=np.float64)
+    iv = np.asarray(iv, dtype=np.float64)
+    mid = (np.asarray(bid, dtype=np.float64) + np.asarray(ask, dtype=np.float64)) / 2
+    t = days_to_expiration / 365.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = (np.log(current_price / strike) + (risk_free_rate + 0.5 * iv ** 2) * t) / (iv * np.sqrt(t))
+    prob_otm = np.where(is_call, norm_cdf(d1), norm_cdf(-d1))
+
+    in_favour = np.where(is_call, current_price > strike, current_price < strike)
+    direction_factor = np.where(in_favour, 1.0, 0.5)
+    profit = mid * (1 + np.abs(theta) / (gamma + 0.001)) * direction_factor * 100
+    risk = mid * 100 * (1 - prob_otm) * (1 + gamma * 5)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rr = np.where(risk > 0, profit / risk, 10.0)
+    return {
+        "mid": mid,
+        "prob_otm": prob_otm,
+        "profit": profit,
+        "risk": risk,
+        "rr": rr,
+        "action": np.where(prob_otm > 0.5, "SELL", "BUY"),
+    }
+
+
+@dataclass
+class ContractCandidates:
+    """Every contract of one expiration with greeks and monetization metrics precomputed.
+
+    ``frame`` holds one row per listed strike and side (calls first, then
+    puts, by strike) in the suggestion table's columns plus ``OTM``.
+    :meth:`suggest` only applies threshold masks to it, so moving the OI or
+    gamma sliders re-ranks without pricing anything again.
+    """
+
+    frame: pd.DataFrame
+    current_price: float
+    days_to_expiration: int
+    max_pain: Optional[float]
+
+    @classmethod
+    def from_chain(
+        cls,
+        chain: OptionChain,
+        current_price: float,
+        days_to_expiration: int,
+        max_pain: Optional[float] = None,
+        risk_free_rate: float = 0.045,
+        smile: Optional[SmileFit] = None,
+    ) -> "ContractCandidates":
+        rows = np.concatenate([chain.call_row[chain.call_row >= 0], chain.put_row[chain.put_row >= 0]])
+        strike = chain.strike[rows]
+        is_call = chain.is_call[rows]
+        fallback = smile.iv(strike) if smile is not None else DEFAULT_IV
+        iv = np.where(chain.iv[rows] > 0, chain.iv[rows], fallback)
+
+        # Fill missing feed greeks with the model, all contracts in one kernel call
+        estimated = black_scholes_greeks(current_price, strike, days_to_expiration / 365.0, risk_free_rate, iv, is_call)
+        has_greeks = chain.has_greeks[rows]
+        greeks = {k: np.where(has_greeks, getattr(chain, k)[rows], estimated[k]) for k in ("delta", "gamma", "theta")}
+
+        metrics = monetization_metrics(current_price, strike, is_call, chain.bid[rows], chain.ask[rows],
+                                       greeks["gamma"], greeks["theta"], iv, days_to_expiration, risk_free_rate)
+        frame = pd.DataFrame({
+            "Action": metrics["action"],
+            "Type": np.where(is_call, "CALL", "PUT"),
+            "Strike": strike,
+            "Gamma": greeks["gamma"],
+            "IV": iv,
+            "Delta": greeks["delta"],
+            "RR": metrics["rr"],
+            "Prob OTM": metrics["prob_otm"],
+            "Profit": metrics["profit"],
+            "Open Interest": chain.open_interest[rows].astype(np.int64),
+            "IsMaxPain": strike == max_pain if max_pain is not None else np.zeros(strike.size, dtype=bool),
+            "OTM": np.where(is_call, strike > current_price, strike < current_price),
+        })
+        return cls(frame, current_price, days_to_expiration, max_pain)
+
+    def suggest(
+        self,
+        open_interest_threshold: float,
+        gamma_threshold: float,
+        sort_by: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """OTM contracts passing both thresholds, plus the max-pain strike on each side.
+
+        Rows keep the calls-then-puts strike order unless ``sort_by`` names
+        a column to rank by (descending).
+        """
+        frame = self.frame
+        passed = frame["OTM"].to_numpy() \
+            & (frame["Open Interest"].to_numpy() >= open_interest_threshold) \
+            & (frame["Gamma"].to_numpy() >= gamma_threshold)
+        extra = frame["IsMaxPain"].to_numpy() & ~passed
+        table = pd.concat([frame[passed], frame[extra]])
+        labels = ["HighOpenInterest"] * int(passed.sum()) + ["MaxPain"] * int(extra.sum())
+        table = table.assign(Reason=[
+            f"{label}: Strike {row.Strike}, Gamma {row.Gamma:.4f}, IV {row.IV:.2f}, Delta {row.Delta:.2f}, "
+            f"RR {row.RR:.2f}, Prob OTM {prob:.2%}, Profit ${row.Profit:.2f}, OI {oi}"
+            for label, row, prob, oi in zip(labels, table.itertuples(), table["Prob OTM"], table["Open Interest"])
+        ])
+        if sort_by:
+            table = table.sort_values(sort_by, ascending=False, kind="stable")
+        return table[SUGGESTION_COLUMNS].reset_index(drop=True)
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence
+
+import requests
+
+from async_http import AsyncHttpClient
+from persistent_cache import PersistentCache
+
+logger = logging.getLogger(__name__)
+
+FMP_ROOT = "https://financialmodelingprep.com"
+REQUEST_TIMEOUT = 10.0
+DAY = 86400
+
+
+def _float_fields(record: Dict, fields: Sequence[str], fill_missing: bool) -> Dict:
+    for name in fields:
+        if record.get(name) is not None:
+            try:
+                record[name] = float(record[name])
+            except (TypeError, ValueError):
+                logger.warning(f"Invalid {name}: {record[name]}")
+                record[name] = None
+        elif fill_missing:
+            record[name] = None
+    return record
+
+
+def first_record(fields: Sequence[str] = (), fill_missing: bool = False) -> Callable[[Any], Dict]:
+    """Parser taking the first row of an FMP list payload, with ``fields`` coerced to float."""
+    def parse(data: Any) -> Dict:
+        if not data or not isinstance(data, list) or not isinstance(data[0], dict):
+            return {}
+        return _float_fields(dict(data[0]), fields, fill_missing)
+    return parse
+
+
+def records(data: Any) -> List[Dict]:
+    return data if isinstance(data, list) else []
+
+
+def peers(data: Any) -> List[str]:
+    return list(data.get("peers") or []) if isinstance(data, dict) else []
+
+
+def executives(data: Any) -> List[Dict]:
+    return [
+        {
+            "name": item.get("name", "N/A"),
+            "title": item.get("title", "N/A"),
+            "compensation": float(item["compensation"]) if item.get("compensation") else None,
+        }
+        for item in records(data)
+        if isinstance(item, dict)
+    ]
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """One FMP fundamentals endpoint: URL path under the FMP root, query and payload parser."""
+
+    path: str
+    parse: Callable[[Any], Any]
+    params: Dict[str, Any] = field(default_factory=dict)
+    symbol_param: bool = True
+    empty: Callable[[], Any] = dict
+    ttl: float = DAY  # Lifetime in the persistent cache; statements and profiles change rarely
+
+    def url(self, symbol: str) -> str:
+        return f"{FMP_ROOT}{self.path.format(symbol=symbol)}"
+
+    def query(self, symbol: str, api_key: str) -> Dict[str, Any]:
+        query = dict(self.params, apikey=api_key)
+        if self.symbol_param:
+            query["symbol"] = symbol
+        return query
+
+    def request(self, client: AsyncHttpClient, symbol: str, api_key: str,
+                cache: Optional[PersistentCache], timeout: float) -> Awaitable[Any]:
+        """Coroutine for the raw payload, through ``cache`` when one is given."""
+        url, params = self.url(symbol), self.query(symbol, api_key)
+        if cache is None:
+            return client.fetch_json("fmp", url, params=params, timeout=timeout)
+        return cache.fetch_json(client, "fmp", url, params, ttl=self.ttl, timeout=timeout)
+
+
+_STATEMENT_FIELDS = (
+    "revenue", "netIncome", "totalAssets", "totalLiabilities",
+    "netCashProvidedByOperatingActivities", "totalCurrentAssets", "totalCurrentLiabilities",
+)
+
+ENDPOINTS: Dict[str, Endpoint] = {
+    "profile": Endpoint("/api/v3/profile/{symbol}", first_record(("marketCap", "beta", "price"), True), symbol_param=False),
+    "key_metrics": Endpoint("/stable/key-metrics", first_record()),
+    "ratios": Endpoint("/stable/ratios", first_record()),
+    "income_statement": Endpoint("/api/v3/income-statement/{symbol}", first_record(_STATEMENT_FIELDS, True),
+                                 {"limit": 1}, symbol_param=False),
+    "balance_sheet": Endpoint("/api/v3/balance-sheet-statement/{symbol}", first_record(_STATEMENT_FIELDS, True),
+                              {"limit": 1}, symbol_param=False),
+    "cash_flow": Endpoint("/api/v3/cash-flow-statement/{symbol}", first_record(_STATEMENT_FIELDS, True),
+                          {"limit": 1}, symbol_param=False),
+    "analyst_ratings": Endpoint("/api/v3/grade/{symbol}", records, {"limit": 10}, symbol_param=False, empty=list,
+                                ttl=DAY / 4),
+    "esg": Endpoint("/stable/esg-ratings", first_record(("environmentalScore", "socialScore", "governanceScore", "ESGScore"))),
+    "dcf": Endpoint("/stable/discounted-cash-flow", first_record(("dcf", "stockPrice"))),
+    "shares_float": Endpoint("/stable/shares-float", first_record(("freeFloat", "floatShares", "outstandingShares"))),
+    "peers": Endpoint("/stable/stock-peers", peers, empty=list),
+    "executives": Endpoint("/stable/key-executives", executives, empty=list),
+    "price_target_summary": Endpoint("/stable/price-target-summary", first_record(), ttl=DAY / 4),
+    "ratings_snapshot": Endpoint("/stable/ratings-snapshot", first_record(), ttl=DAY / 4),
+}
+
+
+@dataclass
+class FundamentalsBundle:
+    """Every fundamentals section for one symbol; failed sections hold their empty value."""
+
+    symbol: str
+    profile: Dict = field(default_factory=dict)
+    key_metrics: Dict = field(default_factory=dict)
+    ratios: Dict = field(default_factory=dict)
+    income_statement: Dict = field(default_factory=dict)
+    balance_sheet: Dict = field(default_factory=dict)
+    cash_flow: Dict = field(default_factory=dict)
+    analyst_ratings: List[Dict] = field(default_factory=list)
+    esg: Dict = field(default_factory=dict)
+    dcf: Dict = field(default_factory=dict)
+    shares_float: Dict = field(default_factory=dict)
+    peers: List[str] = field(default_factory=list)
+    executives: List[Dict] = field(default_factory=list)
+    price_target_summary: Dict = field(default_factory=dict)
+    ratings_snapshot: Dict = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def complete(self) -> bool:
+        return not self.errors
+
+
+def fetch_fundamental(
+    client: AsyncHttpClient,
+    symbol: str,
+    api_key: str,
+    section: str,
+    cache: Optional[PersistentCache] = None,
+    timeout: float = REQUEST_TIMEOUT,
+) -> Any:
+    """One section on its own (sync); raises ``requests.RequestException`` on failure."""
+    endpoint = ENDPOINTS[section]
+    if cache is not None:
+        data = cache.get_json(client, "fmp", endpoint.url(symbol), endpoint.query(symbol, api_key),
+                              ttl=endpoint.ttl, timeout=timeout)
+    else:
+        data = client.get_json("fmp", endpoint.url(symbol), params=endpoint.query(symbol, api_key), timeout=timeout)
+    return endpoint.parse(data)
+
+
+def fetch_fundamentals(
+    client: AsyncHttpClient,
+    symbol: str,
+    api_key: str,
+    sections: Optional[Iterable[str]] = None,
+    cache: Optional[PersistentCache] = None,
+    timeout: float = REQUEST_TIMEOUT,
+) -> FundamentalsBundle:
+    """Fire every requested section's FMP call at once and assemble the bundle.
+
+    Requests share the client's pooled ``fmp`` session and its concurrency,
+    rate and retry limits, so the wall time is that of the slowest endpoint.
+    With a ``cache``, sections still fresh on disk skip the network.
+    A failing section is logged, recorded in ``errors`` and left empty.
+    """
+    names = list(sections or ENDPOINTS)
+    started = time.time()
+    results = client.gather(*(ENDPOINTS[name].request(client, symbol, api_key, cache, timeout) for name in names))
+    bundle = FundamentalsBundle(symbol=symbol)
+    for name, result in zip(names, results):
+        endpoint = ENDPOINTS[name]
+        if isinstance(result, BaseException):
+            if not isinstance(result, (requests.RequestException, ValueError)):
+                raise result
+            logger.error(f"Error fetching {name} for {symbol}: {result}")
+            bundle.errors[name] = str(result)
+            value = endpoint.empty()
+        else:
+            value = endpoint.parse(result)
+        setattr(bundle, name, value)
+    bundle.elapsed = time.time() - started
+    logger.info(f"Fundamentals for {symbol}: {len(names) - len(bundle.errors)}/{len(names)} sections in {bundle.elapsed:.2f}s")
+    return bundle
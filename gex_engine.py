@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import brentq
+
+from greeks_engine import MIN_DAYS, black_scholes_greeks, gamma_exposure_profile
+from lru_cache import KeyedLRU
+from option_chain import CALL, OptionChain
+
+CONTRACT_MULTIPLIER = 100
+# Cells per spots x contracts block when repricing gamma (~16 MB of float64 per temporary)
+REPRICE_BLOCK_CELLS = 2_000_000
+# Spot views kept per snapshot surface by :meth:`GexSurface.at_spot`
+SPOT_VIEWS = 8
+
+_MEASURES = ("gamma", "vanna", "charm", "oi", "volume", "iv_weight", "iv_oi", "listed")
+
+
+class _SnapshotState:
+    """Spot-independent pricing inputs and memo tables shared by every spot view of one surface."""
+
+    def __init__(self, inputs: Dict[str, np.ndarray], contracts: Dict[str, np.ndarray]) -> None:
+        self.inputs = inputs
+        self.contracts = contracts
+        self.lock = threading.Lock()
+        self.views: "OrderedDict[float, GexSurface]" = OrderedDict()
+        self.crossings: Dict[Tuple, List[float]] = {}
+
+
+@dataclass
+class GexSurface:
+    """Dealer exposure per strike x expiration for one ticker at one spot.
+
+    ``grids[(side, measure)]`` are (strikes x expirations) matrices, with
+    side ``call``/``put`` and measure:
+
+    * ``gamma`` - gamma x OI x 100 x spot (the app's GEX convention)
+    * ``vanna`` - vanna (per vol point) x OI x 100 x spot
+    * ``charm`` - charm (per day) x OI x 100 x spot
+    * ``oi``, ``volume`` and ``listed`` (contract count)
+    * ``iv_weight`` / ``iv_oi`` - sum of IV x OI and of OI over quoted IVs
+
+    Greeks come from Black-Scholes at each contract's IV, so every
+    expiration uses the same model; contracts without an IV fall back to
+    the feed's gamma. Net exposure is call minus put (dealers long calls,
+    short puts). Every query is a column selection and a reduction over
+    the precomputed matrices.
+
+    ``contracts`` keeps the repriceable contracts (quoted IV and open
+    interest) as flat arrays - strike, T, iv, signed OI weight and
+    expiration column - so :meth:`gamma_profile` can re-run the model at
+    hypothetical spots. :meth:`at_spot` reprices the same snapshot at a new
+    spot; those views share the gamma flip memo.
+    """
+
+    spot: float
+    strikes: np.ndarray
+    expirations: List[str]
+    dte: np.ndarray
+    grids: Dict[Tuple[str, str], np.ndarray]
+    contracts: Dict[str, np.ndarray] = field(default_factory=dict)
+    risk_free_rate: float = 0.045
+    _shared: _SnapshotState = field(default_factory=lambda: _SnapshotState({}, {}), repr=False)
+
+    def at_spot(self, spot: float) -> "GexSurface":
+        """The same contracts repriced at ``spot``, memoized for the last ``SPOT_VIEWS`` spots."""
+        spot = float(spot or 0)
+        shared = self._shared
+        if spot == self.spot or spot <= 0 or not shared.inputs:
+            return self
+        with shared.lock:
+            view = shared.views.get(spot)
+            if view is not None:
+                shared.views.move_to_end(spot)
+                return view
+        view = _price_surface(self.expirations, self.dte, shared, spot, self.risk_free_rate)
+        with shared.lock:
+            shared.views[spot] = view
+            while len(shared.views) > SPOT_VIEWS:
+                shared.views.popitem(last=False)
+        return view
+
+    def _columns(self, expirations: Optional[Sequence[str]]) -> np.ndarray:
+        if expirations is None:
+            return np.arange(len(self.expirations))
+        wanted = set(expirations)
+        return np.array([i for i, exp in enumerate(self.expirations) if exp in wanted], dtype=np.int64)
+
+    def per_strike(self, side: str, measure: str, expirations: Optional[Sequence[str]] = None) -> np.ndarray:
+        """``measure`` for one side summed over the selected expirations, one value per strike."""
+        return self.grids[(side, measure)][:, self._columns(expirations)].sum(axis=1)
+
+    def net(self, measure: str = "gamma", expirations: Optional[Sequence[str]] = None) -> np.ndarray:
+        return self.per_strike("call", measure, expirations) - self.per_strike("put", measure, expirations)
+
+    def _listed(self, expirations: Optional[Sequence[str]]) -> np.ndarray:
+        return (self.per_strike("call", "listed", expirations) + self.per_strike("put", "listed", expirations)) > 0
+
+    def by_strike(self, expirations: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Exposure table over the strikes listed in the selected expirations."""
+        listed = self._listed(expirations)
+        columns = {"strike": self.strikes}
+        for measure in ("gamma", "vanna", "charm"):
+            call = self.per_strike("call", measure, expirations)
+            put = self.per_strike("put", measure, expirations)
+            label = "gex" if measure == "gamma" else measure
+            columns[f"call_{label}"], columns[f"put_{label}"], columns[f"net_{label}"] = call, put, call - put
+        columns["call_oi"] = self.per_strike("call", "oi", expirations)
+        columns["put_oi"] = self.per_strike("put", "oi", expirations)
+        return pd.DataFrame(columns)[listed].reset_index(drop=True)
+
+    def by_expiration(self) -> pd.DataFrame:
+        """Call/put/net GEX, vanna, charm and OI per expiration (the gamma timeline)."""
+        data = {"expiration": self.expirations, "dte": self.dte}
+        for measure in ("gamma", "vanna", "charm", "oi"):
+            call = self.grids[("call", measure)].sum(axis=0)
+            put = self.grids[("put", measure)].sum(axis=0)
+            label = "gex" if measure == "gamma" else measure
+            data[f"call_{label}"], data[f"put_{label}"] = call, put
+            if measure != "oi":
+                data[f"net_{label}"] = call - put
+        return pd.DataFrame(data)
+
+    def totals(self, expirations: Optional[Sequence[str]] = None) -> Dict[str, float]:
+        call = float(self.per_strike("call", "gamma", expirations).sum())
+        put = float(self.per_strike("put", "gamma", expirations).sum())
+        return {
+            "gex_index": call - put,
+            "call_gex": call,
+            "put_gex": put,
+            "total_gex": abs(call) + abs(put),
+            "net_vanna": float(self.net("vanna", expirations).sum()),
+            "net_charm": float(self.net("charm", expirations).sum()),
+        }
+
+    def cumulative_profile(self, expirations: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Net GEX accumulated from the lowest strike up."""
+        listed = self._listed(expirations)
+        net = self.net("gamma", expirations)[listed]
+        return pd.DataFrame({"strike": self.strikes[listed], "net_gex": net, "cumulative_gex": np.cumsum(net)})
+
+    def zero_gamma_level(self, expirations: Optional[Sequence[str]] = None) -> Optional[float]:
+        """Strike where the cumulative net GEX profile crosses zero nearest to spot, interpolated.
+
+        A static read of the flip (exposures are not repriced at other
+        spots); None when the profile never changes sign.
+        """
+        profile = self.cumulative_profile(expirations)
+        strikes = profile["strike"].to_numpy()
+        cumulative = profile["cumulative_gex"].to_numpy()
+        crossings = np.flatnonzero(np.sign(cumulative[:-1]) * np.sign(cumulative[1:]) < 0)
+        if not crossings.size:
+            return None
+        lo, hi = strikes[crossings], strikes[crossings + 1]
+        a, b = cumulative[crossings], cumulative[crossings + 1]
+        levels = lo + (hi - lo) * np.abs(a) / (np.abs(a) + np.abs(b))
+        return float(levels[np.argmin(np.abs(levels - self.spot))])
+
+    def gamma_profile(self, spots, expirations: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Net dealer GEX (calls minus puts, x OI x 100 x spot) if spot were each of ``spots``.
+
+        Gamma is repriced with IVs and expiries held fixed, as a
+        spots x contracts grid in blocks of ``REPRICE_BLOCK_CELLS``.
+        """
+        spots = np.atleast_1d(np.asarray(spots, dtype=np.float64))
+        contracts = self.contracts
+        if not contracts or not contracts["strike"].size:
+            return np.zeros(spots.size)
+        selected = np.isin(contracts["exp_index"], self._columns(expirations))
+        strike, T = contracts["strike"][selected], contracts["T"][selected]
+        iv, weight = contracts["iv"][selected], contracts["weight"][selected]
+        block = max(1, REPRICE_BLOCK_CELLS // max(strike.size, 1))
+        profile = np.empty(spots.size)
+        for start in range(0, spots.size, block):
+            chunk = spots[start:start + block]
+            profile[start:start + block] = gamma_exposure_profile(chunk, strike, T, self.risk_free_rate, iv, weight)
+        return profile * CONTRACT_MULTIPLIER
+
+    def gamma_flip(
+        self,
+        expirations: Optional[Sequence[str]] = None,
+        width: float = 0.15,
+        points: int = 61,
+    ) -> Optional[float]:
+        """Spot where repriced net dealer gamma changes sign, nearest to the current spot.
+
+        Scans ``points`` spots within +/- ``width`` of spot, then refines each
+        bracketing pair with Brent's method. None when net gamma keeps one
+        sign over the whole range. The repriced profile does not depend on
+        the current spot, so the crossings are solved once per snapshot (at
+        the first spot asking) and shared by every :meth:`at_spot` view.
+        """
+        if self.spot <= 0:
+            return None
+        key = (tuple(expirations) if expirations is not None else None, width, points)
+        shared = self._shared
+        with shared.lock:
+            crossings = shared.crossings.get(key)
+        if crossings is None:
+            crossings = self._solve_crossings(expirations, width, points)
+            with shared.lock:
+                shared.crossings[key] = crossings
+        if not crossings:
+            return None
+        return min(crossings, key=lambda level: abs(level - self.spot))
+
+    def _solve_crossings(self, expirations: Optional[Sequence[str]], width: float, points: int) -> List[float]:
+        spots = self.spot * np.linspace(1 - width, 1 + width, points)
+        profile = self.gamma_profile(spots, expirations)
+        crossings = np.flatnonzero(np.sign(profile[:-1]) * np.sign(profile[1:]) < 0)
+        return [
+            float(brentq(lambda x: self.gamma_profile([x], expirations)[0], spots[i], spots[i + 1],
+                         xtol=self.spot * 1e-5))
+            for i in crossings
+        ]
+
+    def walls(self, expirations: Optional[Sequence[str]] = None, measure: str = "gamma") -> Tuple[float, float]:
+        """(call wall, put wall): strikes with the largest call / put ``measure`` (gamma or oi)."""
+        if not self.strikes.size:
+            return self.spot, self.spot
+        call = self.per_strike("call", measure, expirations)
+        put = self.per_strike("put", measure, expirations)
+        return float(self.strikes[np.argmax(call)]), float(self.strikes[np.argmax(put)])
+
+    def top_levels(self, n: int = 5, expirations: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """The ``n`` strikes with the largest absolute net GEX (gamma walls / price magnets)."""
+        net = np.abs(self.net("gamma", expirations))
+        order = np.argsort(-net, kind="stable")[:n]
+        order = order[net[order] > 0]
+        return pd.DataFrame({"strike": self.strikes[order], "abs_net_gex": net[order]})
+
+    def weighted_iv(self, expirations: Optional[Sequence[str]] = None) -> float:
+        """OI-weighted IV over contracts with both a quoted IV and open interest."""
+        weight = self.per_strike("call", "iv_oi", expirations).sum() + self.per_strike("put", "iv_oi", expirations).sum()
+        if weight <= 0:
+            return 0.0
+        total = self.per_strike("call", "iv_weight", expirations).sum() + self.per_strike("put", "iv_weight", expirations).sum()
+        return float(total / weight)
+
+
+def _days_to(expiration: str, today: date) -> Optional[float]:
+    try:
+        days = (datetime.strptime(str(expiration)[:10], "%Y-%m-%d").date() - today).days
+    except (TypeError, ValueError):
+        return None
+    return None if days < 0 else max(float(days), MIN_DAYS)
+
+
+def build_gex_surface(
+    chains: Dict[str, OptionChain],
+    spot: float,
+    today: date,
+    risk_free_rate: float = 0.045,
+) -> GexSurface:
+    """Price every contract of every expiration once and bin the exposures into the surface."""
+    expirations: List[str] = []
+    dte: List[float] = []
+    parts: List[OptionChain] = []
+    for expiration, chain in sorted(chains.items()):
+        days = _days_to(expiration, today)
+        if days is None or not len(chain):
+            continue
+        expirations.append(expiration)
+        dte.append(days)
+        parts.append(chain)
+
+    exp_index = np.repeat(np.arange(len(parts)), [len(chain) for chain in parts]).astype(np.int64)
+    listed = np.concatenate([chain.strike for chain in parts]) > 0 if parts else np.zeros(0, dtype=bool)
+    exp_index = exp_index[listed]
+
+    def concat(name: str) -> np.ndarray:
+        return np.concatenate([getattr(chain, name) for chain in parts])[listed] if parts else np.zeros(0)
+
+    strike = concat("strike")
+    is_call = concat("option_type") == CALL
+    iv = concat("iv")
+    oi = concat("open_interest")
+    T = np.asarray(dte, dtype=np.float64)[exp_index] / 365.0 if parts else np.zeros(0)
+    strikes, strike_pos = np.unique(strike, return_inverse=True)
+    quoted = (iv > 0) & (oi > 0)
+    inputs = {
+        "strike": strike,
+        "is_call": is_call,
+        "iv": iv,
+        "oi": oi,
+        "T": T,
+        "feed_gamma": np.where(concat("has_greeks").astype(bool), concat("gamma"), 0.0),
+        "volume": concat("volume"),
+        "strikes": strikes,
+        "cell": strike_pos * len(parts) + exp_index,
+    }
+    contracts = {
+        "strike": strike[quoted],
+        "T": T[quoted],
+        "iv": iv[quoted],
+        "weight": np.where(is_call, oi, -oi)[quoted],
+        "exp_index": exp_index[quoted],
+    }
+    shared = _SnapshotState(inputs, contracts)
+    surface = _price_surface(expirations, np.asarray(dte, dtype=np.float64), shared, float(spot), risk_free_rate)
+    shared.views[surface.spot] = surface
+    return surface
+
+
+def _price_surface(
+    expirations: List[str],
+    dte: np.ndarray,
+    shared: _SnapshotState,
+    spot: float,
+    risk_free_rate: float,
+) -> GexSurface:
+    inputs = shared.inputs
+    strike, is_call, iv, oi = inputs["strike"], inputs["is_call"], inputs["iv"], inputs["oi"]
+    greeks = black_scholes_greeks(spot, strike, inputs["T"], risk_free_rate, iv, is_call)
+    gamma = np.where(iv > 0, greeks["gamma"], inputs["feed_gamma"])
+    scale = oi * CONTRACT_MULTIPLIER * spot
+    quoted = (iv > 0) & (oi > 0)
+    values = {
+        "gamma": gamma * scale,
+        "vanna": greeks["vanna"] * scale,
+        "charm": greeks["charm"] * scale,
+        "oi": oi,
+        "volume": inputs["volume"],
+        "iv_weight": np.where(quoted, iv * oi, 0.0),
+        "iv_oi": np.where(quoted, oi, 0.0),
+        "listed": np.ones(strike.size),
+    }
+
+    strikes = inputs["strikes"]
+    shape = (strikes.size, len(expirations))
+    grids = {}
+    for side, mask in (("call", is_call), ("put", ~is_call)):
+        for measure in _MEASURES:
+            grids[(side, measure)] = np.bincount(
+                inputs["cell"], weights=np.where(mask, values[measure], 0.0), minlength=shape[0] * shape[1]
+            ).reshape(shape)
+    return GexSurface(spot, strikes, expirations, dte, grids, shared.contracts, risk_free_rate, shared)
+
+
+class GexSurfaceCache(KeyedLRU[GexSurface]):
+    """Built :class:`GexSurface` objects by caller key, least recently used first out.
+
+    Callers key a surface by the ticker and its chain snapshots, so every
+    tab reading the same snapshot shares one build; readers at another spot
+    take :meth:`GexSurface.at_spot` of it.
+    """
+
+    stat_names = ("surfaces", "builds")
+
+    def __init__(self, max_entries: int = 32) -> None:
+        super().__init__(max_entries)
+
+    def surface(self, key: Hashable, build: Callable[[], GexSurface]) -> GexSurface:
+        return self.get_or_build(key, build)
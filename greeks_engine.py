@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+from scipy.special import erf
+
+_SQRT2 = np.sqrt(2.0)
+_INV_SQRT_2PI = 1.0 / np.sqrt(2.0 * np.pi)
+
+GREEK_NAMES = ("delta", "gamma", "theta", "vega", "rho", "vanna", "volga", "charm", "prob_itm")
+
+# Contracts expiring today are priced with half a day left instead of being dropped
+MIN_DAYS = 0.5
+# Fallback IV when neither the feed nor a fitted smile/surface has one
+DEFAULT_IV = 0.20
+
+
+def norm_cdf(x):
+    return 0.5 * (1.0 + erf(np.asarray(x, dtype=np.float64) / _SQRT2))
+
+
+def norm_pdf(x):
+    x = np.asarray(x, dtype=np.float64)
+    return _INV_SQRT_2PI * np.exp(-0.5 * x * x)
+
+
+def black_scholes_greeks(S, K, T, r, sigma, is_call) -> Dict[str, np.ndarray]:
+    """Black-Scholes greeks for a whole chain in one NumPy pass.
+
+    All inputs broadcast against each other, so a chain (arrays of K, T,
+    sigma, is_call) can be priced at one spot, or at a column of spots for a
+    spots x contracts grid. Conventions match the per-contract helpers in
+    app.py: theta and charm are per calendar day, vega and rho per 1 point,
+    vanna per 1 vol point and volga per (1 vol point)^2. ``prob_itm`` is the
+    risk-neutral N(d2) / N(-d2). Contracts with non-positive S, K, T or sigma
+    get zeros everywhere.
+    """
+    S, K, T, sigma, is_call = np.broadcast_arrays(
+        np.asarray(S, dtype=np.float64),
+        np.asarray(K, dtype=np.float64),
+        np.asarray(T, dtype=np.float64),
+        np.asarray(sigma, dtype=np.float64),
+        np.asarray(is_call, dtype=bool),
+    )
+    valid = (S > 0) & (K > 0) & (T > 0) & (sigma > 0)
+    # Substitute harmless values so invalid rows never produce warnings
+    S_ = np.where(valid, S, 1.0)
+    K_ = np.where(valid, K, 1.0)
+    T_ = np.where(valid, T, 1.0)
+    sig = np.where(valid, sigma, 1.0)
+
+    sqrt_T = np.sqrt(T_)
+    sig_sqrt_T = sig * sqrt_T
+    d1 = (np.log(S_ / K_) + (r + 0.5 * sig * sig) * T_) / sig_sqrt_T
+    d2 = d1 - sig_sqrt_T
+
+    pdf_d1 = norm_pdf(d1)
+    cdf_d1 = norm_cdf(d1)
+    cdf_d2 = norm_cdf(d2)
+    cdf_neg_d2 = 1.0 - cdf_d2
+    exp_rT = np.exp(-r * T_)
+    charm_core = pdf_d1 * (2 * r * T_ - d2 * sqrt_T) / (2 * T_ * sig_sqrt_T)
+
+    delta = np.where(is_call, cdf_d1, cdf_d1 - 1.0)
+    theta_decay = -S_ * pdf_d1 * sig / (2 * sqrt_T)
+    theta = np.where(
+        is_call,
+        theta_decay - r * K_ * exp_rT * cdf_d2,
+        theta_decay + r * K_ * exp_rT * cdf_neg_d2,
+    ) / 365
+    rho = np.where(is_call, K_ * T_ * exp_rT * cdf_d2, -K_ * T_ * exp_rT * cdf_neg_d2) / 100
+    charm = np.where(is_call, r * delta - charm_core, -r * (1 - delta) + charm_core) / 365
+    gamma = pdf_d1 / (S_ * sig_sqrt_T)
+    vega = S_ * pdf_d1 * sqrt_T / 100
+    vanna = -pdf_d1 * d2 / sig / 100
+    volga = S_ * pdf_d1 * sqrt_T * (d1 * d2 - 1) / (sig * sig) / 10000
+    prob_itm = np.where(is_call, cdf_d2, cdf_neg_d2)
+
+    results = {
+        "delta": delta,
+        "gamma": gamma,
+        "theta": theta,
+        "vega": vega,
+        "rho": rho,
+        "vanna": vanna,
+        "volga": volga,
+        "charm": charm,
+        "prob_itm": prob_itm,
+    }
+    return {name: np.where(valid, values, 0.0) for name, values in results.items()}
+
+
+def gamma_exposure_profile(spots, K, T, r, sigma, weights) -> np.ndarray:
+    """``sum(weights * gamma * S)`` for each hypothetical spot S, over a spots x contracts grid.
+
+    Black-Scholes gamma times spot is ``pdf(d1) / (sigma * sqrt(T))`` and d1
+    is linear in ``log(S)``, so the per-contract terms are computed once and
+    each grid cell costs a multiply-add, a square and an exp. Contracts with
+    non-positive K, T or sigma contribute nothing.
+    """
+    spots = np.atleast_1d(np.asarray(spots, dtype=np.float64))
+    K, T, sigma, weights = np.broadcast_arrays(
+        np.asarray(K, dtype=np.float64),
+        np.asarray(T, dtype=np.float64),
+        np.asarray(sigma, dtype=np.float64),
+        np.asarray(weights, dtype=np.float64),
+    )
+    valid = (K > 0) & (T > 0) & (sigma > 0)
+    K, T, sigma, weights = K[valid], T[valid], sigma[valid], weights[valid]
+    sig_sqrt_T = sigma * np.sqrt(T)
+    slope = 1.0 / sig_sqrt_T
+    intercept = ((r + 0.5 * sigma * sigma) * T - np.log(K)) * slope
+    coef = weights * slope * _INV_SQRT_2PI
+
+    log_spots = np.log(np.where(spots > 0, spots, np.nan))
+    d1 = np.multiply.outer(log_spots, slope)
+    d1 += intercept
+    np.square(d1, out=d1)
+    d1 *= -0.5
+    np.exp(d1, out=d1)
+    return np.nan_to_num(d1 @ coef)
+
+
+def black_scholes_greeks_scalar(S, K, T, r, sigma, is_call) -> Dict[str, float]:
+    """Single-contract convenience wrapper returning plain floats."""
+    return {name: float(values) for name, values in black_scholes_greeks(S, K, T, r, sigma, is_call).items()}
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+TRADING_DAYS = 252
+
+
+def _as_2d(values) -> np.ndarray:
+    """``values`` as a float (symbols x bars) array; a 1-D series becomes one row."""
+    array = np.asarray(values, dtype=np.float64)
+    return array.reshape(1, -1) if array.ndim == 1 else array
+
+
+def _rolling_sum(values: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Windowed sums over the bars axis and the count of non-NaN values in each window."""
+    valid = ~np.isnan(values)
+    pad = np.zeros((values.shape[0], 1))
+    sums = np.concatenate([pad, np.cumsum(np.where(valid, values, 0.0), axis=1)], axis=1)
+    counts = np.concatenate([pad, np.cumsum(valid, axis=1)], axis=1)
+    out = np.full(values.shape, np.nan)
+    count = np.zeros(values.shape)
+    if values.shape[1] >= period:
+        out[:, period - 1:] = sums[:, period:] - sums[:, :-period]
+        count[:, period - 1:] = counts[:, period:] - counts[:, :-period]
+    return out, count
+
+
+def _rolling_mean(values: np.ndarray, period: int) -> np.ndarray:
+    total, count = _rolling_sum(values, period)
+    return np.where(count == period, total / period, np.nan)
+
+
+def _rolling_std(values: np.ndarray, period: int, ddof: int = 0) -> np.ndarray:
+    # Centre each row first so the sum-of-squares form keeps its precision
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=1, keepdims=True)
+    centre = np.where(valid, values, 0.0).sum(axis=1, keepdims=True) / np.maximum(counts, 1)
+    centred = values - centre
+    total, count = _rolling_sum(centred, period)
+    squares, _ = _rolling_sum(centred * centred, period)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = (squares - total * total / period) / (period - ddof)
+    return np.where(count == period, np.sqrt(np.clip(variance, 0.0, None)), np.nan)
+
+
+def _smooth(values: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    """Exponential smoothing seeded with the first full ``period`` simple mean of each row.
+
+    Rows that are NaN-padded on the left seed on their own first full
+    window, and a NaN inside a row restarts the seed after it.
+    """
+    seed = _rolling_mean(values, period)
+    out = np.full(values.shape, np.nan)
+    previous = np.full(values.shape[0], np.nan)
+    for t in range(values.shape[1]):
+        previous = np.where(np.isnan(previous), seed[:, t], previous + alpha * (values[:, t] - previous))
+        out[:, t] = previous
+    return out
+
+
+def sma(values, period: int = 20) -> np.ndarray:
+    """Simple moving average; NaN until ``period`` bars are available."""
+    return _rolling_mean(_as_2d(values), period)
+
+
+def ema(values, period: int = 20) -> np.ndarray:
+    """Exponential moving average (``alpha = 2 / (period + 1)``) seeded with the first SMA."""
+    return _smooth(_as_2d(values), period, 2.0 / (period + 1))
+
+
+def _gains_losses(close: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    deltas = np.diff(close, axis=1, prepend=np.nan)
+    gains = np.where(deltas > 0, deltas, np.where(np.isnan(deltas), np.nan, 0.0))
+    losses = np.where(deltas < 0, -deltas, np.where(np.isnan(deltas), np.nan, 0.0))
+    return gains, losses
+
+
+def _rsi_from_averages(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    return np.where(avg_loss == 0, 100.0, rsi)
+
+
+def rsi(close, period: int = 14) -> np.ndarray:
+    """Wilder RSI; the first value needs ``period + 1`` closes."""
+    gains, losses = _gains_losses(_as_2d(close))
+    alpha = 1.0 / period
+    return _rsi_from_averages(_smooth(gains, period, alpha), _smooth(losses, period, alpha))
+
+
+def true_range(high, low, close) -> np.ndarray:
+    high, low, close = _as_2d(high), _as_2d(low), _as_2d(close)
+    previous = np.concatenate([np.full((close.shape[0], 1), np.nan), close[:, :-1]], axis=1)
+    # The first bar of a row has no previous close and falls back to high - low
+    return np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    """Average true range with Wilder smoothing."""
+    return _smooth(true_range(high, low, close), period, 1.0 / period)
+
+
+def historical_volatility(close, period: int = 20, annualization: int = TRADING_DAYS) -> np.ndarray:
+    """Annualized rolling volatility (as a fraction) of ``period`` daily log returns."""
+    close = _as_2d(close)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(np.log(np.where(close > 0, close, np.nan)), axis=1, prepend=np.nan)
+    return _rolling_std(returns, period, ddof=1) * np.sqrt(annualization)
+
+
+def bollinger(close, period: int = 20, num_std: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bollinger bands as ``(middle, upper, lower)`` using the population standard deviation."""
+    close = _as_2d(close)
+    middle = _rolling_mean(close, period)
+    width = num_std * _rolling_std(close, period)
+    return middle, middle + width, middle - width
+
+
+def last_value(series: np.ndarray) -> Optional[float]:
+    """Latest value of a single-row series, or ``None`` when it is missing."""
+    if not series.size or np.isnan(series[0, -1]):
+        return None
+    return float(series[0, -1])
+
+
+class RollingIndicators:
+    """Indicator series for a (symbols x bars) panel, advanced one bar at a time.
+
+    The constructor computes the full SMA, EMA, RSI, ATR, HV and Bollinger
+    series in one pass and keeps only the state each one needs to continue
+    (the recursive averages and a short trailing window of closes).
+    :meth:`update` then folds in one new bar per symbol without touching
+    the history again. ATR is computed only when highs and lows are given.
+    """
+
+    def __init__(
+        self,
+        close,
+        high=None,
+        low=None,
+        sma_period: int = 20,
+        ema_period: int = 20,
+        rsi_period: int = 14,
+        atr_period: int = 14,
+        hv_period: int = 20,
+        bb_period: int = 20,
+        bb_std: float = 2.0,
+    ) -> None:
+        close = _as_2d(close)
+        self.sma_period, self.ema_period, self.rsi_period = sma_period, ema_period, rsi_period
+        self.atr_period, self.hv_period, self.bb_period, self.bb_std = atr_period, hv_period, bb_period, bb_std
+        self._window = max(sma_period, ema_period, rsi_period + 1, atr_period + 1, hv_period + 1, bb_period)
+
+        gains, losses = _gains_losses(close)
+        self._avg_gain = _smooth(gains, rsi_period, 1.0 / rsi_period)
+        self._avg_loss = _smooth(losses, rsi_period, 1.0 / rsi_period)
+        middle, upper, lower = bollinger(close, bb_period, bb_std)
+        self.series: Dict[str, np.ndarray] = {
+            "sma": sma(close, sma_period),
+            "ema": ema(close, ema_period),
+            "rsi": _rsi_from_averages(self._avg_gain, self._avg_loss),
+            "hv": historical_volatility(close, hv_period),
+            "bb_middle": middle,
+            "bb_upper": upper,
+            "bb_lower": lower,
+        }
+        self._has_range = high is not None and low is not None
+        if self._has_range:
+            ranges = true_range(high, low, close)
+            self.series["atr"] = _smooth(ranges, atr_period, 1.0 / atr_period)
+            self._ranges = self._tail(ranges, atr_period)
+        else:
+            self.series["atr"] = np.full(close.shape, np.nan)
+        self._closes = self._tail(close, self._window)
+        self._latest = {name: self._latest_of(values) for name, values in self.series.items()}
+        self._avg_gain, self._avg_loss = self._latest_of(self._avg_gain), self._latest_of(self._avg_loss)
+
+    @staticmethod
+    def _tail(values: np.ndarray, width: int) -> np.ndarray:
+        tail = np.full((values.shape[0], width), np.nan)
+        if values.shape[1]:
+            keep = values[:, -width:]
+            tail[:, width - keep.shape[1]:] = keep
+        return tail
+
+    @staticmethod
+    def _latest_of(values: np.ndarray) -> np.ndarray:
+        return values[:, -1].copy() if values.shape[1] else np.full(values.shape[0], np.nan)
+
+    def latest(self) -> Dict[str, np.ndarray]:
+        """Current value of every indicator, one entry per symbol."""
+        return {name: values.copy() for name, values in self._latest.items()}
+
+    def update(self, close, high=None, low=None) -> Dict[str, np.ndarray]:
+        """Fold in one new bar per symbol and return the updated latest values."""
+        close = np.asarray(close, dtype=np.float64).reshape(-1)
+        previous_close = self._closes[:, -1]
+        self._closes = np.concatenate([self._closes[:, 1:], close[:, None]], axis=1)
+        closes = self._closes
+        latest = self._latest
+
+        latest["sma"] = _rolling_mean(closes[:, -self.sma_period:], self.sma_period)[:, -1]
+        alpha = 2.0 / (self.ema_period + 1)
+        ema_seed = _rolling_mean(closes[:, -self.ema_period:], self.ema_period)[:, -1]
+        latest["ema"] = np.where(np.isnan(latest["ema"]), ema_seed, latest["ema"] + alpha * (close - latest["ema"]))
+
+        delta = close - previous_close
+        gain, loss = np.where(delta > 0, delta, 0.0), np.where(delta < 0, -delta, 0.0)
+        window_gains, window_losses = _gains_losses(closes[:, -(self.rsi_period + 1):])
+        self._avg_gain = self._wilder(self._avg_gain, gain, window_gains[:, 1:], self.rsi_period, delta)
+        self._avg_loss = self._wilder(self._avg_loss, loss, window_losses[:, 1:], self.rsi_period, delta)
+        latest["rsi"] = _rsi_from_averages(self._avg_gain, self._avg_loss)
+
+        latest["hv"] = historical_volatility(closes[:, -(self.hv_period + 1):], self.hv_period)[:, -1]
+        middle, upper, lower = bollinger(closes[:, -self.bb_period:], self.bb_period, self.bb_std)
+        latest["bb_middle"], latest["bb_upper"], latest["bb_lower"] = middle[:, -1], upper[:, -1], lower[:, -1]
+
+        if self._has_range and high is not None and low is not None:
+            high = np.asarray(high, dtype=np.float64).reshape(-1)
+            low = np.asarray(low, dtype=np.float64).reshape(-1)
+            bar_range = np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
+            self._ranges = np.concatenate([self._ranges[:, 1:], bar_range[:, None]], axis=1)
+            latest["atr"] = self._wilder(latest["atr"], bar_range, self._ranges, self.atr_period, bar_range)
+        return self.latest()
+
+    @staticmethod
+    def _wilder(average: np.ndarray, value: np.ndarray, window: np.ndarray, period: int, check: np.ndarray) -> np.ndarray:
+        # Same recursion and seeding as ``_smooth``: rows still warming up seed
+        # from their first full window, a missing bar resets the average.
+        seed = _rolling_mean(window, period)[:, -1]
+        updated = np.where(np.isnan(average), seed, average + (value - average) / period)
+        return np.where(np.isnan(check), np.nan, updated)
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from volume_profile import LiquidityPulse, MultiResolutionProfile, RollingLiquidityPulse
+
+logger = logging.getLogger(__name__)
+
+INTRADAY_BAR_DTYPE = np.dtype([
+    ("time", "datetime64[s]"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+
+# fetch(symbol, start) -> bars stamped at or after ``start``, oldest first
+IntradayFetcher = Callable[[str, datetime], np.ndarray]
+# listener(symbol, bars, reset) receives each bar once, after it is final;
+# ``reset`` means a backfill replaced the history and the bars restart it
+BarListener = Callable[[str, np.ndarray, bool], None]
+
+
+def intraday_bars_from_records(records: Iterable[Dict], time_key: str = "time") -> np.ndarray:
+    """Tradier timesales / FMP historical-chart rows as a time-sorted INTRADAY_BAR_DTYPE array."""
+    rows = []
+    for item in records or []:
+        try:
+            close = float(item.get("close", item.get("price")))
+            rows.append((
+                np.datetime64(str(item[time_key]).replace(" ", "T")[:19], "s"),
+                float(item.get("open") or close),
+                float(item.get("high") or close),
+                float(item.get("low") or close),
+                close,
+                float(item.get("volume") or 0.0),
+            ))
+        except (KeyError, TypeError, ValueError):
+            continue
+    bars = np.array(rows, dtype=INTRADAY_BAR_DTYPE)
+    return np.sort(bars, order="time")
+
+
+class BarRing:
+    """Fixed-capacity ring buffer of intraday bars in time order.
+
+    Appending a bar stamped like the newest one replaces it (the still
+    forming bar gets its final values); older bars are ignored.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._bars = np.zeros(capacity, dtype=INTRADAY_BAR_DTYPE)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_time(self) -> Optional[np.datetime64]:
+        return self._bars[(self._start + self._size - 1) % self.capacity]["time"] if self._size else None
+
+    def append(self, bars: np.ndarray) -> int:
+        """Add bars newer than the buffer; returns how many new timestamps were added."""
+        last = self.last_time
+        if last is not None and bars.size:
+            if bars["time"][-1] < last:
+                return 0
+            same = bars["time"] == last
+            if same.any():
+                self._bars[(self._start + self._size - 1) % self.capacity] = bars[same][-1]
+            bars = bars[bars["time"] > last]
+        bars = bars[-self.capacity:]
+        slots = (self._start + self._size + np.arange(bars.size)) % self.capacity
+        self._bars[slots] = bars
+        overflow = max(self._size + bars.size - self.capacity, 0)
+        self._start = (self._start + overflow) % self.capacity
+        self._size = min(self._size + bars.size, self.capacity)
+        return int(bars.size)
+
+    def view(self) -> np.ndarray:
+        """Buffered bars, oldest first (a copy)."""
+        order = (self._start + np.arange(self._size)) % self.capacity
+        return self._bars[order]
+
+
+@dataclass
+class _SymbolStream:
+    ring: BarRing
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    covered_from: Optional[datetime] = None
+    checked_at: float = 0.0
+    emitted: Optional[np.datetime64] = None
+
+
+class IntradayStream:
+    """Per-symbol intraday bars kept current by fetching only what is new.
+
+    Each symbol has a :class:`BarRing` of ``capacity`` bars. :meth:`refresh`
+    asks the fetcher for bars from the newest buffered timestamp onwards
+    (re-reading that bar, which may still have been forming), or backfills
+    when a caller needs an older window than the buffer covers. Requests
+    within ``min_interval`` seconds of the last one are served from the
+    buffer. Listeners get every bar exactly once, when a newer bar proves
+    it final, so incremental calculators never see a bar change under them;
+    a backfill that replaces the buffer is announced with ``reset``.
+    """
+
+    def __init__(self, fetch: IntradayFetcher, capacity: int = 390 * 5, min_interval: float = 15.0) -> None:
+        self.fetch = fetch
+        self.capacity = capacity
+        self.min_interval = min_interval
+        self._streams: Dict[str, _SymbolStream] = {}
+        self._listeners: List[BarListener] = []
+        self._lock = threading.Lock()
+        self.fetches = 0
+        self.bars_fetched = 0
+
+    def subscribe(self, listener: BarListener) -> None:
+        with self._lock:
+            self._listeners.append(listener)
+
+    def _stream(self, symbol: str) -> _SymbolStream:
+        with self._lock:
+            stream = self._streams.get(symbol)
+            if stream is None:
+                stream = self._streams[symbol] = _SymbolStream(BarRing(self.capacity))
+            return stream
+
+    def refresh(self, symbol: str, start: datetime) -> np.ndarray:
+        """Bring ``symbol`` up to date for a window starting at ``start`` and return that window."""
+        symbol = symbol.upper()
+        stream = self._stream(symbol)
+        reset = False
+        with stream.lock:
+            backfill = stream.covered_from is None or start < stream.covered_from
+            if backfill or time.time() - stream.checked_at >= self.min_interval:
+                last = stream.ring.last_time
+                since = start if backfill or last is None else last.astype(datetime)
+                try:
+                    bars = self.fetch(symbol, since)
+                except Exception as exc:
+                    logger.warning(f"Intraday fetch for {symbol} failed: {exc}")
+                    bars = None
+                if bars is not None:
+                    with self._lock:
+                        self.fetches += 1
+                        self.bars_fetched += int(bars.size)
+                    if backfill and len(stream.ring) and bars.size:
+                        # The backfill covers everything buffered; restart the ring and the listeners
+                        stream.ring = BarRing(self.capacity)
+                        stream.emitted = None
+                        reset = True
+                    stream.ring.append(bars)
+                    stream.covered_from = start if stream.covered_from is None else min(start, stream.covered_from)
+                    stream.checked_at = time.time()
+            window = stream.ring.view()
+            final = self._take_final(stream, window)
+            # Still under the symbol lock so listeners see batches in order
+            if final.size or reset:
+                for listener in list(self._listeners):
+                    listener(symbol, final, reset)
+        return window[window["time"] >= np.datetime64(start, "s")]
+
+    @staticmethod
+    def _take_final(stream: _SymbolStream, window: np.ndarray) -> np.ndarray:
+        # Everything but the newest bar is final; emit what was not emitted yet
+        if window.size < 2:
+            return window[:0]
+        done = window[:-1]
+        if stream.emitted is not None:
+            done = done[done["time"] > stream.emitted]
+        if done.size:
+            stream.emitted = done["time"][-1]
+        return done
+
+    def bars(self, symbol: str) -> np.ndarray:
+        stream = self._streams.get(symbol.upper())
+        if stream is None:
+            return np.zeros(0, dtype=INTRADAY_BAR_DTYPE)
+        with stream.lock:
+            return stream.ring.view()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"symbols": len(self._streams), "fetches": self.fetches, "bars_fetched": self.bars_fetched}
+
+
+class IntradayFlows:
+    """Volume profile and liquidity pulse per symbol and session day, fed by an :class:`IntradayStream`.
+
+    Subscribed as a stream listener, it folds each final bar into the
+    symbol's :class:`MultiResolutionProfile` and :class:`RollingLiquidityPulse`
+    once, so reading the flows never rescans the intraday window.
+    """
+
+    def __init__(self) -> None:
+        self._flows: Dict[str, Tuple[np.datetime64, MultiResolutionProfile, RollingLiquidityPulse]] = {}
+        self._lock = threading.Lock()
+
+    def on_bars(self, symbol: str, bars: np.ndarray, reset: bool = False) -> None:
+        if reset:
+            with self._lock:
+                self._flows.pop(symbol, None)
+        days = bars["time"].astype("datetime64[D]")
+        for day in np.unique(days):
+            chunk = bars[days == day]
+            with self._lock:
+                current = self._flows.get(symbol)
+                if current is None or current[0] != day:
+                    profile = MultiResolutionProfile.from_bars(chunk["close"], chunk["volume"], chunk["time"])
+                    self._flows[symbol] = (day, profile, RollingLiquidityPulse().add(chunk["close"], chunk["volume"]))
+                    continue
+                _, profile, pulse = current
+                profile.add(chunk["close"], chunk["volume"], chunk["time"])
+                pulse.add(chunk["close"], chunk["volume"])
+
+    def profile(self, symbol: str) -> Optional[MultiResolutionProfile]:
+        with self._lock:
+            current = self._flows.get(symbol.upper())
+        return current[1] if current else None
+
+    def pulse(self, symbol: str, current_price: float) -> Optional[LiquidityPulse]:
+        with self._lock:
+            current = self._flows.get(symbol.upper())
+            return current[2].result(current_price) if current else None
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Hashable, Optional, Tuple
+
+import numpy as np
+from scipy.optimize import least_squares
+
+from greeks_engine import norm_cdf, norm_pdf
+from lru_cache import KeyedLRU
+from option_chain import OptionChain
+
+logger = logging.getLogger(__name__)
+
+IV_LOWER = 1e-4
+IV_UPPER = 5.0
+# Fewest quotes for a five-parameter SVI fit; smaller smiles are interpolated
+SVI_MIN_POINTS = 6
+
+
+def _price_and_vega(S, K, T, r, sigma, is_call) -> Tuple[np.ndarray, np.ndarray]:
+    sqrt_T = np.sqrt(T)
+    d1 = (np.log(S / K) + (r + 0.5 * sigma * sigma) * T) / (sigma * sqrt_T)
+    d2 = d1 - sigma * sqrt_T
+    discounted = K * np.exp(-r * T)
+    call = S * norm_cdf(d1) - discounted * norm_cdf(d2)
+    price = np.where(is_call, call, call - S + discounted)
+    return price, S * norm_pdf(d1) * sqrt_T
+
+
+def implied_volatility(price, S, K, T, r, is_call, tol: float = 1e-6, max_iter: int = 60) -> np.ndarray:
+    """Black-Scholes implied volatility for whole arrays of option prices.
+
+    Newton steps on vega, falling back to bisection whenever a step leaves
+    the bracket kept around each root or vega vanishes, so deep ITM/OTM
+    quotes still converge. Inputs broadcast; prices outside the no-arbitrage
+    bounds, non-positive inputs and non-converged rows give NaN.
+    """
+    price, S, K, T, is_call = np.broadcast_arrays(
+        np.asarray(price, dtype=np.float64),
+        np.asarray(S, dtype=np.float64),
+        np.asarray(K, dtype=np.float64),
+        np.asarray(T, dtype=np.float64),
+        np.asarray(is_call, dtype=bool),
+    )
+    result = np.full(price.shape, np.nan)
+    valid = (S > 0) & (K > 0) & (T > 0) & np.isfinite(price)
+    discounted = np.where(valid, K * np.exp(-r * np.where(valid, T, 0.0)), 0.0)
+    lower = np.where(is_call, np.maximum(S - discounted, 0.0), np.maximum(discounted - S, 0.0))
+    upper = np.where(is_call, S, discounted)
+    valid &= (price > lower) & (price < upper)
+    if not valid.any():
+        return result
+
+    target, S, K, T, is_call = price[valid], S[valid], K[valid], T[valid], is_call[valid]
+    # Brenner-Subrahmanyam start, clipped into the bracket
+    sigma = np.clip(np.sqrt(2 * np.pi / T) * target / S, 0.05, 2.0)
+    lo, hi = np.full(sigma.shape, IV_LOWER), np.full(sigma.shape, IV_UPPER)
+    active = np.ones(sigma.shape, dtype=bool)
+    for _ in range(max_iter):
+        idx = np.flatnonzero(active)
+        if not idx.size:
+            break
+        model, vega = _price_and_vega(S[idx], K[idx], T[idx], r, sigma[idx], is_call[idx])
+        diff = model - target[idx]
+        done = np.abs(diff) < tol
+        active[idx[done]] = False
+        above = diff > 0
+        hi[idx] = np.where(above, sigma[idx], hi[idx])
+        lo[idx] = np.where(above, lo[idx], sigma[idx])
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            newton = sigma[idx] - diff / vega
+        inside = (vega > 1e-10) & (newton > lo[idx]) & (newton < hi[idx])
+        step = np.where(inside, newton, 0.5 * (lo[idx] + hi[idx]))
+        sigma[idx] = np.where(done, sigma[idx], step)
+    converged = ~active | (hi - lo < 1e-8)
+    result[valid] = np.where(converged, sigma, np.nan)
+    return result
+
+
+def chain_implied_vols(chain: OptionChain, spot: float, T: float, r: float) -> np.ndarray:
+    """IV inverted from each contract's bid/ask mid; NaN where there is no two-sided quote."""
+    quoted = (chain.bid > 0) & (chain.ask > 0)
+    mid = np.where(quoted, (chain.bid + chain.ask) / 2, np.nan)
+    return implied_volatility(mid, spot, chain.strike, T, r, chain.is_call)
+
+
+def _svi_total_variance(params: np.ndarray, k: np.ndarray) -> np.ndarray:
+    a, b, rho, m, s = params
+    return a + b * (rho * (k - m) + np.sqrt((k - m) ** 2 + s * s))
+
+
+@dataclass
+class SmileFit:
+    """Fitted volatility smile of one expiration.
+
+    ``method`` is ``"svi"`` (raw SVI total variance ``a + b(rho(k-m) +
+    sqrt((k-m)^2 + s^2))`` in log-moneyness ``k = log(K/forward)``) or
+    ``"interp"`` (piecewise-linear IV over the quoted ``k``, flat beyond).
+    """
+
+    expiration: Optional[str]
+    spot: float
+    forward: float
+    T: float
+    method: str
+    params: Tuple[float, ...]
+    knots: Tuple[np.ndarray, np.ndarray]
+    rmse: float
+    points: int
+
+    def iv(self, strikes) -> np.ndarray:
+        k = np.log(np.maximum(np.asarray(strikes, dtype=np.float64), 1e-12) / self.forward)
+        if self.method == "svi":
+            return np.sqrt(np.maximum(_svi_total_variance(np.asarray(self.params), k), 1e-10) / self.T)
+        return np.interp(k, *self.knots)
+
+    @property
+    def atm_iv(self) -> float:
+        return float(self.iv(self.forward))
+
+
+def _fit_svi(k: np.ndarray, iv: np.ndarray, weight: np.ndarray, T: float) -> Optional[np.ndarray]:
+    w = iv * iv * T
+    span = max(float(k.max() - k.min()), 0.05)
+    start = np.array([0.5 * w.min(), 0.1, -0.3, 0.0, 0.1])
+    bounds = ([-w.max(), 0.0, -0.999, k.min() - span, 1e-4], [w.max() * 2, 5.0, 0.999, k.max() + span, 2 * span])
+    root_weight = np.sqrt(weight)
+
+    def residuals(params: np.ndarray) -> np.ndarray:
+        model = np.sqrt(np.maximum(_svi_total_variance(params, k), 1e-10) / T)
+        return (model - iv) * root_weight
+
+    try:
+        fit = least_squares(residuals, start, bounds=bounds, x_scale="jac", max_nfev=200)
+    except ValueError as exc:
+        logger.debug(f"SVI fit failed: {exc}")
+        return None
+    a, b, rho, _, s = fit.x
+    # Total variance must stay non-negative at its minimum
+    if not fit.success or a + b * s * np.sqrt(1 - rho * rho) < 0:
+        return None
+    return fit.x
+
+
+def fit_smile(
+    chain: OptionChain,
+    spot: float,
+    T: float,
+    risk_free_rate: float = 0.045,
+    expiration: Optional[str] = None,
+) -> Optional[SmileFit]:
+    """Fit one expiration's smile to out-of-the-money quotes.
+
+    IVs are inverted from bid/ask mids (the feed's IV fills contracts without
+    a two-sided quote), calls above the forward and puts below it, weighted
+    by vega so the noisy far wings count less. Falls back to interpolation
+    when there are too few quotes or SVI does not fit; None without quotes.
+    """
+    if spot <= 0 or T <= 0 or not len(chain):
+        return None
+    forward = spot * np.exp(risk_free_rate * T)
+    market = chain_implied_vols(chain, spot, T, risk_free_rate)
+    market = np.where(np.isfinite(market), market, np.where(chain.iv > 0, chain.iv, np.nan))
+    otm = np.where(chain.is_call, chain.strike >= forward, chain.strike < forward)
+    use = otm & np.isfinite(market) & (market > IV_LOWER) & (market < IV_UPPER)
+    if not use.any():
+        return None
+
+    strike, iv = chain.strike[use], market[use]
+    order = np.argsort(strike, kind="stable")
+    strike, iv = strike[order], iv[order]
+    k = np.log(strike / forward)
+    _, vega = _price_and_vega(spot, strike, T, risk_free_rate, iv, True)
+    weight = np.maximum(vega / max(vega.max(), 1e-12), 1e-3)
+    knots = (k, iv)
+
+    params = _fit_svi(k, iv, weight, T) if k.size >= SVI_MIN_POINTS else None
+    method = "svi" if params is not None else "interp"
+    smile = SmileFit(expiration, float(spot), float(forward), float(T), method,
+                     tuple(float(p) for p in params) if params is not None else (), knots, 0.0, int(k.size))
+    smile.rmse = float(np.sqrt(np.mean((smile.iv(strike) - iv) ** 2)))
+    return smile
+
+
+class SmileCache(KeyedLRU[Tuple[Hashable, Optional[SmileFit]]]):
+    """Fitted smiles by (ticker, expiration), refit only when the chain snapshot changes.
+
+    ``version`` identifies the chain data a fit came from (the snapshot's
+    ``fetched_at``); a request with the stored version reuses the fit, so
+    skew charts, greeks and suggestions share one fit per snapshot.
+    """
+
+    stat_names = ("smiles", "fits")
+
+    def __init__(self, max_entries: int = 256) -> None:
+        super().__init__(max_entries)
+
+    def get(self, ticker: str, expiration: str, version: Hashable,
+            build: Callable[[], Optional[SmileFit]]) -> Optional[SmileFit]:
+        entry = self.get_or_build((ticker, expiration), lambda: (version, build()),
+                                  fresh=lambda stored: stored[0] == version)
+        return entry[1]
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class KeyedLRU(Generic[V]):
+    """Values by caller key, least recently used first out, with hit/build counters.
+
+    :meth:`get_or_build` serves the stored value unless it is missing or
+    ``fresh`` rejects it; ``build`` then runs outside the lock and its result
+    replaces the entry. Subclasses name the :meth:`stats` counters through
+    ``stat_names`` (entries, builds).
+    """
+
+    stat_names: Tuple[str, str] = ("entries", "builds")
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, V]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def lookup(self, key: Hashable, default: Any = None, fresh: Optional[Callable[[V], bool]] = None) -> Any:
+        """Stored value for ``key`` (counted as a hit), else ``default``."""
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING or (fresh is not None and not fresh(value)):
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def store(self, key: Hashable, value: V) -> V:
+        """Insert or replace ``key`` (counted as a build), evicting the oldest entries."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self.builds += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def get_or_build(self, key: Hashable, build: Callable[[], V], fresh: Optional[Callable[[V], bool]] = None) -> V:
+        value = self.lookup(key, _MISSING, fresh)
+        return self.store(key, build()) if value is _MISSING else value
+
+    def stats(self) -> Dict[str, int]:
+        entries, builds = self.stat_names
+        with self._lock:
+            return {entries: len(self._entries), "hits": self.hits, builds: self.builds}
@@ -3,9 +3,14 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime
 import math
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
-import requests
+from async_http import AsyncHttpClient
+from chain_cache import ChainCache
+from gex_engine import GexSurface, build_gex_surface
+from option_chain import OptionChain
+from quote_service import Quote, QuoteService
+from vol_surface import VolSurface
 
 
 @dataclass
@@ -24,22 +29,27 @@ class ScenarioInfo:
 class MarketMakerAnalyzer:
     def __init__(
         self,
-        tradier_key: str,
-        fmp_key: str,
-        tradier_base_url: str,
-        fmp_base_url: str,
+        http_client: AsyncHttpClient,
+        provider: str = "tradier",
+        chain_cache: Optional[ChainCache] = None,
+        chain_max_age: float = 60.0,
+        quote_service: Optional[QuoteService] = None,
+        gex_surface_provider: Optional[Callable[[str, float, List[str]], GexSurface]] = None,
+        vol_surface_provider: Optional[Callable[[str, float, List[str]], Optional[VolSurface]]] = None,
     ) -> None:
-        self.tradier_key = tradier_key
-        self.fmp_key = fmp_key
-        self.tradier_base_url = tradier_base_url.rstrip("/")
-        self.fmp_base_url = fmp_base_url.rstrip("/")
+        # Shared client: the provider's pooled session, rate limit, retries and circuit breaker
+        self.http_client = http_client
+        self.provider = provider
+        self.chain_cache = chain_cache
+        self.chain_max_age = chain_max_age
+        self.quote_service = quote_service
+        # (symbol, price, expirations) -> shared GexSurface; chains are fetched here when unset
+        self.gex_surface_provider = gex_surface_provider
+        # (symbol, price, expirations) -> shared VolSurface; feed IVs weighted by OI when unset
+        self.vol_surface_provider = vol_surface_provider
 
     def _tradier_get(self, path: str, params: Dict[str, str]) -> Dict:
-        url = f"{self.tradier_base_url}{path}"
-        headers = {"Authorization": f"Bearer {self.tradier_key}", "Accept": "application/json"}
-        resp = requests.get(url, headers=headers, params=params, timeout=20)
-        resp.raise_for_status()
-        return resp.json()
+        return self.http_client.get_json(self.provider, path, params)
 
     def get_option_expirations(self, symbol: str) -> List[str]:
         data = self._tradier_get("/markets/options/expirations", {"symbol": symbol})
@@ -49,6 +59,16 @@ class MarketMakerAnalyzer:
         return expirations
 
     def get_option_chain(self, symbol: str, expiration: str) -> List[Dict]:
+        if self.chain_cache is not None:
+            return self.chain_cache.get(
+                symbol,
+                expiration,
+                lambda: self._download_option_chain(symbol, expiration),
+                self.chain_max_age,
+            ).options
+        return self._download_option_chain(symbol, expiration)
+
+    def _download_option_chain(self, symbol: str, expiration: str) -> List[Dict]:
         data = self._tradier_get(
             "/markets/options/chains",
             {"symbol": symbol, "expiration": expiration, "greeks": "true"},
@@ -58,65 +78,44 @@ class MarketMakerAnalyzer:
             return [options]
         return options
 
-    def get_quote(self, symbol: str) -> Dict:
+    def get_option_chains(self, symbol: str, expirations: List[str]) -> List[Tuple[str, List[Dict]]]:
+        """Fetch several chains concurrently, returned in the order of ``expirations``."""
+        if len(expirations) <= 1:
+            return [(exp, self.get_option_chain(symbol, exp)) for exp in expirations]
+        chains = self.http_client.gather(*(self.http_client.call(self.get_option_chain, symbol, exp) for exp in expirations))
+        for chain in chains:
+            if isinstance(chain, BaseException):
+                raise chain
+        return list(zip(expirations, chains))
+
+    def get_quote(self, symbol: str) -> Optional[Quote]:
+        if self.quote_service is not None:
+            return self.quote_service.get(symbol)
         data = self._tradier_get("/markets/quotes", {"symbols": symbol})
-        quote = data.get("quotes", {}).get("quote", {})
-        return quote or {}
-
-    def _normalize_iv(self, iv_value: Optional[float]) -> float:
-        if iv_value is None:
-            return 0.0
-        iv = float(iv_value)
-        if iv > 3:
-            iv = iv / 100.0
-        return max(iv, 0.0)
-
-    def _aggregate_by_strike(self, options: List[Dict], price: float) -> Dict[float, Dict]:
-        aggregates: Dict[float, Dict] = {}
-        for option in options:
-            strike = float(option.get("strike") or 0)
-            if strike <= 0:
-                continue
-            opt_type = option.get("option_type") or option.get("type") or ""
-            greeks = option.get("greeks") or {}
-            gamma = float(greeks.get("gamma") or 0.0)
-            oi = float(option.get("open_interest") or 0.0)
-            volume = float(option.get("volume") or 0.0)
-            iv = self._normalize_iv(
-                option.get("implied_volatility")
-                or greeks.get("mid_iv")
-                or greeks.get("smv_vol")
-            )
-
-            gamma_exposure = gamma * oi * 100.0 * price
-
-            if strike not in aggregates:
-                aggregates[strike] = {
-                    "call_gamma": 0.0,
-                    "put_gamma": 0.0,
-                    "call_volume": 0.0,
-                    "put_volume": 0.0,
-                    "call_oi": 0.0,
-                    "put_oi": 0.0,
-                    "iv_weight": 0.0,
-                    "iv_oi": 0.0,
-                }
-
-            target = aggregates[strike]
-            if opt_type.lower().startswith("c"):
-                target["call_gamma"] += gamma_exposure
-                target["call_volume"] += volume
-                target["call_oi"] += oi
-            else:
-                target["put_gamma"] += gamma_exposure
-                target["put_volume"] += volume
-                target["put_oi"] += oi
-
-            if oi > 0 and iv > 0:
-                target["iv_weight"] += iv * oi
-                target["iv_oi"] += oi
-
-        return aggregates
+        quote = (data.get("quotes") or {}).get("quote")
+        if isinstance(quote, list):
+            quote = quote[0] if quote else None
+        return Quote.from_tradier(quote) if quote else None
+
+    def _aggregate_by_strike(self, surface: GexSurface, expirations: Optional[List[str]] = None) -> Dict[float, Dict]:
+        """Per-strike call/put gamma exposure, volume, OI and IV weights read off ``surface``."""
+        columns = {
+            "call_gamma": surface.per_strike("call", "gamma", expirations),
+            "put_gamma": surface.per_strike("put", "gamma", expirations),
+            "call_volume": surface.per_strike("call", "volume", expirations),
+            "put_volume": surface.per_strike("put", "volume", expirations),
+            "call_oi": surface.per_strike("call", "oi", expirations),
+            "put_oi": surface.per_strike("put", "oi", expirations),
+            "iv_weight": surface.per_strike("call", "iv_weight", expirations)
+            + surface.per_strike("put", "iv_weight", expirations),
+            "iv_oi": surface.per_strike("call", "iv_oi", expirations) + surface.per_strike("put", "iv_oi", expirations),
+        }
+        listed = surface.per_strike("call", "listed", expirations) + surface.per_strike("put", "listed", expirations)
+        return {
+            float(strike): {name: float(values[idx]) for name, values in columns.items()}
+            for idx, strike in enumerate(surface.strikes)
+            if listed[idx] > 0
+        }
 
     def _weighted_iv(self, aggregates: Dict[float, Dict]) -> float:
         total_iv_weight = 0.0
@@ -272,7 +271,7 @@ class MarketMakerAnalyzer:
 
     def analyze_chain(self, symbol: str, expiration: Optional[str] = None) -> Dict:
         quote = self.get_quote(symbol)
-        price = float(quote.get("last") or quote.get("close") or quote.get("bid") or 0.0)
+        price = quote.price if quote is not None else 0.0
         expirations_all = sorted(self.get_option_expirations(symbol))
         expirations = expirations_all
         if expiration:
@@ -287,13 +286,19 @@ class MarketMakerAnalyzer:
         expiration_stats = []
         per_expiration_sentiment = {}
 
-        all_options: List[Dict] = []
-        for exp in expirations:
-            options = self.get_option_chain(symbol, exp)
-            if not options:
-                continue
-            aggregates = self._aggregate_by_strike(options, price)
-            iv_exp = self._weighted_iv(aggregates)
+        # Price every expiration once; per-expiration and combined views are column selections
+        if self.gex_surface_provider is not None:
+            surface = self.gex_surface_provider(symbol, price, expirations)
+        else:
+            chains = {exp: OptionChain.from_tradier(options) for exp, options in self.get_option_chains(symbol, expirations) if options}
+            surface = build_gex_surface(chains, price, datetime.utcnow().date())
+        vol_surface = None
+        if self.vol_surface_provider is not None and surface.expirations:
+            vol_surface = self.vol_surface_provider(symbol, price, surface.expirations)
+        for exp in surface.expirations:
+            aggregates = self._aggregate_by_strike(surface, [exp])
+            fitted = vol_surface is not None and exp in vol_surface.smiles
+            iv_exp = vol_surface.weighted_iv([exp]) if fitted else self._weighted_iv(aggregates)
             try:
                 days_exp = max(1, abs((datetime.fromisoformat(exp) - datetime.utcnow()).days))
             except ValueError:
@@ -340,11 +345,12 @@ class MarketMakerAnalyzer:
                     "put_call": round(put_call, 2),
                     "resistance": [level.__dict__ for level in resistances_exp],
                     "support": [level.__dict__ for level in supports_exp],
+                    "atm_iv": round(vol_surface.atm_iv(exp), 4) if fitted else None,
+                    "expected_move": round(vol_surface.expected_move(exp, price), 2) if fitted else None,
                 }
             )
-            all_options.extend(options)
 
-        if not all_options:
+        if not surface.expirations:
             return {
                 "symbol": symbol,
                 "price": price,
@@ -370,9 +376,9 @@ class MarketMakerAnalyzer:
                 },
             }
 
-        aggregates_all = self._aggregate_by_strike(all_options, price)
+        aggregates_all = self._aggregate_by_strike(surface)
         pivot = self._pivot_from_aggregates(aggregates_all)
-        iv = self._weighted_iv(aggregates_all)
+        iv = vol_surface.weighted_iv() if vol_surface else self._weighted_iv(aggregates_all)
 
         days = 7
         if expirations:
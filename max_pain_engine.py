@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from option_chain import OptionChain
+
+
+@dataclass
+class MaxPainResult:
+    strikes: np.ndarray
+    call_loss: np.ndarray
+    put_loss: np.ndarray
+    total_loss: np.ndarray
+    max_pain: Optional[float]
+    call_loss_at_max_pain: float
+    put_loss_at_max_pain: float
+
+    @property
+    def min_loss(self) -> float:
+        return self.call_loss_at_max_pain + self.put_loss_at_max_pain
+
+    def to_frame(self) -> pd.DataFrame:
+        """Pain curve as the ``strike``/``total_loss`` table used by the charts."""
+        return pd.DataFrame({"strike": self.strikes, "total_loss": self.total_loss})
+
+
+_EMPTY = np.zeros(0, dtype=float)
+
+
+def compute_max_pain(strikes, call_weights, put_weights) -> MaxPainResult:
+    """Pain curve over every listed strike in O(n log n).
+
+    ``strikes`` may contain duplicates (one row per contract); weights are
+    summed per unique strike first. For a settlement at strike K the writers
+    pay ``sum(C_s * (s - K))`` over s > K and ``sum(P_s * (K - s))`` over
+    s < K, which both reduce to prefix sums of weight and strike*weight.
+    """
+    strikes = np.asarray(strikes, dtype=float)
+    call_weights = np.asarray(call_weights, dtype=float)
+    put_weights = np.asarray(put_weights, dtype=float)
+    if strikes.size == 0:
+        return MaxPainResult(_EMPTY, _EMPTY, _EMPTY, _EMPTY, None, 0.0, 0.0)
+
+    unique_strikes, inverse = np.unique(strikes, return_inverse=True)
+    calls = np.bincount(inverse, weights=call_weights, minlength=unique_strikes.size)
+    puts = np.bincount(inverse, weights=put_weights, minlength=unique_strikes.size)
+
+    # Puts: K * sum(P_s, s <= K) - sum(P_s * s, s <= K)
+    put_cum = np.cumsum(puts)
+    put_cum_value = np.cumsum(puts * unique_strikes)
+    put_loss = unique_strikes * put_cum - put_cum_value
+
+    # Calls: sum(C_s * s, s >= K) - K * sum(C_s, s >= K)
+    call_cum = np.cumsum(calls[::-1])[::-1]
+    call_cum_value = np.cumsum((calls * unique_strikes)[::-1])[::-1]
+    call_loss = call_cum_value - unique_strikes * call_cum
+
+    # Prefix-sum cancellation can leave tiny negative residues
+    np.maximum(call_loss, 0.0, out=call_loss)
+    np.maximum(put_loss, 0.0, out=put_loss)
+    total_loss = call_loss + put_loss
+
+    idx = int(np.argmin(total_loss))
+    return MaxPainResult(
+        strikes=unique_strikes,
+        call_loss=call_loss,
+        put_loss=put_loss,
+        total_loss=total_loss,
+        max_pain=float(unique_strikes[idx]),
+        call_loss_at_max_pain=float(call_loss[idx]),
+        put_loss_at_max_pain=float(put_loss[idx]),
+    )
+
+
+def max_pain_from_chain(chain: OptionChain, include_volume: bool = False) -> MaxPainResult:
+    """Pain curve for a parsed chain.
+
+    ``include_volume`` adds traded volume to open interest, matching the
+    weighting historically used by the Tab 1 gamma view.
+    """
+    weights = chain.open_interest + chain.volume if include_volume else chain.open_interest
+    return compute_max_pain(
+        chain.strike,
+        np.where(chain.is_call, weights, 0.0),
+        np.where(chain.is_put, weights, 0.0),
+    )
+
+
+def max_pain_from_options(options_data, include_volume: bool = False) -> MaxPainResult:
+    """Build the pain curve straight from Tradier-style contract dicts (or an OptionChain)."""
+    return max_pain_from_chain(OptionChain.from_records(options_data), include_volume)
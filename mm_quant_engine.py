@@ -1,7 +1,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterable, List
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from gex_engine import GexSurface, build_gex_surface
+from option_chain import OptionChain
+
+# Distance from the gamma flip (fraction of spot) at which the regime call is fully confident
+FLIP_SATURATION_PCT = 0.02
+# Spot closer than this above the flip still carries elevated vol risk
+FLIP_BUFFER_PCT = 0.005
 
 
 @dataclass
@@ -18,6 +29,7 @@ class RegimeResult:
     confidence: float
     pin_probability: float
     vol_risk: str
+    zero_gamma: Optional[float] = None
 
 
 class QuantEngine:
@@ -27,67 +39,83 @@ class QuantEngine:
     the full institutional modules are not present.
     """
 
-    def calculate_gex(self, contracts: Iterable[Dict], current_price: float) -> Dict[str, float]:
-        call_gex = 0.0
-        put_gex = 0.0
-        for contract in contracts:
-            try:
-                strike = float(contract.get("strike", 0) or 0)
-                oi = int(contract.get("open_interest", 0) or 0)
-                opt_type = (contract.get("option_type") or contract.get("type") or "").lower()
-                greeks = contract.get("greeks") or {}
-                gamma = float(greeks.get("gamma", 0) or contract.get("gamma", 0) or 0)
-                gex = gamma * oi * 100 * float(current_price or 0)
-                if opt_type == "put":
-                    put_gex += gex
-                else:
-                    call_gex += gex
-            except Exception:
-                continue
-        gex_index = call_gex - put_gex
-        total_gex = abs(call_gex) + abs(put_gex)
-        return {
-            "gex_index": gex_index,
-            "call_gex": call_gex,
-            "put_gex": put_gex,
-            "total_gex": total_gex,
-        }
+    def _surface(self, contracts: Iterable[Dict] | OptionChain | GexSurface, current_price: float,
+                 expiration: Optional[str] = None) -> GexSurface:
+        if isinstance(contracts, GexSurface):
+            return contracts
+        chain = contracts if isinstance(contracts, OptionChain) else OptionChain.from_tradier(contracts)
+        key = expiration or chain.expiration or date.today().isoformat()
+        return build_gex_surface({key: chain}, float(current_price or 0), date.today())
+
+    def calculate_gex(
+        self,
+        contracts: Iterable[Dict] | OptionChain | GexSurface,
+        current_price: float,
+        expirations: Optional[Sequence[str]] = None,
+    ) -> Dict[str, float]:
+        """Call/put/net GEX; a :class:`GexSurface` is read as-is, optionally limited to ``expirations``."""
+        return self._surface(contracts, current_price).totals(expirations)
 
-    def _max_oi_wall(self, contracts: List[Dict], option_type: str, current_price: float) -> WallLevel:
-        filtered = [
-            c for c in contracts
-            if (c.get("option_type") or c.get("type") or "").lower() == option_type
-        ]
-        if not filtered:
+    def _max_oi_wall(self, surface: GexSurface, side: str, current_price: float,
+                     expirations: Optional[Sequence[str]]) -> WallLevel:
+        oi = surface.per_strike(side, "oi", expirations)
+        listed = surface.per_strike(side, "listed", expirations) > 0
+        if not listed.any():
             return WallLevel(strike=current_price, oi=0, distance_pct=0.0, strength=0.0)
-        max_contract = max(filtered, key=lambda c: int(c.get("open_interest", 0) or 0))
-        strike = float(max_contract.get("strike", current_price) or current_price)
-        oi = int(max_contract.get("open_interest", 0) or 0)
+        idx = int(np.argmax(np.where(listed, oi, -1.0)))
+        strike = float(surface.strikes[idx])
+        wall_oi = int(oi[idx])
         distance_pct = abs(strike - current_price) / current_price if current_price else 0.0
-        strength = oi / max(oi, 1)
-        return WallLevel(strike=strike, oi=oi, distance_pct=distance_pct, strength=strength)
+        strength = wall_oi / max(wall_oi, 1)
+        return WallLevel(strike=strike, oi=wall_oi, distance_pct=distance_pct, strength=strength)
 
-    def detect_walls(self, contracts: List[Dict], current_price: float, expiration: str) -> tuple[WallLevel, WallLevel]:
-        call_wall = self._max_oi_wall(contracts, "call", current_price)
-        put_wall = self._max_oi_wall(contracts, "put", current_price)
+    def detect_walls(
+        self,
+        contracts: List[Dict] | OptionChain | GexSurface,
+        current_price: float,
+        expiration: Optional[str],
+    ) -> tuple[WallLevel, WallLevel]:
+        """Max-OI call and put strikes for ``expiration`` (all surface expirations when None)."""
+        surface = self._surface(contracts, current_price, expiration)
+        expirations = [expiration] if expiration and expiration in surface.expirations else None
+        call_wall = self._max_oi_wall(surface, "call", current_price, expirations)
+        put_wall = self._max_oi_wall(surface, "put", current_price, expirations)
         return call_wall, put_wall
 
-    def classify_regime(self, contracts: List[Dict], current_price: float, gamma_neta: float) -> RegimeResult:
-        abs_gamma = abs(gamma_neta)
-        if abs_gamma < 1e7:
+    def classify_regime(
+        self,
+        contracts: List[Dict] | OptionChain | GexSurface,
+        current_price: float,
+        gamma_neta: float,
+        zero_gamma: Optional[float] = None,
+    ) -> RegimeResult:
+        """Regime from where spot sits relative to the gamma flip.
+
+        Above ``zero_gamma`` dealers are long gamma and dampen moves (CHOP);
+        below it they are short gamma and chase them (TREND). Confidence
+        grows with the distance to the flip, saturating at
+        ``FLIP_SATURATION_PCT``. Without a flip in range, the sign of
+        ``gamma_neta`` holds everywhere nearby and decides the regime.
+        """
+        if zero_gamma is not None and current_price:
+            distance = (current_price - zero_gamma) / current_price
+        else:
+            distance = FLIP_SATURATION_PCT if gamma_neta >= 0 else -FLIP_SATURATION_PCT
+        strength = min(abs(distance) / FLIP_SATURATION_PCT, 1.0)
+        if distance >= 0:
             classification = "CHOP"
-            confidence = 0.55
-            pin_probability = 0.6
+            pin_probability = 0.45 + 0.3 * strength
         else:
             classification = "TREND"
-            confidence = 0.7
-            pin_probability = 0.35
-        vol_risk = "LOW" if abs_gamma < 5e7 else "ELEVATED"
+            pin_probability = 0.35 - 0.2 * strength
+        confidence = 0.55 + 0.35 * strength
+        vol_risk = "LOW" if distance >= FLIP_BUFFER_PCT else "ELEVATED"
         return RegimeResult(
             classification=classification,
             confidence=confidence,
             pin_probability=pin_probability,
             vol_risk=vol_risk,
+            zero_gamma=zero_gamma,
         )
 
     def calculate_targets(self, call_wall: WallLevel, put_wall: WallLevel, current_price: float, atr: float) -> Dict[str, Dict[str, float | str]]:
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, time as clock_time, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BAR_DTYPE = np.dtype([
+    ("date", "datetime64[D]"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+MARKET_OPEN = clock_time(9, 30)
+# A session's daily bar stored after this time (market close plus settlement) is final
+BAR_FINAL_AFTER = clock_time(16, 30)
+
+# fetch(symbol, since) -> daily bars on or after ``since`` (None = full history)
+BarFetcher = Callable[[str, Optional[date]], np.ndarray]
+
+
+def bars_from_records(records: Iterable[Dict]) -> np.ndarray:
+    """Daily bars (FMP ``historical`` style dicts) as a date-sorted BAR_DTYPE array."""
+    rows = []
+    for item in records:
+        try:
+            rows.append((
+                np.datetime64(str(item["date"])[:10], "D"),
+                float(item.get("open") or np.nan),
+                float(item.get("high") or np.nan),
+                float(item.get("low") or np.nan),
+                float(item["close"]),
+                float(item.get("volume") or 0.0),
+            ))
+        except (KeyError, TypeError, ValueError):
+            continue
+    bars = np.array(rows, dtype=BAR_DTYPE)
+    return np.sort(bars, order="date")
+
+
+def last_session(today: date) -> date:
+    """Most recent weekday on or before ``today`` (exchange holidays are not modelled)."""
+    while today.weekday() >= 5:
+        today -= timedelta(days=1)
+    return today
+
+
+def current_session(now: Optional[datetime] = None) -> date:
+    """Latest session that has opened as of ``now`` (default: the current time in New York)."""
+    now = now.astimezone(MARKET_TIMEZONE) if now is not None else datetime.now(MARKET_TIMEZONE)
+    today = now.date()
+    if now.time() < MARKET_OPEN:
+        today -= timedelta(days=1)
+    return last_session(today)
+
+
+def _session_final_at(session: date) -> float:
+    return datetime.combine(session, BAR_FINAL_AFTER, tzinfo=MARKET_TIMEZONE).timestamp()
+
+
+@dataclass
+class OHLCVPanel:
+    """Last ``bars`` daily bars for a set of symbols as (symbols x bars) arrays.
+
+    Rows are right-aligned on each symbol's latest bar; symbols with a
+    shorter history are NaN-padded on the left (volume included).
+    """
+
+    symbols: List[str]
+    dates: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.sum(~np.isnan(self.close), axis=1)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+
+class OHLCVStore:
+    """On-disk daily OHLCV history, one ``<SYMBOL>.npy`` file per symbol.
+
+    Files are memory-mapped on read and rewritten atomically when new bars
+    arrive. :meth:`refresh` only asks the fetcher for bars from the last one
+    stored onwards, and skips symbols that already hold the latest session's
+    final bar (stored after that session's close) or were checked within
+    ``min_refresh_interval`` seconds. :meth:`schedule` runs the refresh on a
+    background thread so readers only ever touch the stored files.
+    """
+
+    def __init__(self, root: str, max_bars: int = 520, min_refresh_interval: float = 900.0) -> None:
+        self.root = root
+        self.max_bars = max_bars
+        self.min_refresh_interval = min_refresh_interval
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._pending: set = set()
+        self._pending_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.root, f"{symbol.upper()}.npy")
+
+    def _lock(self, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(symbol.upper(), threading.Lock())
+
+    def load(self, symbol: str) -> np.ndarray:
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return np.zeros(0, dtype=BAR_DTYPE)
+        try:
+            return np.load(path, mmap_mode="r")
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Corrupt OHLCV file for {symbol}, discarding: {exc}")
+            return np.zeros(0, dtype=BAR_DTYPE)
+
+    def last_date(self, symbol: str) -> Optional[date]:
+        bars = self.load(symbol)
+        return bars["date"][-1].astype(date) if bars.size else None
+
+    def append(self, symbol: str, new_bars: np.ndarray) -> int:
+        """Merge ``new_bars`` into the stored history; a bar for an existing date replaces it."""
+        with self._lock(symbol):
+            stored = np.array(self.load(symbol))
+            if new_bars.size:
+                keep = ~np.isin(stored["date"], new_bars["date"])
+                merged = np.sort(np.concatenate([stored[keep], new_bars.astype(BAR_DTYPE)]), order="date")
+            else:
+                merged = stored
+            merged = merged[-self.max_bars:]
+            path = self._path(symbol)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as handle:
+                np.save(handle, merged)
+            os.replace(tmp, path)  # Also bumps mtime, which doubles as "last checked"
+            return int(merged.size - stored.size)
+
+    def _needs_refresh(self, symbol: str, session: date) -> bool:
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return True
+        checked = os.path.getmtime(path)
+        if time.time() - checked < self.min_refresh_interval:
+            return False
+        last = self.last_date(symbol)
+        if last is None or last < session:
+            return True
+        # The session's bar is stored; refetch only while it may still be intraday
+        return checked < _session_final_at(session)
+
+    def refresh(
+        self,
+        symbols: Sequence[str],
+        fetch: BarFetcher,
+        today: Optional[date] = None,
+        max_workers: int = 8,
+    ) -> Dict[str, int]:
+        """Pull missing bars for stale symbols; returns new-bar counts per refreshed symbol.
+
+        The latest stored bar is always re-requested so an intraday bar
+        saved earlier gets its final values.
+        """
+        session = last_session(today) if today else current_session()
+        stale = [s.upper() for s in dict.fromkeys(symbols) if self._needs_refresh(s, session)]
+        if not stale:
+            return {}
+
+        def update(symbol: str) -> int:
+            try:
+                bars = fetch(symbol, self.last_date(symbol))
+            except Exception as exc:
+                logger.warning(f"OHLCV refresh failed for {symbol}: {exc}")
+                return 0
+            return self.append(symbol, bars)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(stale)))) as executor:
+            added = dict(zip(stale, executor.map(update, stale)))
+        logger.info(f"OHLCV store refreshed {len(stale)} symbols, {sum(added.values())} new bars")
+        return added
+
+    def missing(self, symbols: Sequence[str]) -> List[str]:
+        """Symbols with no stored history yet (never fetched into this store)."""
+        return [s.upper() for s in dict.fromkeys(symbols) if not os.path.exists(self._path(s))]
+
+    def schedule(self, symbols: Sequence[str], fetch: BarFetcher) -> None:
+        """Queue ``symbols`` for :meth:`refresh` on the background worker and return at once.
+
+        One worker per store drains the queue; symbols queued while it runs
+        are picked up by its next pass.
+        """
+        with self._pending_lock:
+            self._pending.update(s.upper() for s in symbols)
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._drain, args=(fetch,), name="ohlcv-refresh", daemon=True)
+            self._worker.start()
+
+    def _drain(self, fetch: BarFetcher) -> None:
+        while True:
+            with self._pending_lock:
+                if not self._pending:
+                    self._worker = None
+                    return
+                symbols, self._pending = sorted(self._pending), set()
+            try:
+                self.refresh(symbols, fetch)
+            except Exception as exc:
+                logger.error(f"Background OHLCV refresh failed: {exc}")
+
+    def panel(self, symbols: Sequence[str], bars: int) -> OHLCVPanel:
+        symbols = [s.upper() for s in dict.fromkeys(symbols)]
+        shape = (len(symbols), bars)
+        columns = {name: np.full(shape, np.nan) for name in ("open", "high", "low", "close", "volume")}
+        dates = np.full(shape, np.datetime64("NaT"), dtype="datetime64[D]")
+        for row, symbol in enumerate(symbols):
+            history = self.load(symbol)[-bars:]
+            if not history.size:
+                continue
+            dates[row, bars - history.size:] = history["date"]
+            for name, values in columns.items():
+                values[row, bars - history.size:] = history[name]
+        return OHLCVPanel(symbols=symbols, dates=dates, **columns)
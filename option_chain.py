@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+CALL = 1
+PUT = -1
+
+_FLOAT_COLUMNS = ("strike", "open_interest", "volume", "bid", "ask", "iv", "delta", "gamma", "theta", "vega")
+
+# Finviz export headers vary between views; first match wins.
+_FINVIZ_COLUMNS = {
+    "strike": ("Strike",),
+    "type": ("Type", "Option Type"),
+    "open_interest": ("Open Interest", "Open Int.", "OI"),
+    "volume": ("Volume",),
+    "bid": ("Bid",),
+    "ask": ("Ask",),
+    "iv": ("IV", "Implied Volatility"),
+    "delta": ("Delta",),
+    "gamma": ("Gamma",),
+    "theta": ("Theta",),
+    "vega": ("Vega",),
+    "expiration": ("Expiration", "Expiry"),
+}
+
+
+def _num(value) -> float:
+    if value is None or value == "":
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        try:
+            return float(str(value).replace(",", "").replace("%", ""))
+        except ValueError:
+            return 0.0
+
+
+def _type_flag(value) -> int:
+    text = str(value or "").strip().lower()
+    if text.startswith("c"):
+        return CALL
+    if text.startswith("p"):
+        return PUT
+    return 0
+
+
+def _normalize_iv(iv: np.ndarray) -> np.ndarray:
+    # Some feeds quote IV in percent (25.0) rather than decimal (0.25)
+    return np.where(iv > 3.0, iv / 100.0, iv).clip(min=0.0)
+
+
+@dataclass
+class OptionChain:
+    """Columnar view of one option chain, parsed once from the raw payload.
+
+    Every column is a contiguous NumPy array aligned by row. ``option_type``
+    holds ``CALL`` (1) / ``PUT`` (-1) flags. ``strikes`` is the sorted set of
+    unique strikes, ``strike_index`` maps each row into it, and ``call_row`` /
+    ``put_row`` map each unique strike back to its first call/put row (-1 when
+    that side is not listed).
+    """
+
+    strike: np.ndarray
+    option_type: np.ndarray
+    open_interest: np.ndarray
+    volume: np.ndarray
+    bid: np.ndarray
+    ask: np.ndarray
+    iv: np.ndarray
+    delta: np.ndarray
+    gamma: np.ndarray
+    theta: np.ndarray
+    vega: np.ndarray
+    has_greeks: np.ndarray
+    expiration: Optional[str] = None
+    strikes: np.ndarray = field(init=False, repr=False)
+    strike_index: np.ndarray = field(init=False, repr=False)
+    call_row: np.ndarray = field(init=False, repr=False)
+    put_row: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.strikes, self.strike_index = np.unique(self.strike, return_inverse=True)
+        self.call_row = self._first_rows(CALL)
+        self.put_row = self._first_rows(PUT)
+
+    def _first_rows(self, flag: int) -> np.ndarray:
+        rows = np.full(self.strikes.size, -1, dtype=np.int64)
+        idx = np.flatnonzero(self.option_type == flag)
+        # First listed contract wins when a strike appears twice
+        positions, first = np.unique(self.strike_index[idx], return_index=True)
+        rows[positions] = idx[first]
+        return rows
+
+    @classmethod
+    def empty(cls) -> "OptionChain":
+        return cls._from_columns({name: [] for name in _FLOAT_COLUMNS}, [], [])
+
+    @classmethod
+    def _from_columns(cls, columns: Dict[str, List[float]], types: List[int], has_greeks: List[bool],
+                      expiration: Optional[str] = None) -> "OptionChain":
+        arrays = {name: np.asarray(columns[name], dtype=np.float64) for name in _FLOAT_COLUMNS}
+        arrays["iv"] = _normalize_iv(arrays["iv"])
+        return cls(
+            option_type=np.asarray(types, dtype=np.int8),
+            has_greeks=np.asarray(has_greeks, dtype=bool),
+            expiration=expiration,
+            **arrays,
+        )
+
+    @classmethod
+    def from_tradier(cls, options: Iterable[Dict]) -> "OptionChain":
+        """Parse Tradier ``/markets/options/chains`` contracts (also accepts FMP-style keys)."""
+        columns: Dict[str, List[float]] = {name: [] for name in _FLOAT_COLUMNS}
+        types: List[int] = []
+        has_greeks: List[bool] = []
+        expiration = None
+        for opt in options or []:
+            if not isinstance(opt, dict):
+                continue
+            try:
+                strike = float(opt.get("strike", 0))
+            except (TypeError, ValueError):
+                continue
+            greeks = opt.get("greeks")
+            if not isinstance(greeks, dict):
+                greeks = {}
+            if expiration is None:
+                expiration = opt.get("expiration_date") or opt.get("expirationDate")
+            columns["strike"].append(strike)
+            types.append(_type_flag(opt.get("option_type") or opt.get("type")))
+            columns["open_interest"].append(_num(opt.get("open_interest") or opt.get("openInterest")))
+            columns["volume"].append(_num(opt.get("volume")))
+            columns["bid"].append(_num(opt.get("bid")))
+            columns["ask"].append(_num(opt.get("ask")))
+            columns["iv"].append(_num(
+                opt.get("implied_volatility") or opt.get("impliedVolatility") or opt.get("iv")
+                or greeks.get("mid_iv") or greeks.get("smv_vol")
+            ))
+            for name in ("delta", "gamma", "theta", "vega"):
+                columns[name].append(_num(greeks.get(name) if name in greeks else opt.get(name)))
+            has_greeks.append(bool(greeks.get("delta")) and bool(greeks.get("gamma")))
+        return cls._from_columns(columns, types, has_greeks, expiration)
+
+    @classmethod
+    def from_finviz(cls, df: pd.DataFrame) -> "OptionChain":
+        """Parse a Finviz Elite options export (``ty=oc``) DataFrame."""
+        if df is None or df.empty:
+            return cls.empty()
+
+        def column(name: str) -> Optional[pd.Series]:
+            for candidate in _FINVIZ_COLUMNS[name]:
+                if candidate in df.columns:
+                    return df[candidate]
+            return None
+
+        def numeric(name: str) -> np.ndarray:
+            series = column(name)
+            if series is None:
+                return np.zeros(len(df))
+            if not pd.api.types.is_numeric_dtype(series):
+                series = series.astype(str).str.replace(",", "", regex=False).str.replace("%", "", regex=False)
+            return pd.to_numeric(series, errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+
+        types_series = column("type")
+        types = [_type_flag(v) for v in types_series] if types_series is not None else [0] * len(df)
+        columns = {name: numeric(name) for name in _FLOAT_COLUMNS}
+        has_greeks = (columns["delta"] != 0) & (columns["gamma"] != 0)
+        expiration_series = column("expiration")
+        expiration = str(expiration_series.iloc[0]) if expiration_series is not None else None
+        return cls._from_columns(columns, types, has_greeks, expiration)
+
+    @classmethod
+    def from_records(cls, data) -> "OptionChain":
+        """Build from whatever a fetch path returned: Tradier list, DataFrame, or an OptionChain."""
+        if isinstance(data, OptionChain):
+            return data
+        if isinstance(data, pd.DataFrame):
+            if "strike" in data.columns:
+                return cls.from_tradier(data.to_dict("records"))
+            return cls.from_finviz(data)
+        return cls.from_tradier(data)
+
+    def __len__(self) -> int:
+        return int(self.strike.size)
+
+    @property
+    def is_call(self) -> np.ndarray:
+        return self.option_type == CALL
+
+    @property
+    def is_put(self) -> np.ndarray:
+        return self.option_type == PUT
+
+    @property
+    def mid(self) -> np.ndarray:
+        return (self.bid + self.ask) / 2.0
+
+    def row(self, strike: float, option_type: str) -> Optional[int]:
+        """Row index of the contract at ``strike``/``option_type``, or None."""
+        pos = int(np.searchsorted(self.strikes, float(strike)))
+        if pos >= self.strikes.size or self.strikes[pos] != float(strike):
+            return None
+        rows = self.call_row if _type_flag(option_type) == CALL else self.put_row
+        found = int(rows[pos])
+        return found if found >= 0 else None
+
+    def per_strike(self, values: np.ndarray, option_type: Optional[int] = None) -> np.ndarray:
+        """Sum ``values`` per unique strike, optionally for one side only."""
+        weights = np.asarray(values, dtype=np.float64)
+        if option_type is not None:
+            weights = np.where(self.option_type == option_type, weights, 0.0)
+        return np.bincount(self.strike_index, weights=weights, minlength=self.strikes.size)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "strike": self.strike,
+            "option_type": np.where(self.is_call, "call", np.where(self.is_put, "put", "")),
+            "open_interest": self.open_interest,
+            "volume": self.volume,
+            "bid": self.bid,
+            "ask": self.ask,
+            "iv": self.iv,
+            "delta": self.delta,
+            "gamma": self.gamma,
+            "theta": self.theta,
+            "vega": self.vega,
+        })
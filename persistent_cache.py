@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import requests
+
+from async_http import AsyncHttpClient
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that authenticate rather than select data; never part of a key
+SECRET_PARAMS = frozenset({"apikey", "token", "auth"})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    url TEXT NOT NULL,
+    body TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+
+@dataclass
+class _Entry:
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+
+
+class PersistentCache:
+    """SQLite-backed JSON response cache shared by every worker process.
+
+    Entries are keyed by provider, URL and the non-secret query parameters
+    and carry the response's ``ETag``/``Last-Modified`` plus an expiry. A
+    fresh entry is served without touching the network; an expired one is
+    revalidated with a conditional request, and a ``304`` just extends it.
+    When the provider fails, an entry expired for less than ``max_stale``
+    seconds is served instead of the error. The database runs in WAL mode
+    so concurrent workers read while one writes, and it survives restarts.
+    """
+
+    def __init__(self, path: str, max_stale: float = 7 * 86400) -> None:
+        self.path = path
+        self.max_stale = max_stale
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.stale = 0
+        self.misses = 0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections are not shareable across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA busy_timeout=10000")
+        return conn
+
+    @staticmethod
+    def key(provider: str, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        query = sorted((k, str(v)) for k, v in (params or {}).items() if k not in SECRET_PARAMS)
+        return json.dumps([provider, url, query], separators=(",", ":"))
+
+    def _load(self, key: str) -> Optional[_Entry]:
+        try:
+            row = self._connect().execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as exc:
+            logger.warning(f"Persistent cache read failed: {exc}")
+            return None
+        return _Entry(*row) if row else None
+
+    def _store(self, key: str, provider: str, url: str, body: str,
+               etag: Optional[str], last_modified: Optional[str], ttl: float) -> None:
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, provider, url, body, etag, last_modified, now, now + ttl),
+                )
+        except sqlite3.Error as exc:
+            logger.warning(f"Persistent cache write failed: {exc}")
+
+    def _extend(self, key: str, ttl: float) -> None:
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute("UPDATE responses SET fetched_at = ?, expires_at = ? WHERE key = ?", (now, now + ttl, key))
+        except sqlite3.Error as exc:
+            logger.warning(f"Persistent cache write failed: {exc}")
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @staticmethod
+    def _cacheable(data: Any) -> bool:
+        # FMP reports bad symbols, plan limits and key errors as 200 + {"Error Message": ...}
+        return not (isinstance(data, dict) and "Error Message" in data)
+
+    async def fetch_json(
+        self,
+        client: AsyncHttpClient,
+        provider: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        ttl: float = 86400,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """JSON for a GET through ``client``, served from disk while fresh.
+
+        Raises like ``client.fetch_json`` when the request fails and no
+        usable stale entry exists.
+        """
+        key = self.key(provider, url, params)
+        # SQLite may wait on another worker's write lock; keep it off the client loop
+        entry = await client.call_io(self._load, key)
+        now = time.time()
+        if entry is not None and entry.expires_at > now:
+            self._count("hits")
+            return json.loads(entry.body)
+
+        headers = {}
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        try:
+            response = await client.fetch(provider, url, params, headers=headers or None, timeout=timeout)
+            if response.status_code == 304 and entry is not None:
+                await client.call_io(self._extend, key, ttl)
+                self._count("revalidated")
+                return json.loads(entry.body)
+            response.raise_for_status()
+            data = response.json()
+        except (requests.RequestException, ValueError) as exc:
+            if entry is not None and now - entry.expires_at < self.max_stale:
+                logger.warning(f"Serving stale {provider} response for {url}: {exc}")
+                self._count("stale")
+                return json.loads(entry.body)
+            raise
+        self._count("misses")
+        if self._cacheable(data):
+            await client.call_io(self._store, key, provider, url, json.dumps(data), response.headers.get("ETag"),
+                                 response.headers.get("Last-Modified"), ttl)
+        return data
+
+    def get_json(self, client: AsyncHttpClient, provider: str, url: str,
+                 params: Optional[Dict[str, Any]] = None, ttl: float = 86400, **kwargs) -> Any:
+        """Blocking :meth:`fetch_json`; fresh entries are answered without the client loop."""
+        entry = self._load(self.key(provider, url, params))
+        if entry is not None and entry.expires_at > time.time():
+            self._count("hits")
+            return json.loads(entry.body)
+        return client.run(self.fetch_json(client, provider, url, params, ttl, **kwargs))
+
+    def purge(self, older_than: Optional[float] = None) -> int:
+        """Drop entries expired for longer than ``older_than`` seconds (default ``max_stale``)."""
+        cutoff = time.time() - (self.max_stale if older_than is None else older_than)
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM responses WHERE expires_at < ?", (cutoff,)).rowcount
+
+    def stats(self) -> Dict[str, float]:
+        try:
+            entries, size = self._connect().execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM responses").fetchone()
+        except sqlite3.Error:
+            entries, size = 0, 0
+        with self._lock:
+            served = self.hits + self.revalidated + self.stale
+            total = served + self.misses
+            return {
+                "entries": entries,
+                "mb": size / 1_000_000,
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "stale": self.stale,
+                "misses": self.misses,
+                "hit_ratio": served / total if total else 0.0,
+            }
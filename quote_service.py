@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+QuoteFetcher = Callable[[List[str]], Dict[str, "Quote"]]
+
+
+def _num(value, default: float = 0.0) -> float:
+    try:
+        return float(value) if value is not None else default
+    except (TypeError, ValueError):
+        return default
+
+
+def _iv(value) -> Optional[float]:
+    if value is None:
+        return None
+    iv = _num(value, -1.0)
+    if iv <= 0:
+        return None
+    return iv / 100.0 if iv > 3 else iv
+
+
+@dataclass(frozen=True)
+class Quote:
+    """Normalized equity quote, whichever provider produced it."""
+
+    symbol: str
+    last: float
+    bid: float
+    ask: float
+    volume: float
+    iv: Optional[float]
+    change: float = 0.0
+    change_percentage: float = 0.0
+    prev_close: float = 0.0
+    average_volume: float = 0.0
+    high: float = 0.0
+    low: float = 0.0
+    source: str = ""
+    fetched_at: float = 0.0
+    raw: Dict = field(default_factory=dict, repr=False, compare=False)
+
+    @property
+    def price(self) -> float:
+        """Best available price: last trade, else mid, else previous close."""
+        if self.last > 0:
+            return self.last
+        if self.bid > 0 and self.ask > 0:
+            return (self.bid + self.ask) / 2
+        return self.prev_close
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def to_dict(self) -> Dict:
+        record = asdict(self)
+        record.pop("raw")
+        return record
+
+    @classmethod
+    def from_tradier(cls, item: Dict, fetched_at: Optional[float] = None) -> "Quote":
+        return cls(
+            symbol=str(item.get("symbol", "")).upper(),
+            last=_num(item.get("last")),
+            bid=_num(item.get("bid")),
+            ask=_num(item.get("ask")),
+            volume=_num(item.get("volume")),
+            iv=_iv(item.get("implied_volatility", item.get("iv"))),
+            change=_num(item.get("change")),
+            change_percentage=_num(item.get("change_percentage")),
+            prev_close=_num(item.get("prevclose", item.get("prev_close"))),
+            average_volume=_num(item.get("average_volume")),
+            high=_num(item.get("high")),
+            low=_num(item.get("low")),
+            source="tradier",
+            fetched_at=time.time() if fetched_at is None else fetched_at,
+            raw=item,
+        )
+
+    @classmethod
+    def from_fmp(cls, item: Dict, fetched_at: Optional[float] = None) -> "Quote":
+        return cls(
+            symbol=str(item.get("symbol", "")).upper(),
+            last=_num(item.get("price")),
+            bid=_num(item.get("bid")),
+            ask=_num(item.get("ask")),
+            volume=_num(item.get("volume")),
+            iv=None,
+            change=_num(item.get("change")),
+            change_percentage=_num(item.get("changesPercentage", item.get("changePercentage"))),
+            prev_close=_num(item.get("previousClose")),
+            average_volume=_num(item.get("avgVolume")),
+            high=_num(item.get("dayHigh")),
+            low=_num(item.get("dayLow")),
+            source="fmp",
+            fetched_at=time.time() if fetched_at is None else fetched_at,
+            raw=item,
+        )
+
+
+class QuoteService:
+    """Micro-batching quote store shared by every caller in the process.
+
+    Symbols requested within ``window`` seconds of each other (from any
+    thread or session) are collected and fetched together in chunks of
+    ``chunk_size`` through ``fetchers``, tried in order for whatever symbols
+    the previous provider did not return. Results land in a shared store and
+    are served to any caller whose ``max_age`` they satisfy. Symbols no
+    provider could quote resolve to ``None``.
+    """
+
+    def __init__(
+        self,
+        fetchers: Sequence[QuoteFetcher],
+        ttl: float = 10.0,
+        window: float = 0.02,
+        chunk_size: int = 100,
+    ) -> None:
+        self.fetchers = list(fetchers)
+        self.ttl = ttl
+        self.window = window
+        self.chunk_size = chunk_size
+        self._store: Dict[str, Quote] = {}
+        self._pending: Dict[str, Future] = {}
+        self._flush_scheduled = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.batches = 0
+        self.symbols_fetched = 0
+
+    def get(self, symbol: str, max_age: Optional[float] = None) -> Optional[Quote]:
+        return self.get_many([symbol], max_age).get(symbol.strip().upper())
+
+    def get_many(self, symbols: Iterable[str], max_age: Optional[float] = None) -> Dict[str, Quote]:
+        """Quotes for ``symbols`` (upper-cased keys); unquotable symbols are omitted."""
+        max_age = self.ttl if max_age is None else max_age
+        wanted = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+        quotes: Dict[str, Quote] = {}
+        waiting: Dict[str, Future] = {}
+        with self._lock:
+            for symbol in wanted:
+                quote = self._store.get(symbol)
+                if quote is not None and quote.age <= max_age:
+                    quotes[symbol] = quote
+                    self.hits += 1
+                    continue
+                future = self._pending.get(symbol)
+                if future is None:
+                    future = Future()
+                    self._pending[symbol] = future
+                waiting[symbol] = future
+            if waiting and not self._flush_scheduled:
+                self._flush_scheduled = True
+                timer = threading.Timer(self.window, self._flush)
+                timer.daemon = True
+                timer.start()
+        for symbol, future in waiting.items():
+            quote = future.result()
+            if quote is not None:
+                quotes[symbol] = quote
+        return quotes
+
+    def _flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flush_scheduled = False
+        symbols = list(pending)
+        chunks = [symbols[start:start + self.chunk_size] for start in range(0, len(symbols), self.chunk_size)]
+        results: Dict[str, Quote] = {}
+        try:
+            if len(chunks) == 1:
+                results.update(self._fetch_chunk(chunks[0]))
+            elif chunks:
+                with ThreadPoolExecutor(max_workers=min(len(chunks), 4)) as executor:
+                    for fetched in executor.map(self._fetch_chunk, chunks):
+                        results.update(fetched)
+        finally:
+            with self._lock:
+                self._store.update(results)
+                self.symbols_fetched += len(results)
+            for symbol, future in pending.items():
+                future.set_result(results.get(symbol))
+
+    def _fetch_chunk(self, chunk: List[str]) -> Dict[str, Quote]:
+        results: Dict[str, Quote] = {}
+        missing = chunk
+        for fetcher in self.fetchers:
+            if not missing:
+                break
+            try:
+                fetched = fetcher(missing)
+            except Exception as exc:
+                logger.warning(f"Quote fetch for {len(missing)} symbols failed: {exc}")
+                continue
+            with self._lock:
+                self.batches += 1
+            results.update({s: q for s, q in fetched.items() if s in missing and q.price > 0})
+            missing = [s for s in missing if s not in results]
+        if missing:
+            logger.warning(f"No quote for {missing}")
+        return results
+
+    def invalidate(self, symbols: Optional[Iterable[str]] = None) -> None:
+        with self._lock:
+            if symbols is None:
+                self._store.clear()
+            else:
+                for symbol in symbols:
+                    self._store.pop(symbol.strip().upper(), None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "symbols": len(self._store),
+                "hits": self.hits,
+                "batches": self.batches,
+                "symbols_fetched": self.symbols_fetched,
+                "pending": len(self._pending),
+            }
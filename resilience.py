@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional
+
+import requests
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, bursts up to ``capacity``.
+
+    ``reserve`` takes a token immediately (the balance may go negative) and
+    returns how long the caller must wait before using it, so waiters queue
+    fairly and async code can ``await asyncio.sleep`` instead of blocking.
+    A non-positive rate disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    def release(self, tokens: float = 1.0) -> None:
+        """Give back reserved tokens that were never used (the request was abandoned)."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """One retry policy per provider, bounded by a total deadline.
+
+    Connection errors, timeouts and ``statuses`` are retried with capped,
+    jittered exponential backoff until ``attempts`` calls have been made or
+    the next attempt could not start before ``deadline`` seconds have passed
+    since the first one. A ``Retry-After`` header overrides the backoff.
+    """
+
+    attempts: int = 3
+    deadline: float = 15.0
+    base_delay: float = 0.25
+    max_delay: float = 2.0
+    statuses: FrozenSet[int] = RETRY_STATUSES
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised without touching the network while a provider's circuit is open."""
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failure_threshold`` consecutive failed calls.
+
+    While open every call fails fast with :class:`CircuitOpenError`, so
+    callers drop straight to their fallback provider. After ``reset_timeout``
+    seconds one probe call is let through (half-open); its outcome closes or
+    re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._probing = False
+            if self._state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            self.rejected += 1
+        raise CircuitOpenError(f"{self.name} circuit open; failing fast")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def record_abandoned(self) -> None:
+        """The call never reached the provider: frees a half-open probe without counting a failure."""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> Dict[str, object]:
+        state = self.state
+        with self._lock:
+            return {"state": state, "failures": self._failures, "rejected": self.rejected}
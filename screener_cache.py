@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from io import StringIO
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from screener_scoring import parse_numeric
+
+logger = logging.getLogger(__name__)
+
+# download(params) -> raw CSV text of one Finviz export request
+ExportDownloader = Callable[[Dict[str, str]], str]
+# rule(frame) -> row mask; None when the frame lacks the column it needs
+LocalRule = Callable[[pd.DataFrame], Optional[np.ndarray]]
+
+_SECTORS = {
+    "basicmaterials": "Basic Materials",
+    "communicationservices": "Communication Services",
+    "consumercyclical": "Consumer Cyclical",
+    "consumerdefensive": "Consumer Defensive",
+    "energy": "Energy",
+    "financial": "Financial",
+    "healthcare": "Healthcare",
+    "industrials": "Industrials",
+    "realestate": "Real Estate",
+    "technology": "Technology",
+    "utilities": "Utilities",
+}
+
+
+def _numeric_rule(columns: Sequence[str], test: Callable[[np.ndarray], np.ndarray]) -> LocalRule:
+    def rule(frame: pd.DataFrame) -> Optional[np.ndarray]:
+        column = next((c for c in columns if c in frame.columns), None)
+        if column is None:
+            return None
+        values = parse_numeric(frame[column])
+        with np.errstate(invalid="ignore"):
+            return test(values) & ~np.isnan(values)
+    return rule
+
+
+def local_rule(code: str) -> Optional[LocalRule]:
+    """Rule evaluating a Finviz filter code on export columns, or None if it must run server-side.
+
+    Covers the filters Tab 2 toggles most: change, relative volume, RSI,
+    weekly/monthly volatility, short float, price and sector.
+    """
+    match = re.fullmatch(r"ta_change_(u|d)(\d+(?:\.\d+)?)?", code)
+    if match:
+        level = float(match.group(2) or 0)
+        if match.group(1) == "u":
+            return _numeric_rule(["Change"], lambda v: v > level)
+        return _numeric_rule(["Change"], lambda v: v < -level)
+    match = re.fullmatch(r"sh_relvol_(o|u)(\d+(?:\.\d+)?)", code)
+    if match:
+        level = float(match.group(2))
+        test = (lambda v: v > level) if match.group(1) == "o" else (lambda v: v < level)
+        return _numeric_rule(["Relative Volume", "Rel Volume"], test)
+    match = re.fullmatch(r"ta_rsi_(ob|os|nob|nos)(\d+)", code)
+    if match:
+        level = float(match.group(2))
+        above = match.group(1) in ("ob", "nos")
+        return _numeric_rule(["RSI (14)", "RSI"], (lambda v: v > level) if above else (lambda v: v < level))
+    match = re.fullmatch(r"ta_volatility_(w|m)o(\d+(?:\.\d+)?)", code)
+    if match:
+        level = float(match.group(2))
+        column = "Volatility (Week)" if match.group(1) == "w" else "Volatility (Month)"
+        return _numeric_rule([column], lambda v: v > level)
+    match = re.fullmatch(r"sh_short_o(\d+(?:\.\d+)?)", code)
+    if match:
+        level = float(match.group(1))
+        return _numeric_rule(["Short Float", "Float Short"], lambda v: v > level)
+    match = re.fullmatch(r"sh_price_(o|u)(\d+(?:\.\d+)?)", code)
+    if match:
+        level = float(match.group(2))
+        return _numeric_rule(["Price"], (lambda v: v > level) if match.group(1) == "o" else (lambda v: v < level))
+    match = re.fullmatch(r"sec_(\w+)", code)
+    if match and match.group(1) in _SECTORS:
+        sector = _SECTORS[match.group(1)]
+        return lambda frame: (frame["Sector"] == sector).to_numpy() if "Sector" in frame.columns else None
+    return None
+
+
+@dataclass
+class _Export:
+    server_filters: FrozenSet[str]
+    frame: pd.DataFrame
+    fetched_at: float
+    nbytes: int
+    complete: bool
+
+
+class ScreenerCache:
+    """Finviz export cache that answers narrower screens from a cached superset.
+
+    Exports are kept per (view, columns, order, row limit, extra params). A screen whose
+    filters contain a cached export's filters is served locally when every
+    extra filter has a :func:`local_rule` whose column is in that export and
+    the export was not truncated at the row limit. Anything else is
+    downloaded as asked and cached in turn. Hits, local refinements, misses
+    and the bytes saved are counted for the cache monitor.
+    """
+
+    def __init__(self, download: ExportDownloader, ttl: float = 60.0, max_exports: int = 32) -> None:
+        self.download = download
+        self.ttl = ttl
+        self.max_exports = max_exports
+        self._exports: Dict[Tuple, List[_Export]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.refinements = 0
+        self.misses = 0
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def _key(view: str, columns: Optional[Sequence], order: Optional[str], rows: int, params: Dict[str, str]) -> Tuple:
+        return view, tuple(str(c) for c in columns or ()), order or "", rows, tuple(sorted(params.items()))
+
+    def _lookup(self, key: Tuple, filters: FrozenSet[str]) -> Optional[Tuple[_Export, Optional[np.ndarray]]]:
+        """Smallest fresh export that answers ``filters``, with the row mask for the extra ones."""
+        best = None
+        now = time.time()
+        for export in self._exports.get(key, []):
+            if now - export.fetched_at > self.ttl or not export.server_filters <= filters:
+                continue
+            extra = filters - export.server_filters
+            if not extra:
+                return export, None
+            if not export.complete:
+                continue
+            mask = np.ones(len(export.frame), dtype=bool)
+            for code in extra:
+                rule = local_rule(code)
+                rows = rule(export.frame) if rule is not None else None
+                if rows is None:
+                    break
+                mask &= rows
+            else:
+                if best is None or mask.sum() < best[1].sum():
+                    best = (export, mask)
+        return best
+
+    def screen(
+        self,
+        filters: Iterable[str],
+        view: str = "111",
+        columns: Optional[Sequence] = None,
+        order: Optional[str] = None,
+        rows: int = 1000,
+        params: Optional[Dict[str, str]] = None,
+    ) -> pd.DataFrame:
+        """Rows matching ``filters`` (Finviz filter codes), from cache when possible.
+
+        ``params`` holds any other export parameters (auth, sort) and is
+        passed through unchanged. Returns a copy the caller may modify.
+        Download and parsing errors propagate.
+        """
+        codes = list(dict.fromkeys(filters))
+        filters = frozenset(codes)
+        key = self._key(view, columns, order, rows, {k: v for k, v in (params or {}).items() if k != "auth"})
+        with self._lock:
+            found = self._lookup(key, filters)
+            if found is not None:
+                export, mask = found
+                frame = export.frame
+                if mask is not None:
+                    frame = frame[mask]
+                    self.refinements += 1
+                    logger.info(f"Finviz screen refined locally: {len(frame)}/{len(export.frame)} rows")
+                else:
+                    self.hits += 1
+                share = len(frame) / len(export.frame) if len(export.frame) else 1.0
+                self.bytes_saved += int(export.nbytes * share)
+                return frame.reset_index(drop=True).copy()
+            self.misses += 1
+
+        request = {"v": view, "r": str(rows), **(params or {})}
+        if codes:
+            request["f"] = ",".join(codes)
+        if order:
+            request["o"] = order
+        if columns:
+            request["c"] = ",".join(str(c) for c in columns)
+        text = self.download(request)
+        frame = pd.read_csv(StringIO(text)) if text and text.strip() else pd.DataFrame()
+        export = _Export(filters, frame, time.time(), len(text or ""), complete=len(frame) < rows)
+        with self._lock:
+            self.bytes_downloaded += export.nbytes
+            exports = [e for e in self._exports.get(key, []) if e.server_filters != filters]
+            self._exports[key] = exports + [export]
+            self._evict()
+        return frame.copy()
+
+    def _evict(self) -> None:
+        entries = sorted(
+            ((export.fetched_at, key, export) for key, exports in self._exports.items() for export in exports),
+            key=lambda item: item[0],
+        )
+        for _, key, export in entries[:max(len(entries) - self.max_exports, 0)]:
+            self._exports[key].remove(export)
+            if not self._exports[key]:
+                del self._exports[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._exports.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            served = self.hits + self.refinements
+            total = served + self.misses
+            return {
+                "hits": self.hits,
+                "refinements": self.refinements,
+                "misses": self.misses,
+                "hit_ratio": served / total if total else 0.0,
+                "downloaded_mb": self.bytes_downloaded / 1_000_000,
+                "bandwidth_saved_mb": self.bytes_saved / 1_000_000,
+            }
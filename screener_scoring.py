@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+HIGHLIGHT_SCORE = 40
+SQUEEZE_SCORE = 50
+
+
+def parse_numeric(series: pd.Series, strip: str = "%,") -> np.ndarray:
+    """Finviz export column as float64; unparseable cells become NaN.
+
+    Numeric columns pass straight through. Text columns have every
+    character in ``strip`` removed before conversion, in one pass.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=np.float64, na_value=np.nan)
+    text = series.astype(str)
+    if strip:
+        text = text.str.translate(str.maketrans("", "", strip))
+    return pd.to_numeric(text.str.strip(), errors="coerce").to_numpy(dtype=np.float64)
+
+
+@dataclass
+class ScreenerColumns:
+    """Typed columns of a Finviz screener export, parsed once per screen."""
+
+    change: np.ndarray
+    volume: np.ndarray
+    rsi: Optional[np.ndarray]
+    market_cap: Optional[np.ndarray]
+    pattern: Optional[np.ndarray]
+
+    def __len__(self) -> int:
+        return self.change.size
+
+    @classmethod
+    def from_finviz(cls, df: pd.DataFrame) -> "ScreenerColumns":
+        n = len(df)
+        change = parse_numeric(df["Change"]) if "Change" in df.columns else np.full(n, np.nan)
+        volume = parse_numeric(df["Volume"], ",") if "Volume" in df.columns else np.zeros(n)
+        rsi = parse_numeric(df["RSI (14)"], "") if "RSI (14)" in df.columns else None
+        market_cap = parse_numeric(df["Market Cap"], ",BM") if "Market Cap" in df.columns else None
+        pattern = df["Pattern"].astype(str).str.upper().to_numpy() if "Pattern" in df.columns else None
+        return cls(
+            # Unparseable change/volume count as 0, as the row-wise scorer did
+            change=np.nan_to_num(change, nan=0.0),
+            volume=np.nan_to_num(volume, nan=0.0),
+            rsi=rsi,
+            market_cap=market_cap,
+            pattern=pattern,
+        )
+
+
+def _join_signals(n: int, signals: List[Tuple[str, np.ndarray]]) -> np.ndarray:
+    text = np.full(n, "", dtype=object)
+    for label, mask in signals:
+        sep = np.where(text == "", "", " | ")
+        text = np.where(mask, text + sep + label, text)
+    text[text == ""] = "Monitor"
+    return text
+
+
+def score_bullish_short_squeeze(data) -> pd.DataFrame:
+    """Bullish / short-squeeze score for every row of a screen in one vectorized pass.
+
+    ``data`` is a Finviz export DataFrame or pre-parsed :class:`ScreenerColumns`.
+    Returns ``score``, ``signals``, ``type`` and ``highlight`` columns aligned
+    with the input rows.
+    """
+    cols = data if isinstance(data, ScreenerColumns) else ScreenerColumns.from_finviz(data)
+    n = len(cols)
+    change, volume = cols.change, cols.volume
+    no_signal = np.zeros(n, dtype=bool)
+    signals: List[Tuple[str, np.ndarray]] = []
+
+    # ===== BULLISH SIGNALS =====
+    # Signal 1: Cambio positivo (bullish momentum) - highest tier first
+    momentum = np.select([change > 3, change > 1], [2, 1], default=0)
+    score = np.select([momentum == 1, momentum == 2], [15, 25], default=0)
+    signals += [("📈 Positive Momentum", momentum == 1), ("📈📈 Strong Momentum", momentum == 2)]
+
+    # Signal 2: Volumen alto (actividad institucional)
+    activity = np.select([volume > 5_000_000, volume > 2_000_000], [2, 1], default=0)
+    score = score + np.select([activity == 1, activity == 2], [15, 20], default=0)
+    signals += [("📊 High Volume", activity == 1), ("📊📊 Extreme Volume", activity == 2)]
+
+    # Signal 3: RSI (si está disponible)
+    if cols.rsi is not None:
+        rsi_positive = (cols.rsi > 50) & (cols.rsi < 70)
+        rsi_oversold = ~rsi_positive & (cols.rsi < 30)
+        score = score + np.where(rsi_positive, 10, 0) + np.where(rsi_oversold, 15, 0)
+        signals += [("⚡ Positive RSI", rsi_positive), ("🟢 RSI Oversold (Entry)", rsi_oversold)]
+
+    # ===== SHORT SQUEEZE SIGNALS =====
+    # Signal 4: Reversión desde resistencia
+    reversal = change > 5
+    # Signal 5: Volumen explosivo + cambio positivo (squeeze activación)
+    activation = (volume > 3_000_000) & (change > 2)
+    score = score + np.where(reversal, 20, 0) + np.where(activation, 25, 0)
+    signals += [("🚀 Strong Reversal", reversal), ("💥 Squeeze Activation", activation)]
+
+    # Signal 6: Patrones técnicos si existen
+    if cols.pattern is not None:
+        pattern = pd.Series(cols.pattern)
+        bounce = (pattern.str.contains("BOTTOM", regex=False) | pattern.str.contains("SUPPORT", regex=False)).to_numpy()
+        breakout = pattern.str.contains("BREAKOUT", regex=False).to_numpy()
+        score = score + np.where(bounce, 12, 0) + np.where(breakout, 15, 0)
+        signals += [("📍 Support Bounce", bounce), ("⬆️ Breakout", breakout)]
+
+    # Signal 7: Market Cap (Small cap = más volatilidad para squeeze)
+    small_cap = cols.market_cap < 2 if cols.market_cap is not None else no_signal
+    score = score + np.where(small_cap, 10, 0)
+    signals.append(("🎯 Small Cap (High Volatility)", small_cap))
+
+    # ===== RESULTADO FINAL =====
+    score = score.astype(np.int64)
+    kind = np.where(change > 0, "BULLISH", np.where(score >= SQUEEZE_SCORE, "SHORT SQUEEZE", "NEUTRAL"))
+    return pd.DataFrame({
+        "score": score,
+        "signals": _join_signals(n, signals),
+        "type": kind,
+        "highlight": score >= HIGHLIGHT_SCORE,
+    })
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import functools
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one in-flight execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running block on the same Future and receive its result (or its
+    exception). Nothing is cached once the call finishes - pair it with a
+    TTL cache such as ``st.cache_data`` or ``ChainCache`` for that.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+        self.issued = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.issued += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(result)
+        return result
+
+    def wrap(self, fn: Optional[Callable] = None, *, name: Optional[str] = None):
+        """Decorator form; the key is the function name plus its (hashable) arguments."""
+        def decorator(func: Callable) -> Callable:
+            prefix = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                try:
+                    key = (prefix, args, tuple(sorted(kwargs.items())))
+                    hash(key)
+                except TypeError:
+                    return func(*args, **kwargs)
+                return self.do(key, lambda: func(*args, **kwargs))
+
+            return wrapper
+
+        return decorator(fn) if fn is not None else decorator
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "issued": self.issued,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._inflight),
+            }
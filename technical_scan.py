@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from typing import Dict, List
+
+import numpy as np
+
+from indicators import rsi as wilder_rsi, sma as rolling_sma
+from ohlcv_store import OHLCVPanel
+
+SCAN_BULLISH = "Bullish (Upward Momentum)"
+SCAN_BEARISH = "Bearish (Downward Momentum)"
+SCAN_BREAKOUTS = "Breakouts"
+SCAN_UNUSUAL_VOLUME = "Unusual Volume"
+
+RSI_PERIOD = 14
+SMA_PERIOD = 20
+
+
+def _last_window_mean(values: np.ndarray, period: int) -> np.ndarray:
+    window = values[:, -period:]
+    valid = ~np.isnan(window).any(axis=1)
+    out = np.full(values.shape[0], np.nan)
+    out[valid] = window[valid].mean(axis=1)
+    return out
+
+
+def panel_rsi(close: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    """Wilder RSI of the last bar per row; NaN without ``period + 1`` bars."""
+    return wilder_rsi(close, period)[:, -1]
+
+
+def scan_panel(
+    panel: OHLCVPanel,
+    scan_type: str,
+    breakout_period: int = 10,
+    volume_threshold: float = 2.0,
+) -> List[Dict]:
+    """Run one scanner over every symbol in ``panel`` with column math only.
+
+    Breakout levels are the high/low closes of the ``breakout_period`` bars
+    before the latest one; average volume is taken over the same window
+    plus the latest bar. Rows without enough history for a check are
+    skipped by that check. Output rows keep the panel's symbol order and
+    the field names of the Market Scanner table.
+    """
+    close = panel.close
+    volume = panel.volume
+    if not len(panel) or close.shape[1] < breakout_period + 1:
+        return []
+
+    last_price = close[:, -1]
+    current_volume = volume[:, -1]
+    prior = close[:, -(breakout_period + 1):-1]
+    has_window = ~np.isnan(close[:, -(breakout_period + 1):]).any(axis=1) & (last_price > 0)
+    with np.errstate(invalid="ignore"):
+        recent_high = np.nanmax(np.where(has_window[:, None], prior, 0.0), axis=1)
+        recent_low = np.nanmin(np.where(has_window[:, None], prior, 1.0), axis=1)
+    avg_volume = _last_window_mean(volume, breakout_period + 1)
+    sma = rolling_sma(close, SMA_PERIOD)[:, -1]
+    rsi = panel_rsi(close)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        near_support = np.abs(last_price - recent_low) / recent_low <= 0.05
+        near_resistance = np.abs(last_price - recent_high) / recent_high <= 0.05
+        possible_change = np.select(
+            [near_support, near_resistance],
+            [(recent_low - last_price) / last_price * 100, (recent_high - last_price) / last_price * 100],
+            default=np.nan,
+        )
+    breakout_type = np.select([last_price > recent_high, last_price < recent_low], ["Up", "Down"], default="")
+
+    if scan_type == SCAN_BULLISH:
+        hits = has_window & (last_price > sma) & (rsi < 70)
+    elif scan_type == SCAN_BEARISH:
+        hits = has_window & (last_price < sma) & (rsi > 30)
+    elif scan_type == SCAN_BREAKOUTS:
+        hits = has_window & (breakout_type != "")
+    elif scan_type == SCAN_UNUSUAL_VOLUME:
+        hits = has_window & (current_volume > volume_threshold * avg_volume)
+    else:
+        return []
+
+    def change(i: int):
+        return round(float(possible_change[i]), 2) if not np.isnan(possible_change[i]) and possible_change[i] else None
+
+    results = []
+    for i in np.flatnonzero(hits):
+        symbol = panel.symbols[i]
+        breakout = str(breakout_type[i]) or None
+        if scan_type in (SCAN_BULLISH, SCAN_BEARISH):
+            results.append({"Symbol": symbol, "Last Price": float(last_price[i]), "SMA": round(float(sma[i]), 2),
+                            "RSI": round(float(rsi[i]), 2), "Volume": float(current_volume[i]),
+                            "Breakout Type": breakout, "Possible Change (%)": change(i)})
+        elif scan_type == SCAN_BREAKOUTS:
+            results.append({"Symbol": symbol, "Breakout Type": breakout, "Last Price": float(last_price[i]),
+                            "Recent High": float(recent_high[i]), "Recent Low": float(recent_low[i]),
+                            "Volume": float(current_volume[i]), "Possible Change (%)": change(i)})
+        else:
+            results.append({"Symbol": symbol, "Volume": float(current_volume[i]),
+                            "Avg Volume": float(avg_volume[i]), "Last Price": float(last_price[i])})
+    return results
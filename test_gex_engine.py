@@ -0,0 +1,99 @@
+"""GEX surface builds and spot repricing against rebuilding from the chains."""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from gex_engine import build_gex_surface
+from option_chain import OptionChain
+
+TODAY = date(2026, 10, 16)
+EXPIRATIONS = {"2026-10-23": 0.24, "2026-11-20": 0.21, "2026-12-18": 0.19}
+
+
+def _chains(seed: int = 4):
+    rng = np.random.default_rng(seed)
+    chains = {}
+    for expiration, iv in EXPIRATIONS.items():
+        records = []
+        for strike in np.arange(540.0, 621.0, 5.0):
+            for option_type in ("call", "put"):
+                records.append({
+                    "strike": strike, "option_type": option_type, "expiration_date": expiration,
+                    "open_interest": int(rng.integers(0, 8000)), "volume": int(rng.integers(0, 500)),
+                    "bid": 1.0, "ask": 1.2, "greeks": {"mid_iv": iv + 0.0005 * abs(strike - 580)},
+                })
+        chains[expiration] = OptionChain.from_tradier(records)
+    return chains
+
+
+def test_per_strike_open_interest_matches_chains():
+    chains = _chains()
+    surface = build_gex_surface(chains, 580.0, TODAY)
+    for side, is_call in (("call", True), ("put", False)):
+        for expiration, chain in chains.items():
+            rows = chain.is_call == is_call
+            expected = {float(k): float(oi) for k, oi in zip(chain.strike[rows], chain.open_interest[rows])}
+            got = dict(zip(surface.strikes.tolist(), surface.per_strike(side, "oi", [expiration])))
+            assert got == pytest.approx(expected)
+
+
+def test_expiration_subsets_add_up():
+    surface = build_gex_surface(_chains(), 580.0, TODAY)
+    whole = surface.net("gamma")
+    parts = sum(surface.net("gamma", [expiration]) for expiration in EXPIRATIONS)
+    np.testing.assert_allclose(whole, parts, rtol=1e-12)
+
+
+def test_at_spot_equals_a_fresh_build():
+    chains = _chains()
+    surface = build_gex_surface(chains, 580.0, TODAY)
+    for spot in (571.25, 580.0, 596.5):
+        view, fresh = surface.at_spot(spot), build_gex_surface(chains, spot, TODAY)
+        assert view.grids.keys() == fresh.grids.keys()
+        for key in fresh.grids:
+            np.testing.assert_allclose(view.grids[key], fresh.grids[key], rtol=1e-12, err_msg=str(key))
+        assert view.totals() == pytest.approx(fresh.totals())
+    assert surface.at_spot(596.5) is surface.at_spot(596.5)
+
+
+def _two_sided_chains():
+    # Put open interest below spot, call open interest above: net gamma turns positive as spot rises
+    records = []
+    for strike in np.arange(540.0, 621.0, 5.0):
+        for option_type in ("call", "put"):
+            heavy = (option_type == "call") == (strike >= 580)
+            records.append({
+                "strike": strike, "option_type": option_type, "expiration_date": "2026-11-20",
+                "open_interest": 6000 if heavy else 200, "volume": 0,
+                "bid": 1.0, "ask": 1.2, "greeks": {"mid_iv": 0.22},
+            })
+    return {"2026-11-20": OptionChain.from_tradier(records)}
+
+
+def test_gamma_flip_is_a_root_of_the_repriced_profile():
+    surface = build_gex_surface(_two_sided_chains(), 580.0, TODAY)
+    flip = surface.gamma_flip()
+    assert flip is not None and 580.0 * 0.85 < flip < 580.0 * 1.15
+    below, above = surface.gamma_profile([flip - 1.0, flip + 1.0])
+    assert below < 0 < above
+    scale = np.abs(surface.gamma_profile(np.linspace(500, 660, 33))).max()
+    assert abs(surface.gamma_profile([flip])[0]) < 1e-3 * scale
+
+
+def test_gamma_flip_is_shared_by_spot_views():
+    surface = build_gex_surface(_two_sided_chains(), 580.0, TODAY)
+    view = surface.at_spot(583.0)
+    # Same snapshot, so the repriced profile and its root do not move with spot
+    np.testing.assert_allclose(view.gamma_profile([560.0, 600.0]), surface.gamma_profile([560.0, 600.0]), rtol=1e-12)
+    assert view.gamma_flip() == surface.gamma_flip()
+
+
+def test_gamma_flip_none_without_a_sign_change():
+    chains = _two_sided_chains()
+    calls_only = {exp: OptionChain.from_tradier([
+        {"strike": 580.0, "option_type": "call", "expiration_date": exp, "open_interest": 1000,
+         "volume": 0, "bid": 1.0, "ask": 1.2, "greeks": {"mid_iv": 0.22}},
+    ]) for exp in chains}
+    assert build_gex_surface(calls_only, 580.0, TODAY).gamma_flip() is None
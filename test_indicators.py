@@ -0,0 +1,62 @@
+"""RollingIndicators.update against recomputing every series from the full history."""
+
+import numpy as np
+
+from indicators import RollingIndicators, rsi, sma
+
+
+def _panel(seed: int, symbols: int = 4, bars: int = 90, gaps: bool = True):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, size=(symbols, bars)), axis=1))
+    spread = np.abs(rng.normal(0, 1.0, size=close.shape))
+    high, low = close + spread, close - spread
+    if gaps:
+        # Row 1 lists late (NaN-padded, still warming up when updates start), row 2 misses a bar mid-way
+        for values in (close, high, low):
+            values[1, :55] = np.nan
+            values[2, 70] = np.nan
+    return close, high, low
+
+
+def _assert_latest_equal(actual, expected):
+    assert actual.keys() == expected.keys()
+    for name in expected:
+        np.testing.assert_allclose(actual[name], expected[name], rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=name)
+
+
+def test_update_matches_full_recompute():
+    close, high, low = _panel(3)
+    start = 50
+    rolling = RollingIndicators(close[:, :start], high[:, :start], low[:, :start])
+    for bar in range(start, close.shape[1]):
+        latest = rolling.update(close[:, bar], high[:, bar], low[:, bar])
+        full = RollingIndicators(close[:, :bar + 1], high[:, :bar + 1], low[:, :bar + 1]).latest()
+        _assert_latest_equal(latest, full)
+
+
+def test_update_without_ranges_leaves_atr_missing():
+    close, _, _ = _panel(5)
+    rolling = RollingIndicators(close[:, :40])
+    for bar in range(40, 60):
+        latest = rolling.update(close[:, bar])
+        _assert_latest_equal(latest, RollingIndicators(close[:, :bar + 1]).latest())
+    assert np.isnan(latest["atr"]).all()
+
+
+def test_series_match_reference_formulas():
+    close, _, _ = _panel(11, symbols=1, gaps=False)
+    series = close[0]
+    expected_sma = np.convolve(series, np.ones(20) / 20, mode="valid")
+    np.testing.assert_allclose(sma(series, 20)[0, 19:], expected_sma, rtol=1e-12)
+
+    # Wilder RSI, seeded with the simple mean of the first 14 changes
+    delta = np.diff(series)
+    gains, losses = np.clip(delta, 0, None), np.clip(-delta, 0, None)
+    avg_gain, avg_loss = gains[:14].mean(), losses[:14].mean()
+    expected_rsi = [100 - 100 / (1 + avg_gain / avg_loss)]
+    for gain, loss in zip(gains[14:], losses[14:]):
+        avg_gain = (avg_gain * 13 + gain) / 14
+        avg_loss = (avg_loss * 13 + loss) / 14
+        expected_rsi.append(100 - 100 / (1 + avg_gain / avg_loss))
+    np.testing.assert_allclose(rsi(series, 14)[0, 14:], expected_rsi, rtol=1e-9)
+    assert np.isnan(rsi(series, 14)[0, :14]).all()
@@ -0,0 +1,77 @@
+"""Implied volatility inversion and smile fits against Black-Scholes prices."""
+
+import numpy as np
+from scipy.stats import norm
+
+from iv_engine import fit_smile, implied_volatility
+from option_chain import OptionChain
+
+RATE = 0.045
+
+
+def _bs_price(S, K, T, r, sigma, is_call):
+    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
+    d2 = d1 - sigma * np.sqrt(T)
+    call = S * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+    return np.where(is_call, call, call - S + K * np.exp(-r * T))
+
+
+def _bs_vega(S, K, T, r, sigma):
+    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
+    return S * norm.pdf(d1) * np.sqrt(T)
+
+
+def test_round_trips_black_scholes_prices():
+    K, T, sigma, is_call = np.meshgrid(
+        np.linspace(60, 140, 17), [0.01, 0.1, 0.5, 1.0, 2.0], [0.05, 0.15, 0.3, 0.6, 1.2, 2.5], [True, False],
+        indexing="ij",
+    )
+    price = _bs_price(100.0, K, T, RATE, sigma, is_call)
+    solved = implied_volatility(price, 100.0, K, T, RATE, is_call)
+    # Where vega is negligible the price does not pin the volatility down; elsewhere it must round-trip.
+    # The solver stops within 1e-6 of the price, so the volatility is good to about 1e-6 / vega.
+    vega = _bs_vega(100.0, K, T, RATE, sigma)
+    priced = vega > 1e-3
+    assert priced.sum() > 0.8 * priced.size
+    assert np.all(np.abs(solved - sigma)[priced] <= 2e-6 / vega[priced])
+    np.testing.assert_allclose(_bs_price(100.0, K, T, RATE, solved, is_call)[priced], price[priced], atol=2e-6)
+
+
+def test_prices_outside_arbitrage_bounds_are_nan():
+    # Below intrinsic, above the underlying, non-positive inputs
+    solved = implied_volatility([15.0, 120.0, 1.0, 1.0, np.nan], [100, 100, 100, 0, 100], [80, 100, 100, 100, 100],
+                                [0.5, 0.5, 0.0, 0.5, 0.5], RATE, [True, True, True, True, True])
+    assert np.isnan(solved).all()
+
+
+def _chain(spot, T, iv_of_strike, strikes):
+    records = []
+    for K in strikes:
+        sigma = iv_of_strike(K)
+        for option_type, is_call in (("call", True), ("put", False)):
+            mid = float(_bs_price(spot, K, T, RATE, sigma, is_call))
+            records.append({"strike": K, "option_type": option_type, "open_interest": 100,
+                            "bid": mid - 0.005, "ask": mid + 0.005, "greeks": {}})
+    return OptionChain.from_records(records)
+
+
+def test_fit_smile_recovers_a_skewed_smile():
+    spot, T = 100.0, 45 / 365
+
+    def skew(K):
+        k = np.log(K / (spot * np.exp(RATE * T)))
+        return 0.22 - 0.25 * k + 0.6 * k ** 2
+
+    strikes = np.arange(70.0, 131.0, 2.5)
+    smile = fit_smile(_chain(spot, T, skew, strikes), spot, T, RATE)
+    assert smile is not None and smile.method == "svi"
+    inner = strikes[(strikes >= 80) & (strikes <= 120)]
+    np.testing.assert_allclose(smile.iv(inner), skew(inner), atol=5e-3)
+    assert abs(smile.atm_iv - skew(smile.forward)) < 2e-3
+
+
+def test_fit_smile_interpolates_sparse_quotes():
+    spot, T = 100.0, 30 / 365
+    smile = fit_smile(_chain(spot, T, lambda K: 0.3, [95.0, 105.0]), spot, T, RATE)
+    assert smile is not None and smile.method == "interp"
+    np.testing.assert_allclose(smile.iv([95.0, 100.0, 105.0]), 0.3, atol=1e-3)
@@ -0,0 +1,53 @@
+"""compute_max_pain against the per-strike loop it replaced in app.py."""
+
+import numpy as np
+
+from max_pain_engine import compute_max_pain, max_pain_from_options
+
+
+def _loop_max_pain(strikes, call_weights, put_weights):
+    # Former calculate_max_pain: O(n^2) sum over every settlement strike
+    totals = {}
+    for strike, call, put in zip(strikes, call_weights, put_weights):
+        entry = totals.setdefault(float(strike), {"CALL": 0.0, "PUT": 0.0})
+        entry["CALL"] += call
+        entry["PUT"] += put
+    prices = sorted(totals)
+    losses = {
+        k: sum(totals[s]["CALL"] * max(0, s - k) for s in prices) + sum(totals[s]["PUT"] * max(0, k - s) for s in prices)
+        for k in prices
+    }
+    return min(losses, key=losses.get), [losses[k] for k in prices]
+
+
+def test_matches_loop_on_random_chains():
+    rng = np.random.default_rng(7)
+    for _ in range(25):
+        n = int(rng.integers(1, 80))
+        strikes = rng.choice(np.arange(50, 150, 2.5), size=n)  # duplicates on purpose
+        calls = rng.integers(0, 5000, size=n).astype(float)
+        puts = rng.integers(0, 5000, size=n).astype(float)
+        result = compute_max_pain(strikes, calls, puts)
+        expected, losses = _loop_max_pain(strikes, calls, puts)
+        assert result.max_pain == expected
+        np.testing.assert_allclose(result.total_loss, losses, rtol=1e-12, atol=1e-6)
+        assert result.min_loss == min(losses)
+
+
+def test_empty_chain():
+    result = compute_max_pain([], [], [])
+    assert result.max_pain is None
+    assert result.to_frame().empty
+
+
+def test_from_options_records():
+    options = [
+        {"strike": 100, "option_type": "call", "open_interest": 10, "volume": 5},
+        {"strike": 105, "option_type": "call", "open_interest": 30, "volume": 0},
+        {"strike": 95, "option_type": "put", "open_interest": 40, "volume": 1},
+        {"strike": 100, "option_type": "put", "open_interest": 20, "volume": 2},
+    ]
+    expected, _ = _loop_max_pain([100, 105, 95, 100], [10, 30, 0, 0], [0, 0, 40, 20])
+    assert max_pain_from_options(options).max_pain == expected
+    expected, _ = _loop_max_pain([100, 105, 95, 100], [15, 30, 0, 0], [0, 0, 41, 22])
+    assert max_pain_from_options(options, include_volume=True).max_pain == expected
@@ -0,0 +1,67 @@
+"""MultiResolutionProfile built bar batch by bar batch against one built in a single pass."""
+
+import numpy as np
+
+from volume_profile import MultiResolutionProfile, RollingLiquidityPulse, liquidity_pulse
+
+
+def _bars(seed: int = 2, count: int = 390):
+    rng = np.random.default_rng(seed)
+    close = np.round(450 + np.cumsum(rng.normal(0, 0.15, count)), 2)
+    volume = rng.integers(1_000, 50_000, count).astype(float)
+    times = np.datetime64("2026-10-16T09:30") + np.arange(count).astype("timedelta64[m]")
+    return close, volume, times
+
+
+def _assert_profiles_equal(actual, expected):
+    for name in ("edges", "buy_volume", "sell_volume", "price_min", "price_max"):
+        np.testing.assert_allclose(getattr(actual, name), getattr(expected, name), rtol=1e-12, equal_nan=True, err_msg=name)
+
+
+def test_incremental_equals_single_pass():
+    close, volume, times = _bars()
+    full = MultiResolutionProfile.from_bars(close, volume, times)
+    incremental = MultiResolutionProfile(full.bin_size, full.tick_size)
+    for start in range(0, close.size, 37):
+        incremental.add(close[start:start + 37], volume[start:start + 37], times[start:start + 37])
+    assert incremental.bars == full.bars
+    _assert_profiles_equal(incremental.base, full.base)
+    for factor in (1, 3, 10):
+        _assert_profiles_equal(incremental.coarsen(factor), full.coarsen(factor))
+    _assert_profiles_equal(incremental.resolution(60), full.resolution(60))
+
+
+def test_add_skips_bars_already_folded_in():
+    close, volume, times = _bars()
+    full = MultiResolutionProfile.from_bars(close, volume, times)
+    replayed = MultiResolutionProfile(full.bin_size, full.tick_size)
+    replayed.add(close[:200], volume[:200], times[:200])
+    # Overlapping refresh: bars 150-199 come back with the new ones
+    assert replayed.add(close[150:], volume[150:], times[150:]) == close.size - 200
+    _assert_profiles_equal(replayed.base, full.base)
+
+
+def test_profile_grows_when_prices_leave_the_grid():
+    close, volume, times = _bars()
+    close = close.copy()
+    close[300:] += 40  # gap far outside the first batch's range
+    full = MultiResolutionProfile.from_bars(close, volume, times)
+    incremental = MultiResolutionProfile(full.bin_size, full.tick_size)
+    incremental.add(close[:300], volume[:300], times[:300])
+    incremental.add(close[300:], volume[300:], times[300:])
+    _assert_profiles_equal(incremental.base, full.base)
+
+
+def test_rolling_pulse_equals_batch():
+    close, volume, _ = _bars(seed=9)
+    rolling = RollingLiquidityPulse()
+    for start in range(0, close.size, 50):
+        rolling.add(close[start:start + 50], volume[start:start + 50])
+    batch = liquidity_pulse(close, volume, float(close[-1]))
+    result = rolling.result(float(close[-1]))
+    assert result.trend == batch.trend
+    np.testing.assert_allclose(
+        [result.net_pressure, result.volatility, result.price_target],
+        [batch.net_pressure, batch.volatility, batch.price_target],
+        rtol=1e-9,
+    )
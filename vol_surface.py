@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from greeks_engine import MIN_DAYS
+from iv_engine import SmileFit
+from lru_cache import KeyedLRU
+from option_chain import OptionChain
+
+# Log-moneyness nodes per expiration slice
+GRID_POINTS = 41
+# Widest log-moneyness covered by the grid (beyond it slices are flat)
+MAX_LOG_MONEYNESS = 2.0
+
+
+@dataclass
+class VolSurface:
+    """Implied volatility over log-moneyness x expiration for one ticker snapshot.
+
+    Each listed expiration contributes the total variance ``iv^2 T`` of its
+    fitted smile sampled on a shared log-moneyness grid ``k = log(K/F)``.
+    Queries interpolate linearly in ``k`` within a slice and in total
+    variance across expirations, with constant volatility before the first
+    and after the last slice. ``when`` arguments are an expiration date
+    (``YYYY-MM-DD``, listed or not) or a time to expiry in years.
+    """
+
+    spot: float
+    as_of: date
+    risk_free_rate: float
+    expirations: List[str]
+    T: np.ndarray
+    moneyness: np.ndarray
+    total_variance: np.ndarray
+    weighted_ivs: np.ndarray
+    open_interest: np.ndarray
+    smiles: Dict[str, SmileFit]
+
+    def __len__(self) -> int:
+        return len(self.expirations)
+
+    def years(self, when: Union[str, float]) -> float:
+        if isinstance(when, str):
+            days = (datetime.strptime(when[:10], "%Y-%m-%d").date() - self.as_of).days
+            return max(float(days), MIN_DAYS) / 365.0
+        return max(float(when), MIN_DAYS / 365.0)
+
+    def forward(self, when: Union[str, float]) -> float:
+        return float(self.spot * np.exp(self.risk_free_rate * self.years(when)))
+
+    def _variance(self, k: np.ndarray, T: float) -> np.ndarray:
+        slices = self.total_variance
+        pos = int(np.searchsorted(self.T, T))
+        if pos == 0:
+            return np.interp(k, self.moneyness, slices[0]) * T / self.T[0]
+        if pos == len(self.T):
+            return np.interp(k, self.moneyness, slices[-1]) * T / self.T[-1]
+        lo, hi = self.T[pos - 1], self.T[pos]
+        weight = (T - lo) / (hi - lo)
+        return ((1 - weight) * np.interp(k, self.moneyness, slices[pos - 1])
+                + weight * np.interp(k, self.moneyness, slices[pos]))
+
+    def iv(self, strikes, when: Union[str, float]) -> np.ndarray:
+        """IV at ``strikes`` for one expiry; NaN everywhere on an empty surface."""
+        strikes = np.asarray(strikes, dtype=np.float64)
+        if not self.expirations:
+            return np.full(strikes.shape, np.nan)
+        if isinstance(when, str) and when in self.smiles:
+            return self.smiles[when].iv(strikes)
+        T = self.years(when)
+        k = np.log(np.maximum(strikes, 1e-12) / self.forward(T))
+        return np.sqrt(np.maximum(self._variance(k, T), 0.0) / T)
+
+    def atm_iv(self, when: Union[str, float]) -> float:
+        """At-the-forward IV; 0.0 on an empty surface."""
+        if not self.expirations:
+            return 0.0
+        return float(self.iv(self.forward(when), when))
+
+    def expected_move(self, when: Union[str, float], spot: Optional[float] = None) -> float:
+        """One standard deviation price move to ``when`` at the ATM IV."""
+        spot = self.spot if spot is None else spot
+        return float(spot * self.atm_iv(when) * np.sqrt(self.years(when)))
+
+    def weighted_iv(self, expirations: Optional[Sequence[str]] = None) -> float:
+        """OI-weighted IV of the fitted smiles at each contract's strike; 0.0 when none are listed."""
+        rows = self._rows(expirations)
+        oi = self.open_interest[rows]
+        if oi.sum() <= 0:
+            return float(self.weighted_ivs[rows].mean()) if rows.any() else 0.0
+        return float(np.dot(self.weighted_ivs[rows], oi) / oi.sum())
+
+    def term_structure(self) -> pd.DataFrame:
+        """ATM and OI-weighted IV per listed expiration, nearest first."""
+        return pd.DataFrame({
+            "expiration": self.expirations,
+            "dte": np.round(self.T * 365.0, 1),
+            "atm_iv": [self.atm_iv(exp) for exp in self.expirations],
+            "weighted_iv": self.weighted_ivs,
+            "expected_move": [self.expected_move(exp) for exp in self.expirations],
+        })
+
+    def _rows(self, expirations: Optional[Sequence[str]]) -> np.ndarray:
+        if expirations is None:
+            return np.ones(len(self.expirations), dtype=bool)
+        wanted = set(expirations)
+        return np.array([exp in wanted for exp in self.expirations], dtype=bool)
+
+
+def build_vol_surface(
+    smiles: Dict[str, Optional[SmileFit]],
+    spot: float,
+    as_of: date,
+    risk_free_rate: float = 0.045,
+    chains: Optional[Dict[str, OptionChain]] = None,
+    points: int = GRID_POINTS,
+) -> VolSurface:
+    """Stack per-expiration smiles into a :class:`VolSurface`.
+
+    Expirations without a fit are left out. ``chains`` supply the open
+    interest behind :meth:`VolSurface.weighted_iv`; without them (or without
+    OI) an expiration's weighted IV is its ATM IV.
+    """
+    fitted = sorted(((exp, smile) for exp, smile in smiles.items() if smile is not None and smile.T > 0),
+                    key=lambda item: item[1].T)
+    if fitted:
+        lo = min(float(smile.knots[0].min()) for _, smile in fitted)
+        hi = max(float(smile.knots[0].max()) for _, smile in fitted)
+        lo, hi = max(lo, -MAX_LOG_MONEYNESS), min(hi, MAX_LOG_MONEYNESS)
+        if hi - lo < 0.1:
+            lo, hi = lo - 0.05, hi + 0.05
+        moneyness = np.linspace(lo, hi, points)
+    else:
+        moneyness = np.zeros(0)
+
+    T = np.array([smile.T for _, smile in fitted], dtype=np.float64)
+    total_variance = np.zeros((len(fitted), moneyness.size))
+    weighted_ivs = np.zeros(len(fitted))
+    open_interest = np.zeros(len(fitted))
+    for i, (exp, smile) in enumerate(fitted):
+        total_variance[i] = smile.iv(smile.forward * np.exp(moneyness)) ** 2 * smile.T
+        chain = (chains or {}).get(exp)
+        weighted_ivs[i] = smile.atm_iv
+        if chain is not None and len(chain):
+            held = (chain.open_interest > 0) & (chain.strike > 0)
+            oi = chain.open_interest[held]
+            if oi.sum() > 0:
+                weighted_ivs[i] = float(np.dot(smile.iv(chain.strike[held]), oi) / oi.sum())
+                open_interest[i] = float(oi.sum())
+
+    return VolSurface(
+        spot=float(spot),
+        as_of=as_of,
+        risk_free_rate=risk_free_rate,
+        expirations=[exp for exp, _ in fitted],
+        T=T,
+        moneyness=moneyness,
+        total_variance=total_variance,
+        weighted_ivs=weighted_ivs,
+        open_interest=open_interest,
+        smiles=dict(fitted),
+    )
+
+
+class VolSurfaceCache(KeyedLRU[VolSurface]):
+    """Built :class:`VolSurface` objects by caller key, least recently used first out."""
+
+    stat_names = ("surfaces", "builds")
+
+    def __init__(self, max_entries: int = 32) -> None:
+        super().__init__(max_entries)
+
+    def surface(self, key: Hashable, build: Callable[[], VolSurface]) -> VolSurface:
+        return self.get_or_build(key, build)
@@ -0,0 +1,388 @@
+from __future__ import annotations
+
+import math
+import threading
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from lru_cache import KeyedLRU
+
+DEFAULT_TICK_SIZE = 0.01
+SUB_PENNY_TICK_SIZE = 0.0001
+BASE_BINS = 2000  # Resolution of the base histogram every coarser view is summed from
+DISPLAY_BINS = 60
+_NICE_STEPS = (1, 2, 5, 10)
+
+
+def signed_volume(close: np.ndarray, volume: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Split each bar's volume by the direction of its close-to-close move.
+
+    Returns ``(price_change, buy_volume, sell_volume)``. The first bar has
+    no previous close, so its change is NaN and it counts on neither side.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.nan_to_num(np.asarray(volume, dtype=np.float64))
+    price_change = np.diff(close, prepend=np.nan)
+    buy_volume = np.where(price_change > 0, volume, 0.0)
+    sell_volume = np.where(price_change < 0, volume, 0.0)
+    return price_change, buy_volume, sell_volume
+
+
+def bars_from_history(historical_data) -> pd.DataFrame:
+    """``date``/``close``/``volume`` history (records or DataFrame) as a date-sorted frame."""
+    df = pd.DataFrame(historical_data)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    return df.sort_values("date", kind="stable").reset_index(drop=True)
+
+
+@dataclass
+class VolumeProfile:
+    """Buy/sell volume per price bin.
+
+    Bin ``i`` covers ``(edges[i], edges[i + 1]]`` and is labelled by its left
+    edge. ``price_min``/``price_max`` are the extreme closes that landed in
+    the bin (NaN for empty bins).
+    """
+
+    edges: np.ndarray
+    buy_volume: np.ndarray
+    sell_volume: np.ndarray
+    price_min: np.ndarray
+    price_max: np.ndarray
+
+    @property
+    def price_bin(self) -> np.ndarray:
+        return self.edges[:-1]
+
+    @property
+    def net_volume(self) -> np.ndarray:
+        return self.buy_volume - self.sell_volume
+
+    @property
+    def power_index(self) -> np.ndarray:
+        total = self.buy_volume + self.sell_volume
+        return self.net_volume / np.where(total == 0, 1.0, total) * 100
+
+    def support(self, current_price: float) -> float:
+        """Bin below ``current_price`` with the most buy volume (``current_price`` if none)."""
+        below = self.price_bin < current_price
+        if not below.any():
+            return current_price
+        return float(self.price_bin[below][np.argmax(self.buy_volume[below])])
+
+    def resistance(self, current_price: float) -> float:
+        """Bin above ``current_price`` with the most sell volume (``current_price`` if none)."""
+        above = self.price_bin > current_price
+        if not above.any():
+            return current_price
+        return float(self.price_bin[above][np.argmax(self.sell_volume[above])])
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "price_bin": self.price_bin,
+            "buy_volume": self.buy_volume,
+            "sell_volume": self.sell_volume,
+            "net_volume": self.net_volume,
+            "price_min": self.price_min,
+            "price_max": self.price_max,
+            "power_index": self.power_index,
+        })
+
+    def accumulation_zones(self, count: int = 3) -> pd.DataFrame:
+        """The ``count`` bins with the most buy volume, largest first (ties keep price order)."""
+        order = np.argsort(-self.buy_volume, kind="stable")[:count]
+        return self.to_frame().iloc[order][["price_bin", "buy_volume", "price_min", "price_max"]]
+
+
+def build_volume_profile(close, buy_volume, sell_volume, edges: np.ndarray) -> VolumeProfile:
+    """Accumulate bars into the price bins defined by ``edges`` in one pass."""
+    close = np.asarray(close, dtype=np.float64)
+    n_bins = max(len(edges) - 1, 0)
+    bins = np.digitize(close, edges, right=True) - 1
+    inside = (bins >= 0) & (bins < n_bins) & ~np.isnan(close)
+    bins, close = bins[inside], close[inside]
+    buy = np.bincount(bins, weights=np.asarray(buy_volume)[inside], minlength=n_bins)
+    sell = np.bincount(bins, weights=np.asarray(sell_volume)[inside], minlength=n_bins)
+
+    price_min = np.full(n_bins, np.nan)
+    price_max = np.full(n_bins, np.nan)
+    if bins.size:
+        order = np.argsort(bins, kind="stable")
+        sorted_bins, sorted_close = bins[order], close[order]
+        starts = np.flatnonzero(np.r_[True, sorted_bins[1:] != sorted_bins[:-1]])
+        occupied = sorted_bins[starts]
+        price_min[occupied] = np.minimum.reduceat(sorted_close, starts)
+        price_max[occupied] = np.maximum.reduceat(sorted_close, starts)
+    return VolumeProfile(edges=edges, buy_volume=buy, sell_volume=sell, price_min=price_min, price_max=price_max)
+
+
+@dataclass
+class LiquidityPulse:
+    net_pressure: float
+    trend: str
+    volatility: float
+    price_target: float
+
+
+class RollingLiquidityPulse:
+    """Liquidity-pulse statistics accumulated bar batch by bar batch.
+
+    Holds running sums instead of the bars: net pressure, the last five
+    price changes, a mergeable mean/variance of bar returns and the
+    price-change-per-million-net-volume sensitivity, so :meth:`add` costs
+    O(new bars) and :meth:`result` O(1).
+    """
+
+    def __init__(self) -> None:
+        self.last_close = np.nan
+        self.net_pressure = 0.0
+        self.last_net_volume = 0.0
+        self.recent_changes = np.zeros(0)
+        self.returns_count = 0
+        self.returns_mean = 0.0
+        self.returns_m2 = 0.0
+        self.sensitivity_sum = 0.0
+        self.sensitivity_count = 0
+
+    def add(self, close, volume) -> "RollingLiquidityPulse":
+        close = np.asarray(close, dtype=np.float64)
+        if not close.size:
+            return self
+        price_change, buy, sell = signed_volume(np.r_[self.last_close, close], np.r_[0.0, volume])
+        price_change, net_volume = price_change[1:], (buy - sell)[1:]
+
+        self.net_pressure += float(net_volume.sum())
+        self.last_net_volume = float(net_volume[-1])
+        self.recent_changes = np.r_[self.recent_changes, price_change][-5:]
+
+        previous = np.r_[self.last_close, close[:-1]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = close / previous - 1
+        returns = returns[np.isfinite(returns)]
+        if returns.size:
+            # Chan et al. merge of the running and batch mean/variance
+            count = self.returns_count + returns.size
+            delta = returns.mean() - self.returns_mean
+            batch_m2 = float(((returns - returns.mean()) ** 2).sum())
+            self.returns_m2 += batch_m2 + delta ** 2 * self.returns_count * returns.size / count
+            self.returns_mean += delta * returns.size / count
+            self.returns_count = count
+
+        usable = ~np.isnan(price_change) & (net_volume != 0)
+        sensitivity = price_change[usable] / (net_volume[usable] / 1_000_000)
+        sensitivity = sensitivity[np.isfinite(sensitivity)]
+        self.sensitivity_sum += float(sensitivity.sum())
+        self.sensitivity_count += int(sensitivity.size)
+        self.last_close = close[-1]
+        return self
+
+    def result(self, current_price: float) -> LiquidityPulse:
+        """Net pressure, short-term trend, volatility and a volume-implied price target.
+
+        The target moves ``current_price`` by the last bar's net volume (in
+        millions) times the average price change per million of net volume.
+        """
+        recent = self.recent_changes[~np.isnan(self.recent_changes)]
+        trend = "Bullish" if recent.size and recent.mean() > 0 else "Bearish"
+        if self.returns_count > 1:
+            volatility = float(np.sqrt(self.returns_m2 / (self.returns_count - 1)) * np.sqrt(365) * 100)
+        else:
+            volatility = float("nan")
+        sensitivity_avg = self.sensitivity_sum / self.sensitivity_count if self.sensitivity_count else 0.0
+        last_net_volume = self.last_net_volume / 1_000_000
+        price_target = current_price if sensitivity_avg == 0 else current_price + last_net_volume * sensitivity_avg
+        return LiquidityPulse(
+            net_pressure=self.net_pressure,
+            trend=trend,
+            volatility=volatility,
+            price_target=float(price_target),
+        )
+
+
+def liquidity_pulse(close, volume, current_price: float) -> LiquidityPulse:
+    """Liquidity pulse of a complete bar history in one pass."""
+    return RollingLiquidityPulse().add(close, volume).result(current_price)
+
+
+def tick_size_for(price: float) -> float:
+    """Minimum US equity price increment at ``price``."""
+    return SUB_PENNY_TICK_SIZE if price < 1 else DEFAULT_TICK_SIZE
+
+
+def adaptive_bin_size(low: float, high: float, tick_size: float = DEFAULT_TICK_SIZE, target_bins: int = DISPLAY_BINS) -> float:
+    """Bin width giving about ``target_bins`` bins over ``[low, high]``.
+
+    The width is a whole number of ticks, rounded up to 1, 2 or 5 times a
+    power of ten ticks so level labels stay readable.
+    """
+    ticks = max(high - low, tick_size) / max(target_bins, 1) / tick_size
+    if ticks <= 1:
+        return tick_size
+    magnitude = 10 ** math.floor(math.log10(ticks))
+    step = next(step for step in _NICE_STEPS if step * magnitude >= ticks)
+    return step * magnitude * tick_size
+
+
+class MultiResolutionProfile:
+    """Fine base volume histogram from which every coarser profile is derived.
+
+    Base bin ``k`` covers ``(k * bin_size, (k + 1) * bin_size]`` on a grid
+    anchored at zero, so a view ``factor`` times coarser just sums runs of
+    ``factor`` adjacent base bins and never needs the raw bars again. Views
+    are memoized per factor until new bars arrive through :meth:`add`,
+    which bins only those bars and widens the base grid if they fall
+    outside it.
+    """
+
+    def __init__(self, bin_size: float, tick_size: float = DEFAULT_TICK_SIZE) -> None:
+        self.bin_size = bin_size
+        self.tick_size = tick_size
+        self.origin = 0
+        self.buy_volume = np.zeros(0)
+        self.sell_volume = np.zeros(0)
+        self.price_min = np.zeros(0)
+        self.price_max = np.zeros(0)
+        self.last_close = np.nan
+        self.last_timestamp: Optional[int] = None
+        self.bars = 0
+        self._views: Dict[int, VolumeProfile] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_bars(
+        cls,
+        close,
+        volume,
+        timestamps=None,
+        tick_size: Optional[float] = None,
+        base_bins: int = BASE_BINS,
+    ) -> "MultiResolutionProfile":
+        close = np.asarray(close, dtype=np.float64)
+        finite = close[np.isfinite(close) & (close > 0)]
+        low, high = (float(finite.min()), float(finite.max())) if finite.size else (0.0, 0.0)
+        tick_size = tick_size or tick_size_for(low)
+        profile = cls(adaptive_bin_size(low, high, tick_size, base_bins), tick_size)
+        profile.add(close, volume, timestamps)
+        return profile
+
+    def _bin_index(self, close: np.ndarray) -> np.ndarray:
+        # Right-closed bins; the epsilon keeps exact edge prices in the lower bin
+        return np.ceil(close / self.bin_size - 1e-9).astype(np.int64) - 1
+
+    def _grow(self, first: int, last: int) -> None:
+        if not self.buy_volume.size:
+            self.origin = first
+            size = last - first + 1
+            self.buy_volume, self.sell_volume = np.zeros(size), np.zeros(size)
+            self.price_min, self.price_max = np.full(size, np.nan), np.full(size, np.nan)
+            return
+        before = max(self.origin - first, 0)
+        after = max(last - (self.origin + self.buy_volume.size - 1), 0)
+        if before or after:
+            self.buy_volume = np.pad(self.buy_volume, (before, after))
+            self.sell_volume = np.pad(self.sell_volume, (before, after))
+            self.price_min = np.pad(self.price_min, (before, after), constant_values=np.nan)
+            self.price_max = np.pad(self.price_max, (before, after), constant_values=np.nan)
+            self.origin -= before
+
+    def add(self, close, volume, timestamps=None) -> int:
+        """Fold new bars into the base histogram; bars at or before the last timestamp are skipped."""
+        close = np.asarray(close, dtype=np.float64)
+        volume = np.asarray(volume, dtype=np.float64)
+        with self._lock:
+            if timestamps is not None:
+                timestamps = np.asarray(timestamps, dtype="datetime64[ns]").astype(np.int64)
+                if self.last_timestamp is not None:
+                    fresh = timestamps > self.last_timestamp
+                    close, volume, timestamps = close[fresh], volume[fresh], timestamps[fresh]
+            if not close.size:
+                return 0
+            price_change, buy, sell = signed_volume(np.r_[self.last_close, close], np.r_[0.0, volume])
+            buy, sell = buy[1:], sell[1:]
+            self.last_close = close[-1]
+            if timestamps is not None and timestamps.size:
+                self.last_timestamp = int(timestamps.max())
+            self.bars += close.size
+
+            usable = np.isfinite(close) & (close > 0)
+            if usable.any():
+                close, buy, sell = close[usable], buy[usable], sell[usable]
+                index = self._bin_index(close)
+                self._grow(int(index.min()), int(index.max()))
+                index -= self.origin
+                size = self.buy_volume.size
+                self.buy_volume += np.bincount(index, weights=buy, minlength=size)
+                self.sell_volume += np.bincount(index, weights=sell, minlength=size)
+                np.fmin.at(self.price_min, index, close)
+                np.fmax.at(self.price_max, index, close)
+            self._views.clear()
+            return int(close.size)
+
+    @property
+    def base(self) -> VolumeProfile:
+        return self.coarsen(1)
+
+    def coarsen(self, factor: int) -> VolumeProfile:
+        """Profile whose bins are ``factor`` base bins wide, aligned to multiples of the coarse width."""
+        factor = max(int(factor), 1)
+        with self._lock:
+            view = self._views.get(factor)
+            if view is None:
+                view = self._coarsen(factor)
+                self._views[factor] = view
+            return view
+
+    def _coarsen(self, factor: int) -> VolumeProfile:
+        size = self.buy_volume.size
+        if not size:
+            return VolumeProfile(np.zeros(0), np.zeros(0), np.zeros(0), np.zeros(0), np.zeros(0))
+        first_group = self.origin // factor
+        groups = (self.origin + np.arange(size)) // factor - first_group
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        edges = (first_group + np.arange(starts.size + 1)) * factor * self.bin_size
+        decimals = max(0, -math.floor(math.log10(self.tick_size))) + 2
+        return VolumeProfile(
+            edges=np.round(edges, decimals),
+            buy_volume=np.add.reduceat(self.buy_volume, starts),
+            sell_volume=np.add.reduceat(self.sell_volume, starts),
+            price_min=np.fmin.reduceat(self.price_min, starts),
+            price_max=np.fmax.reduceat(self.price_max, starts),
+        )
+
+    def at_bin_size(self, bin_size: float) -> VolumeProfile:
+        """Closest available view to ``bin_size`` (never finer than the base)."""
+        return self.coarsen(round(bin_size / self.bin_size))
+
+    def resolution(self, target_bins: int = DISPLAY_BINS) -> VolumeProfile:
+        """View with about ``target_bins`` bins over the traded range, at a readable width."""
+        occupied = np.flatnonzero(self.buy_volume + self.sell_volume > 0)
+        if not occupied.size:
+            return self.base
+        low = (self.origin + occupied[0]) * self.bin_size
+        high = (self.origin + occupied[-1] + 1) * self.bin_size
+        return self.at_bin_size(adaptive_bin_size(low, high, self.tick_size, target_bins))
+
+
+class ProfileCache(KeyedLRU[MultiResolutionProfile]):
+    """Per-(symbol, day) :class:`MultiResolutionProfile` store, least recently used first out.
+
+    :meth:`profile` builds a symbol's base histogram once per day and on
+    later calls folds in only bars newer than the last one it has seen.
+    """
+
+    stat_names = ("profiles", "builds")
+
+    def __init__(self, max_entries: int = 64) -> None:
+        super().__init__(max_entries)
+
+    def profile(self, symbol: str, day: date, close, volume, timestamps) -> MultiResolutionProfile:
+        key = (symbol.upper(), day)
+        profile = self.lookup(key)
+        if profile is None:
+            return self.store(key, MultiResolutionProfile.from_bars(close, volume, timestamps))
+        profile.add(close, volume, timestamps)
+        return profile